@@ -1,5 +1,5 @@
 import os
-from typing import Type
+from typing import Optional, Type
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -36,6 +36,21 @@ class Config(BaseConfig):
     POSTGRES_PASSWORD: str = Field(env='POSTGRES_PASSWORD')
     POSTGRES_DB: str = Field(env='POSTGRES_DB')
 
+    # Optional read replica of POSTGRES_HOST, using the same user, password and database.
+    POSTGRES_REPLICA_HOST: Optional[str] = Field(env='POSTGRES_REPLICA_HOST', default=None)
+    POSTGRES_REPLICA_PORT: Optional[int] = Field(env='POSTGRES_REPLICA_PORT', default=None)  # defaults to POSTGRES_PORT
+
+    # Pool used by `common` outside a Flask app context (workers, scripts, CLIs).
+    POSTGRES_POOL_MIN_SIZE: int = Field(env='POSTGRES_POOL_MIN_SIZE', default=0)
+    POSTGRES_POOL_MAX_SIZE: int = Field(env='POSTGRES_POOL_MAX_SIZE', default=10)
+    POSTGRES_POOL_IDLE_TIMEOUT: float = Field(env='POSTGRES_POOL_IDLE_TIMEOUT', default=300)  # seconds
+    POSTGRES_POOL_ACQUIRE_TIMEOUT: float = Field(env='POSTGRES_POOL_ACQUIRE_TIMEOUT', default=10)  # seconds
+    POSTGRES_POOL_HEALTH_CHECK_INTERVAL: float = Field(env='POSTGRES_POOL_HEALTH_CHECK_INTERVAL', default=30)  # seconds
+
+    SQL_INSTRUMENTATION_ENABLED: bool = Field(env='SQL_INSTRUMENTATION_ENABLED', default=True)
+    SQL_SLOW_QUERY_MS: float = Field(env='SQL_SLOW_QUERY_MS', default=200)
+    SQL_N_PLUS_ONE_THRESHOLD: int = Field(env='SQL_N_PLUS_ONE_THRESHOLD', default=10)  # same statement shape per request
+
     RABBITMQ_HOST: str = Field(env='RABBITMQ_HOST')
     RABBITMQ_PORT: int = Field(env='RABBITMQ_PORT')
     RABBITMQ_VIRTUAL_HOST: str = Field(env='RABBITMQ_VIRTUAL_HOST', default='/')
@@ -44,6 +59,31 @@ class Config(BaseConfig):
 
     AUTH_JWT_SECRET: str = Field(env='AUTH_JWT_SECRET')
 
+    IDENTITY_CACHE_TTL: int = Field(env='IDENTITY_CACHE_TTL', default=30)  # seconds
+    IDENTITY_CACHE_MAX_SIZE: int = Field(env='IDENTITY_CACHE_MAX_SIZE', default=10000)
+
+    MEMBERSHIP_CACHE_TTL: int = Field(env='MEMBERSHIP_CACHE_TTL', default=30)  # seconds
+    MEMBERSHIP_CACHE_MAX_SIZE: int = Field(env='MEMBERSHIP_CACHE_MAX_SIZE', default=10000)
+
+    ROLES_VERSION_CACHE_TTL: int = Field(env='ROLES_VERSION_CACHE_TTL', default=30)  # seconds
+    ROLES_VERSION_CACHE_MAX_SIZE: int = Field(env='ROLES_VERSION_CACHE_MAX_SIZE', default=10000)
+
+    PASSWORD_HASH_BACKEND: str = Field(env='PASSWORD_HASH_BACKEND', default='process')  # process | inline
+    PASSWORD_HASH_WORKERS: int = Field(env='PASSWORD_HASH_WORKERS', default=2)
+    PASSWORD_HASH_MAX_PENDING: int = Field(env='PASSWORD_HASH_MAX_PENDING', default=16)
+    PASSWORD_HASH_TIMEOUT: float = Field(env='PASSWORD_HASH_TIMEOUT', default=10)  # seconds
+
+    RATE_LIMIT_BACKEND: str = Field(env='RATE_LIMIT_BACKEND', default='memory')  # memory | postgres | disabled
+    RATE_LIMIT_MAX_KEYS: int = Field(env='RATE_LIMIT_MAX_KEYS', default=100000)
+    RATE_LIMIT_IP_BURST: int = Field(env='RATE_LIMIT_IP_BURST', default=20)
+    RATE_LIMIT_IP_PER_MINUTE: int = Field(env='RATE_LIMIT_IP_PER_MINUTE', default=20)
+    RATE_LIMIT_EMAIL_BURST: int = Field(env='RATE_LIMIT_EMAIL_BURST', default=5)
+    RATE_LIMIT_EMAIL_PER_MINUTE: int = Field(env='RATE_LIMIT_EMAIL_PER_MINUTE', default=5)
+
+    # Number of reverse proxies (load balancers) in front of the API whose X-Forwarded-For is trusted
+    # for the client address. Leave at 0 when clients connect directly, or they could spoof it.
+    PROXY_FIX_X_FOR: int = Field(env='PROXY_FIX_X_FOR', default=0)
+
     ROLLBAR_ACCESS_TOKEN: str = Field(env='ROLLBAR_ACCESS_TOKEN', default=None)
 
     QUEUE_NAME_PREFIX: str = Field(env='QUEUE_NAME_PREFIX', default='')
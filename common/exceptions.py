@@ -0,0 +1,14 @@
+class InputValidationError(Exception):
+    pass
+
+
+class APIException(Exception):
+    pass
+
+
+class PreconditionFailedError(Exception):
+    pass
+
+
+class ServiceUnavailableError(Exception):
+    pass
@@ -1,8 +1,47 @@
+from functools import wraps
+
 from rococo.repositories.postgresql import PostgreSQLRepository
 from rococo.data.postgresql import PostgreSQLAdapter
 from rococo.messaging.base import MessageAdapter
 from typing import Optional
 
+from common.repositories import identity_map
+from common.repositories.routing import can_read_from_replica
+
+
+def reads_from_replica(method):
+    """Run a read-only repository method against the read replica, if one is configured and the
+    current request has not written yet."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        replica_adapter = self.replica_adapter
+        if replica_adapter is None or self._pinned_to_primary or self.adapter is replica_adapter \
+                or not can_read_from_replica():
+            return method(self, *args, **kwargs)
+
+        primary_adapter, self.adapter = self.adapter, replica_adapter
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.adapter = primary_adapter
+
+    return wrapper
+
+
+def uses_primary(method):
+    """Keep every read inside a repository method on the primary, for read-modify-write methods."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._pinned_to_primary += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._pinned_to_primary -= 1
+
+    return wrapper
+
 
 class BaseRepository(PostgreSQLRepository):
     MODEL = None
@@ -14,7 +53,104 @@ class BaseRepository(PostgreSQLRepository):
 
     def __init__(
             self, db_adapter: PostgreSQLAdapter, message_adapter: Optional[MessageAdapter], 
-            queue_name: str, user_id: str = None
+            queue_name: str, user_id: str = None, replica_adapter: Optional[PostgreSQLAdapter] = None
     ):
         # Pass MODEL as the model to the BaseRepository
         super().__init__(db_adapter, self.MODEL, message_adapter, queue_name, user_id=user_id)
+        self.replica_adapter = replica_adapter
+        self._pinned_to_primary = 0
+
+    def get_one(self, conditions=None, fetch_related=None):
+        # Lookups by ID alone are served from the request's identity map when possible.
+        entity_id = None
+        if conditions and list(conditions) == ["entity_id"] and not fetch_related:
+            entity_id = conditions["entity_id"]
+            instance = identity_map.get_mapped(self.table_name, entity_id)
+            if instance is not identity_map.MISSING:
+                return instance
+
+        instance = self._get_one_from_db(conditions, fetch_related)
+        if entity_id is not None:
+            identity_map.remember(self.table_name, entity_id, instance)
+        return instance
+
+    @uses_primary
+    def get_latest_by_id(self, entity_id):
+        """Get an active entity from the primary, never from the identity map or the replica.
+        For read-modify-write code whose copy of the entity may be stale, such as a cached one."""
+        instance = self._get_one_from_db({"entity_id": entity_id}, None)
+        identity_map.remember(self.table_name, entity_id, instance)
+        return instance
+
+    @reads_from_replica
+    def _get_one_from_db(self, conditions, fetch_related):
+        return super().get_one(conditions, fetch_related)
+
+    @reads_from_replica
+    def get_many(self, *args, **kwargs):
+        return super().get_many(*args, **kwargs)
+
+    def get_many_by_ids(self, ids):
+        """Get the active entities among `ids` with at most one query, keyed by entity_id.
+
+        IDs with no active entity are left out. Entities already in the request's identity map
+        are not fetched again.
+        """
+        entities = {}
+        missing_ids = []
+        for entity_id in dict.fromkeys(str(entity_id).replace("-", "") for entity_id in ids):
+            instance = identity_map.get_mapped(self.table_name, entity_id)
+            if instance is identity_map.MISSING:
+                missing_ids.append(entity_id)
+            elif instance is not None:
+                entities[entity_id] = instance
+
+        if missing_ids:
+            loaded = self._get_many_by_ids_from_db(missing_ids)
+            for entity_id in missing_ids:
+                instance = loaded.get(entity_id)
+                identity_map.remember(self.table_name, entity_id, instance)
+                if instance is not None:
+                    entities[entity_id] = instance
+
+        return entities
+
+    @reads_from_replica
+    def _get_many_by_ids_from_db(self, ids):
+        sql = f"SELECT * FROM {self.table_name} WHERE entity_id = ANY(%s) AND active = true"
+
+        with self.adapter:
+            results = self.adapter.execute_query(sql, (list(ids),))
+            return {result["entity_id"]: self.model.from_dict(result) for result in results}
+
+    def save(self, instance, send_message: bool = False):
+        instance = super().save(instance, send_message)
+        identity_map.remember_saved(self.table_name, instance)
+        return instance
+
+    def _execute_returning(self, sql, params=None):
+        """Run a data-modifying statement with a RETURNING clause, commit, and return its rows as dicts.
+
+        `execute_query` of the adapter only fetches rows for statements starting with SELECT.
+        """
+        with self.adapter:
+            self.adapter._call_cursor('execute', sql, params or ())
+            column_names = [desc[0] for desc in self.adapter._cursor.description]
+            rows = [dict(zip(column_names, row)) for row in self.adapter._call_cursor('fetchall')]
+            self.adapter._connection.commit()
+            return rows
+
+    def _fetch_rows(self, sql, params=None):
+        """Run a SELECT and return its column names and its rows as plain tuples, without building dicts"""
+        with self.adapter:
+            self.adapter._call_cursor('execute', sql, params or ())
+            column_names = tuple(desc[0] for desc in self.adapter._cursor.description)
+            return column_names, self.adapter._call_cursor('fetchall')
+
+    def get_save_queries(self, instance):
+        """Prepare `instance` for saving like `save` does, and return its audit and save queries without running them"""
+        data = self._process_data_before_save(instance)
+        return [
+            self.adapter.get_move_entity_to_audit_table_query(self.table_name, instance.entity_id),
+            self.adapter.get_save_query(self.table_name, data),
+        ]
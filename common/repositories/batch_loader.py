@@ -0,0 +1,97 @@
+from contextvars import ContextVar
+
+from common.repositories import identity_map
+
+
+class BatchLoader:
+    """Collects entity IDs of one repository and loads them together with `get_many_by_ids`.
+
+    Queue the IDs that will be needed with `want`, then read them with `get` or `get_many`;
+    the first read loads everything queued so far in one round trip.
+
+        loader = get_batch_loader(person_repo)
+        loader.want(*(task.person_id for task in tasks))
+        people = [loader.get(task.person_id) for task in tasks]
+    """
+
+    def __init__(self, repository):
+        self.repository = repository
+        self._pending = set()
+        self._loaded = {}
+
+    @staticmethod
+    def _normalize(entity_id):
+        return str(entity_id).replace("-", "")
+
+    def want(self, *ids):
+        """Queue IDs to be loaded by the next read."""
+        for entity_id in ids:
+            if entity_id is None:
+                continue
+            entity_id = self._normalize(entity_id)
+            if entity_id not in self._loaded:
+                self._pending.add(entity_id)
+
+    def load(self):
+        """Load every queued ID in one query."""
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, set()
+        entities = self.repository.get_many_by_ids(pending)
+        for entity_id in pending:
+            self._loaded[entity_id] = entities.get(entity_id)
+
+    def _lookup(self, entity_id):
+        # Prefer the request's identity map, which also reflects saves made after the load.
+        instance = identity_map.get_mapped(self.repository.table_name, entity_id)
+        if instance is identity_map.MISSING:
+            instance = self._loaded.get(entity_id)
+        return instance
+
+    def get(self, entity_id):
+        """Get one active entity, or None; loads it together with everything queued."""
+        if entity_id is None:
+            return None
+
+        self.want(entity_id)
+        self.load()
+        return self._lookup(self._normalize(entity_id))
+
+    def get_many(self, ids):
+        """Get the active entities among `ids`, keyed by entity_id, together with everything queued."""
+        self.want(*ids)
+        self.load()
+        entities = {}
+        for entity_id in ids:
+            if entity_id is None:
+                continue
+            instance = self._lookup(self._normalize(entity_id))
+            if instance is not None:
+                entities[instance.entity_id] = instance
+        return entities
+
+
+# Loaders of the current scope (usually one request), by table name.
+_batch_loaders: ContextVar = ContextVar("batch_loaders", default=None)
+
+
+def start_batch_loaders():
+    _batch_loaders.set({})
+
+
+def clear_batch_loaders():
+    _batch_loaders.set(None)
+
+
+def get_batch_loader(repository) -> BatchLoader:
+    """Return the current request's loader for the repository's table, so IDs queued anywhere
+    in the request are loaded together. Outside a request a new loader is returned."""
+    loaders = _batch_loaders.get()
+    if loaders is None:
+        return BatchLoader(repository)
+
+    loader = loaders.get(repository.table_name)
+    if loader is None:
+        loader = loaders[repository.table_name] = BatchLoader(repository)
+    return loader
@@ -0,0 +1,260 @@
+import os
+import threading
+import time
+from collections import deque
+
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from common.app_logger import logger
+from common.exceptions import ServiceUnavailableError
+
+
+class ConnectionPool:
+    """A thread-safe pool of Postgres connections for code running outside a Flask app context.
+
+    Connections are opened on demand up to `max_size`; callers beyond that wait up to
+    `acquire_timeout` seconds and then get a ServiceUnavailableError. A connection that has been
+    idle for more than `health_check_interval` seconds is checked with `SELECT 1` before it is
+    handed out. Released connections are rolled back, so every checkout starts clean.
+
+    From the first checkout in a process, a background thread runs `maintain` every
+    `maintenance_interval` seconds: idle connections above `min_size` are closed once unused for
+    `idle_timeout` seconds, and connections are opened ahead of demand up to `min_size`.
+    """
+
+    def __init__(
+        self, connect, min_size: int = 0, max_size: int = 10, idle_timeout: float = 300,
+        acquire_timeout: float = 10, health_check_interval: float = 30, maintenance_interval: float = 30
+    ):
+        if max_size < 1 or not 0 <= min_size <= max_size:
+            raise ValueError("Connection pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1.")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.maintenance_interval = maintenance_interval
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._condition = threading.Condition()
+        self._idle = deque()  # (connection, released_at), most recently released on the right
+        self._in_use = set()  # ids of checked-out connections
+        self._size = 0  # idle + checked-out + being opened
+        self._closed = False
+        self._maintenance_thread = None
+        self._stopped = threading.Event()
+        self._counters = dict(created=0, closed=0, acquired=0, waited=0, timeouts=0, failed_health_checks=0)
+
+    def _check_pid(self):
+        # Connections must not be shared with a forked child; it starts with an empty pool
+        # and leaves the parent's connections alone.
+        if self._pid != os.getpid():
+            self._reset()
+
+    def acquire(self):
+        """Check out a connection, opening one if none is idle and the pool is not full."""
+        self._check_pid()
+        self._start_maintenance()
+        deadline = time.monotonic() + self.acquire_timeout
+
+        while True:
+            connection, released_at = self._take(deadline)
+
+            if connection is None:
+                try:
+                    connection = self._connect()
+                except BaseException:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+                with self._condition:
+                    self._counters["created"] += 1
+                break
+
+            if self._is_usable(connection, released_at):
+                break
+
+            self._discard(connection)
+
+        with self._condition:
+            self._in_use.add(id(connection))
+            self._counters["acquired"] += 1
+        return connection
+
+    def _take(self, deadline):
+        """Pop an idle connection, or reserve a slot for a new one (returned as None)."""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("The connection pool is closed.")
+
+                self._prune_idle(time.monotonic())
+                if self._idle:
+                    return self._idle.pop()
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise ServiceUnavailableError("Timed out waiting for a database connection.")
+
+                self._counters["waited"] += 1
+                self._condition.wait(remaining)
+
+    def _is_usable(self, connection, released_at):
+        if connection.closed:
+            return False
+
+        if time.monotonic() - released_at < self.health_check_interval:
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"Discarding pooled database connection that failed its health check: {e}")
+            with self._condition:
+                self._counters["failed_health_checks"] += 1
+            return False
+
+    def release(self, connection):
+        """Return a checked-out connection to the pool."""
+        self._check_pid()
+        with self._condition:
+            if id(connection) not in self._in_use:
+                return
+            self._in_use.discard(id(connection))
+
+        if not connection.closed and connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Exception:
+                self._discard(connection)
+                return
+
+        if connection.closed:
+            self._discard(connection)
+            return
+
+        with self._condition:
+            if self._closed:
+                self._size -= 1
+                self._counters["closed"] += 1
+                connection.close()
+                return
+
+            self._idle.append((connection, time.monotonic()))
+            self._prune_idle(time.monotonic())
+            self._condition.notify()
+
+    def owns(self, connection) -> bool:
+        """Whether `connection` is currently checked out of this pool."""
+        return connection is not None and self._pid == os.getpid() and id(connection) in self._in_use
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._size -= 1
+            self._counters["closed"] += 1
+            self._condition.notify()
+
+    def _start_maintenance(self):
+        with self._condition:
+            if self._maintenance_thread is not None or self._closed:
+                return
+            self._maintenance_thread = threading.Thread(
+                target=self._run_maintenance, name="connection-pool-maintenance", daemon=True
+            )
+        self._maintenance_thread.start()
+
+    def _run_maintenance(self):
+        # Bound to the state of the process that started it; `_reset` after a fork replaces the event.
+        stopped = self._stopped
+        while True:
+            try:
+                self.maintain()
+            except Exception as e:
+                logger.warning(f"Connection pool maintenance failed: {e}")
+            if stopped.wait(self.maintenance_interval):
+                return
+
+    def maintain(self):
+        """Close connections idle for longer than `idle_timeout` and open connections up to `min_size`."""
+        self._check_pid()
+        with self._condition:
+            if self._closed:
+                return
+            self._prune_idle(time.monotonic())
+            missing = max(self.min_size - self._size, 0)
+            self._size += missing
+
+        for _ in range(missing):
+            try:
+                connection = self._connect()
+            except Exception as e:
+                logger.warning(f"Could not open a pooled database connection ahead of demand: {e}")
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                continue
+
+            with self._condition:
+                self._counters["created"] += 1
+                if self._closed:
+                    self._size -= 1
+                    self._counters["closed"] += 1
+                    connection.close()
+                    continue
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+
+    def _prune_idle(self, now):
+        # Called with the lock held. The oldest idle connections are on the left.
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] >= self.idle_timeout:
+            connection, _ = self._idle.popleft()
+            self._size -= 1
+            self._counters["closed"] += 1
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        """A snapshot of the pool's size and lifetime counters."""
+        with self._condition:
+            return dict(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=len(self._in_use),
+                min_size=self.min_size,
+                max_size=self.max_size,
+                **self._counters,
+            )
+
+    def close(self):
+        """Close idle connections; checked-out ones are closed as they are released."""
+        self._stopped.set()
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                connection, _ = self._idle.popleft()
+                self._size -= 1
+                self._counters["closed"] += 1
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            self._condition.notify_all()
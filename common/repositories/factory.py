@@ -1,6 +1,14 @@
+import threading
+from functools import partial
+
+import psycopg2
+
 from common.repositories import *
+from common.repositories.connection_pool import ConnectionPool
+from common.repositories.instrumentation import InstrumentedPostgreSQLAdapter
+from common.repositories.routing import mark_primary_write
+from common.repositories.unit_of_work import UnitOfWork
 from enum import Enum, auto
-from rococo.data.postgresql import PostgreSQLAdapter
 from rococo.messaging.rabbitmq import RabbitMqConnection
 from typing import Optional
 from common.app_logger import logger
@@ -38,18 +46,33 @@ class MessageAdapterType(str, Enum):
         return str(self.value)
 
 
-def get_connection_resolver():
-    pooled_db = get_flask_pooled_db()
-    if pooled_db:
-        return pooled_db.get_connection
+def get_connection_resolver(connection_pool: ConnectionPool):
+    def resolve_connection(*args, **kwargs):
+        # Decided per connection rather than per adapter, since services outlive requests.
+        pooled_db = get_flask_pooled_db()
+        if pooled_db:
+            return pooled_db.get_connection(*args, **kwargs)
+        return connection_pool.acquire()
+
+    return resolve_connection
+
+
+def get_connection_closer(connection_pool: ConnectionPool):
+    def close_connection(adapter):
+        # Connections of the Flask pooled_db are left open; it closes them on request teardown.
+        if connection_pool.owns(adapter._connection):
+            if adapter._cursor is not None:
+                adapter._cursor.close()
+                adapter._cursor = None
+            connection, adapter._connection = adapter._connection, None
+            connection_pool.release(connection)
 
+    return close_connection
 
-def get_connection_closer():
-    pooled_db = get_flask_pooled_db()
-    if pooled_db:
-        return (
-            lambda *args, **kwargs: None
-        )  # No-op; let Pooled DB handle closing of connection on request teardown.
+
+def get_replica_connection_resolver(connection_pool: ConnectionPool):
+    # The Flask pooled_db only holds primary connections, so replica connections always come from the pool.
+    return lambda *args, **kwargs: connection_pool.acquire()
 
 
 class RepoType(Enum):
@@ -72,6 +95,50 @@ class RepositoryFactory:
     def __init__(self, config):
         self.config = config
 
+        # Settings are read once; adapters built from them are cheap and hold no connection until used.
+        self._db_settings = dict(
+            host=config.POSTGRES_HOST,
+            port=int(config.POSTGRES_PORT),
+            user=config.POSTGRES_USER,
+            password=config.POSTGRES_PASSWORD,
+            database=config.POSTGRES_DB,
+        )
+        self.connection_pool = ConnectionPool(
+            partial(psycopg2.connect, **self._db_settings),
+            min_size=config.POSTGRES_POOL_MIN_SIZE,
+            max_size=config.POSTGRES_POOL_MAX_SIZE,
+            idle_timeout=config.POSTGRES_POOL_IDLE_TIMEOUT,
+            acquire_timeout=config.POSTGRES_POOL_ACQUIRE_TIMEOUT,
+            health_check_interval=config.POSTGRES_POOL_HEALTH_CHECK_INTERVAL,
+        )
+        self._connection_resolver = get_connection_resolver(self.connection_pool)
+        self._connection_closer = get_connection_closer(self.connection_pool)
+
+        self.replica_connection_pool = None
+        if config.POSTGRES_REPLICA_HOST:
+            self._replica_db_settings = dict(
+                self._db_settings,
+                host=config.POSTGRES_REPLICA_HOST,
+                port=int(config.POSTGRES_REPLICA_PORT or config.POSTGRES_PORT),
+            )
+            self.replica_connection_pool = ConnectionPool(
+                partial(psycopg2.connect, **self._replica_db_settings),
+                min_size=config.POSTGRES_POOL_MIN_SIZE,
+                max_size=config.POSTGRES_POOL_MAX_SIZE,
+                idle_timeout=config.POSTGRES_POOL_IDLE_TIMEOUT,
+                acquire_timeout=config.POSTGRES_POOL_ACQUIRE_TIMEOUT,
+                health_check_interval=config.POSTGRES_POOL_HEALTH_CHECK_INTERVAL,
+            )
+            self._replica_connection_resolver = get_replica_connection_resolver(self.replica_connection_pool)
+            self._replica_connection_closer = get_connection_closer(self.replica_connection_pool)
+        self._rabbitmq_settings = dict(
+            host=config.RABBITMQ_HOST,
+            port=int(config.RABBITMQ_PORT),
+            username=config.RABBITMQ_USER,
+            password=config.RABBITMQ_PASSWORD,
+            virtual_host=config.RABBITMQ_VIRTUAL_HOST,
+        )
+
     _repositories = {
         RepoType.PERSON: PersonRepository,
         RepoType.ORGANIZATION: OrganizationRepository,
@@ -82,44 +149,62 @@ class RepositoryFactory:
     }
 
     def get_db_connection(self):
-        host = self.config.POSTGRES_HOST
-        port = int(self.config.POSTGRES_PORT)
-        user = self.config.POSTGRES_USER
-        password = self.config.POSTGRES_PASSWORD
-        database = self.config.POSTGRES_DB
-
-        return PostgreSQLAdapter(
-            host,
-            port,
-            user,
-            password,
-            database,
-            connection_resolver=get_connection_resolver(),
-            connection_closer=get_connection_closer(),
+        return InstrumentedPostgreSQLAdapter(
+            **self._db_settings,
+            connection_resolver=self._connection_resolver,
+            connection_closer=self._connection_closer,
+            on_write=mark_primary_write,
         )
 
-    def _get_rabbitmq_connection(self):
-        return RabbitMqConnection(
-            host=self.config.RABBITMQ_HOST,
-            port=int(self.config.RABBITMQ_PORT),
-            username=self.config.RABBITMQ_USER,
-            password=self.config.RABBITMQ_PASSWORD,
-            virtual_host=self.config.RABBITMQ_VIRTUAL_HOST,
+    def get_replica_db_connection(self):
+        """An adapter for the read replica, or None if no replica is configured."""
+        if self.replica_connection_pool is None:
+            return None
+
+        return InstrumentedPostgreSQLAdapter(
+            **self._replica_db_settings,
+            connection_resolver=self._replica_connection_resolver,
+            connection_closer=self._replica_connection_closer,
         )
 
+    def _get_rabbitmq_connection(self):
+        return RabbitMqConnection(**self._rabbitmq_settings)
+
+    def unit_of_work(self):
+        """Start a unit of work that writes queued saves of any repository in one transaction."""
+        return UnitOfWork(self.get_db_connection())
+
     def get_adapter(self):
         return self._get_rabbitmq_connection()
 
     def get_repository(
         self, repo_type: RepoType, person_id=None, message_queue_name: str = ""
     ):
-        adapter = self.get_db_connection()
-        message_adapter = self.get_adapter()
         repo_class = self._repositories.get(repo_type)
 
         if repo_class:
-            import threading
-
-            return repo_class(adapter, message_adapter, message_queue_name, person_id)
+            adapter = self.get_db_connection()
+            # Only repositories that publish on save need a message adapter.
+            message_adapter = self.get_adapter() if message_queue_name else None
+            return repo_class(
+                adapter, message_adapter, message_queue_name, person_id,
+                replica_adapter=self.get_replica_db_connection(),
+            )
 
         raise ValueError(f"No repository found with the name '{repo_type}'")
+
+
+_factories = {}
+_factories_lock = threading.Lock()
+
+
+def get_repository_factory(config) -> RepositoryFactory:
+    """Return the process-wide RepositoryFactory for `config`, creating it on first use."""
+    entry = _factories.get(id(config))
+    if entry is None:
+        with _factories_lock:
+            entry = _factories.get(id(config))
+            if entry is None:
+                # Keep `config` referenced so that its id is not reused by another object.
+                entry = _factories[id(config)] = (config, RepositoryFactory(config))
+    return entry[1]
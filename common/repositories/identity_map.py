@@ -0,0 +1,51 @@
+import copy
+from contextvars import ContextVar
+
+# Entities loaded or saved in the current scope (usually one request), keyed by (table, entity_id).
+# A None value records that no active entity exists with that ID.
+_identity_map: ContextVar = ContextVar("identity_map", default=None)
+
+MISSING = object()
+
+
+def _key(table: str, entity_id):
+    return table, str(entity_id).replace("-", "")
+
+
+def start_identity_map():
+    _identity_map.set({})
+
+
+def clear_identity_map():
+    _identity_map.set(None)
+
+
+def get_mapped(table: str, entity_id):
+    """Return a copy of the mapped entity (None if it is known not to exist), or `MISSING` if unknown."""
+    identity_map = _identity_map.get()
+    if identity_map is None:
+        return MISSING
+
+    instance = identity_map.get(_key(table, entity_id), MISSING)
+    if instance is MISSING or instance is None:
+        return instance
+    # Callers may modify the models, so never hand out the mapped instances.
+    return copy.copy(instance)
+
+
+def remember(table: str, entity_id, instance):
+    identity_map = _identity_map.get()
+    if identity_map is not None:
+        identity_map[_key(table, entity_id)] = copy.copy(instance)
+
+
+def remember_saved(table: str, instance):
+    """Map an entity in the state it was just saved in; soft-deleted entities map to None."""
+    remember(table, instance.entity_id, instance if instance.active else None)
+
+
+def forget(table: str, *entity_ids):
+    identity_map = _identity_map.get()
+    if identity_map is not None:
+        for entity_id in entity_ids:
+            identity_map.pop(_key(table, entity_id), None)
@@ -0,0 +1,125 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from rococo.data.postgresql import PostgreSQLAdapter
+
+from common.app_config import config
+from common.app_logger import logger
+from common.repositories.routing import is_read_statement
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql) -> str:
+    """Reduce a statement to its shape: literals become `?`, value lists and whitespace are collapsed."""
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", errors="replace")
+    sql = _STRING_LITERAL.sub("?", str(sql))
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _VALUE_LIST.sub("(?, ...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryStats:
+    """Statements run in one scope (usually one request): count, total time and count per shape."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, shape: str, duration: float):
+        self.count += 1
+        self.total_time += duration
+        self.shapes[shape] += 1
+
+    def get_repeated_shapes(self, threshold: int):
+        """Statement shapes run at least `threshold` times, the usual sign of an N+1 query pattern."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+_query_stats: ContextVar = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> QueryStats:
+    """Start collecting statements run in the current context."""
+    stats = QueryStats()
+    _query_stats.set(stats)
+    return stats
+
+
+def finish_query_stats():
+    """Stop collecting and return what was collected, or None if collection was not started."""
+    stats = _query_stats.get()
+    _query_stats.set(None)
+    return stats
+
+
+def record_query(sql, duration: float):
+    if not config.SQL_INSTRUMENTATION_ENABLED:
+        return
+
+    stats = _query_stats.get()
+    slow = duration * 1000 >= config.SQL_SLOW_QUERY_MS
+    if stats is None and not slow:
+        return
+
+    shape = normalize_sql(sql)
+    if stats is not None:
+        stats.record(shape, duration)
+    if slow:
+        logger.warning(f"Slow query ({duration * 1000:.1f} ms): {shape}")
+
+
+class InstrumentedCursor:
+    """Wraps a DB-API cursor and records every statement it executes.
+
+    `on_write`, if given, is called for every statement that is not a plain SELECT.
+    """
+
+    def __init__(self, cursor, on_write=None):
+        self._cursor = cursor
+        self._on_write = on_write
+
+    def execute(self, sql, *args, **kwargs):
+        if self._on_write is not None and not is_read_statement(sql):
+            self._on_write()
+        started_at = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, *args, **kwargs)
+        finally:
+            record_query(sql, time.perf_counter() - started_at)
+
+    def executemany(self, sql, *args, **kwargs):
+        if self._on_write is not None:
+            self._on_write()
+        started_at = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, *args, **kwargs)
+        finally:
+            record_query(sql, time.perf_counter() - started_at)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+class InstrumentedPostgreSQLAdapter(PostgreSQLAdapter):
+    """A PostgreSQLAdapter whose cursor records the statements run through `execute_query`,
+    `get_one`, `get_many`, `save`, transactions and the raw cursor calls of our repositories."""
+
+    def __init__(self, *args, on_write=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._on_write = on_write
+
+    def __enter__(self):
+        super().__enter__()
+        self._cursor = InstrumentedCursor(self._cursor, self._on_write)
+        return self
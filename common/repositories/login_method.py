@@ -1,6 +1,57 @@
 from common.repositories.base import BaseRepository
-from common.models.login_method import LoginMethod
+from common.models.login_method import LoginMethod, LoginMethodType
+from common.models.email import Email
+from common.models.person import Person
+
+# Tables joined by the identity queries, by alias. `raw_password` is a transient model field, not a column.
+IDENTITY_TABLES = {
+    "e": (Email, [field for field in Email.fields()]),
+    "lm": (LoginMethod, [field for field in LoginMethod.fields() if field != "raw_password"]),
+    "p": (Person, [field for field in Person.fields()]),
+}
 
 
 class LoginMethodRepository(BaseRepository):
     MODEL = LoginMethod
+
+    def _get_identity(self, condition: str, params: tuple):
+        """Fetch an email with its email-password login method and person in one query.
+
+        Returns an `(email, login_method, person)` tuple, where login_method and person are
+        None if missing, or None if no email matched.
+        """
+        select_list = ", ".join(
+            f"{alias}.{column} AS {alias}__{column}"
+            for alias, (_, columns) in IDENTITY_TABLES.items()
+            for column in columns
+        )
+        sql = f"""
+            SELECT {select_list}
+            FROM email AS e
+            LEFT JOIN login_method AS lm
+                ON lm.email_id = e.entity_id AND lm.method_type = %s AND lm.active = true
+            LEFT JOIN person AS p
+                ON p.entity_id = e.person_id AND p.active = true
+            WHERE {condition} AND e.active = true
+            LIMIT 1
+        """
+
+        with self.adapter:
+            results = self.adapter.execute_query(sql, (LoginMethodType.EMAIL_PASSWORD.value, *params))
+
+        if not results:
+            return None
+
+        identity = []
+        for alias, (model, columns) in IDENTITY_TABLES.items():
+            data = {column: results[0][f"{alias}__{column}"] for column in columns}
+            identity.append(model.from_dict(data) if data["entity_id"] is not None else None)
+        return tuple(identity)
+
+    def get_identity_by_email_address(self, email_address: str):
+        """Get the `(email, login_method, person)` of an email address"""
+        return self._get_identity("e.email = %s", (email_address,))
+
+    def get_identity_by_login_method_id(self, login_method_id: str):
+        """Get the `(email, login_method, person)` of an email-password login method"""
+        return self._get_identity("lm.entity_id = %s", (login_method_id,))
@@ -1,6 +1,45 @@
 from common.repositories.base import BaseRepository
 from common.models.person_organization_role import PersonOrganizationRole
+from common.models.organization import Organization
+
+# Tables joined by the membership query, by alias.
+MEMBERSHIP_TABLES = {
+    "o": (Organization, [field for field in Organization.fields()]),
+    "por": (PersonOrganizationRole, [field for field in PersonOrganizationRole.fields()]),
+}
 
 
 class PersonOrganizationRoleRepository(BaseRepository):
     MODEL = PersonOrganizationRole
+
+    def get_membership(self, person_id: str, organization_id: str):
+        """Fetch an organization with the person's role in it in one query.
+
+        Returns an `(organization, role)` tuple, where role is None if the person is not a
+        member, or None if no organization matched.
+        """
+        select_list = ", ".join(
+            f"{alias}.{column} AS {alias}__{column}"
+            for alias, (_, columns) in MEMBERSHIP_TABLES.items()
+            for column in columns
+        )
+        sql = f"""
+            SELECT {select_list}
+            FROM organization AS o
+            LEFT JOIN person_organization_role AS por
+                ON por.organization_id = o.entity_id AND por.person_id = %s AND por.active = true
+            WHERE o.entity_id = %s AND o.active = true
+            LIMIT 1
+        """
+
+        with self.adapter:
+            results = self.adapter.execute_query(sql, (person_id, organization_id))
+
+        if not results:
+            return None
+
+        membership = []
+        for alias, (model, columns) in MEMBERSHIP_TABLES.items():
+            data = {column: results[0][f"{alias}__{column}"] for column in columns}
+            membership.append(model.from_dict(data) if data["entity_id"] is not None else None)
+        return tuple(membership)
@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class ReadRouting:
+    """Routing state of one scope (usually one request): whether it has written to the primary yet."""
+
+    def __init__(self):
+        self.wrote = False
+
+
+_read_routing: ContextVar = ContextVar("read_routing", default=None)
+
+
+def start_read_routing():
+    """Let reads in the current context go to the replica until the context writes."""
+    _read_routing.set(ReadRouting())
+
+
+def finish_read_routing():
+    _read_routing.set(None)
+
+
+@contextmanager
+def read_routing():
+    """`start_read_routing` for code outside a request, such as workers and scripts."""
+    token = _read_routing.set(ReadRouting())
+    try:
+        yield
+    finally:
+        _read_routing.reset(token)
+
+
+def mark_primary_write():
+    state = _read_routing.get()
+    if state is not None:
+        state.wrote = True
+
+
+def can_read_from_replica() -> bool:
+    """Reads may use the replica only inside a routing scope that has not written yet (read-your-writes)."""
+    state = _read_routing.get()
+    return state is not None and not state.wrote
+
+
+def is_read_statement(sql) -> bool:
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", errors="replace")
+    statement = str(sql).lstrip().upper()
+    return statement.startswith("SELECT") and " FOR UPDATE" not in statement and " FOR SHARE" not in statement
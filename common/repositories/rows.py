@@ -0,0 +1,52 @@
+from functools import lru_cache
+from operator import itemgetter
+
+
+@lru_cache(maxsize=256)
+def get_row_mapping(model, column_names: tuple):
+    """The model fields among `column_names`, in column order, and a getter picking them out of a
+    row tuple; the getter is None when every column is a field. Cached per model and column list."""
+    model_fields = set(model.fields())
+    positions = [index for index, column in enumerate(column_names) if column in model_fields]
+    fields = tuple(column_names[index] for index in positions)
+
+    if len(positions) == len(column_names):
+        return fields, None
+    if len(positions) == 1:
+        position = positions[0]
+        return fields, lambda row: (row[position],)
+    return fields, itemgetter(*positions)
+
+
+class RowSet:
+    """Rows of a read-only query kept as tuples, with one field list shared by all of them.
+
+    List endpoints only serialize their rows, so no model is built per row: no validation,
+    no default factories and no `as_dict`. Indexing or iterating yields plain dicts, and
+    `app.helpers.response` serializes a RowSet straight from its tuples.
+    """
+
+    __slots__ = ("fields", "rows")
+
+    def __init__(self, fields: tuple, rows: list):
+        self.fields = fields
+        self.rows = rows
+
+    @classmethod
+    def from_rows(cls, model, column_names, rows):
+        fields, getter = get_row_mapping(model, tuple(column_names))
+        if getter is not None:
+            rows = [getter(row) for row in rows]
+        return cls(fields, rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        fields = self.fields
+        return (dict(zip(fields, row)) for row in self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RowSet(self.fields, self.rows[index])
+        return dict(zip(self.fields, self.rows[index]))
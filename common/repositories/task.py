@@ -1,18 +1,59 @@
-from common.repositories.base import BaseRepository
+from common.repositories import identity_map
+from common.repositories.base import BaseRepository, reads_from_replica, uses_primary
+from common.repositories.rows import RowSet
 from common.models.task import Task
 import uuid
 from datetime import datetime
 
+# Must match the expression of task_search_vector_ind (migration 0000000009) for the GIN index to be used.
+TASK_SEARCH_VECTOR = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
 
 class TaskRepository(BaseRepository):
     MODEL = Task
 
-    def __init__(self, db_adapter, message_adapter=None, queue_name="", user_id=None):
-        super().__init__(db_adapter, message_adapter, queue_name, user_id)
+    def __init__(self, db_adapter, message_adapter=None, queue_name="", user_id=None, replica_adapter=None):
+        super().__init__(db_adapter, message_adapter, queue_name, user_id, replica_adapter=replica_adapter)
         self.model = self.MODEL
 
-    def get_all(self, query=None, offset: int = 0, limit: int = None):
-        """Get all tasks with optional query parameters and pagination"""
+    def _build_where_clause(self, query):
+        """Build the WHERE clause and its params for the given query dict, limited to active tasks"""
+        where_conditions = ["active = true"]
+        params = []
+        for key, value in query.items():
+            where_conditions.append(f"{key} = %s")
+            params.append(value)
+
+        return " AND ".join(where_conditions), params
+
+    def _build_select_list(self, columns):
+        """Build the SQL column list for a projection, `*` when no projection is requested"""
+        if columns is None:
+            return "*"
+
+        unknown_columns = set(columns) - set(self.MODEL.fields())
+        if unknown_columns:
+            raise ValueError(f"Unknown task columns: {', '.join(sorted(unknown_columns))}")
+        return ", ".join(columns)
+
+    def _hydrate(self, result, columns):
+        """Build a Task from a full row, or keep a projected row as a lightweight dict"""
+        if columns is None:
+            return self.MODEL(**result)
+        return result
+
+    def _fetch_row_set(self, sql, params):
+        """Run a listing query on the read-only fast path, returning a RowSet instead of Tasks"""
+        column_names, rows = self._fetch_rows(sql, params)
+        return RowSet.from_rows(self.MODEL, column_names, rows)
+
+    @reads_from_replica
+    def get_all(self, query=None, offset: int = 0, limit: int = None, columns=None, read_only: bool = False):
+        """Get all tasks with optional query parameters and pagination.
+
+        When `columns` is given only those columns are selected, and rows are returned as dicts.
+        With `read_only`, full rows are returned as a RowSet instead of Task models.
+        """
         if query is None:
             query = {}
 
@@ -20,20 +61,14 @@ class TaskRepository(BaseRepository):
         # return self.get_many(query, offset=offset, limit=limit)
 
         # Build the WHERE clause from the query dict
-        where_conditions = []
-        params = []
-        for key, value in query.items():
-            where_conditions.append(f"{key} = %s")
-            params.append(value)
-
-        where_clause = " AND ".join(where_conditions) if where_conditions else "1=1"
+        where_clause, params = self._build_where_clause(query)
 
         # Build the complete SQL query with ordering
         sql = f"""
-            SELECT *
+            SELECT {self._build_select_list(columns)}
             FROM task
             WHERE {where_clause}
-            ORDER BY created_at DESC
+            ORDER BY created_at DESC, entity_id DESC
         """
 
         # Add pagination if specified
@@ -44,11 +79,158 @@ class TaskRepository(BaseRepository):
             sql += " OFFSET %s"
             params.append(offset)
 
+        if read_only and columns is None:
+            return self._fetch_row_set(sql, tuple(params))
+
         # Execute the query
+        with self.adapter:
+            results = self.adapter.execute_query(sql, tuple(params))
+            return [self._hydrate(result, columns) for result in results]
+
+    @reads_from_replica
+    def get_page_after(self, query=None, after=None, limit: int = None, columns=None, read_only: bool = False):
+        """Get tasks ordered like `get_all`, seeking past the `(created_at, entity_id)` key in `after`.
+
+        Unlike OFFSET, the row comparison lets Postgres start reading right after the
+        previous page, so deep pages cost the same as the first one.
+        """
+        if query is None:
+            query = {}
+
+        where_clause, params = self._build_where_clause(query)
+        if after is not None:
+            where_clause += " AND (created_at, entity_id) < (%s, %s)"
+            params.extend(after)
+
+        sql = f"""
+            SELECT {self._build_select_list(columns)}
+            FROM task
+            WHERE {where_clause}
+            ORDER BY created_at DESC, entity_id DESC
+        """
+
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+
+        if read_only and columns is None:
+            return self._fetch_row_set(sql, tuple(params))
+
+        with self.adapter:
+            results = self.adapter.execute_query(sql, tuple(params))
+            return [self._hydrate(result, columns) for result in results]
+
+    @reads_from_replica
+    def search(self, person_id, q, limit: int = 20, cursor=None, is_completed=None, columns=None):
+        """Full-text search over a person's task titles and descriptions, best matches first.
+
+        `cursor` is the `(rank, entity_id)` of the last result of the previous page.
+        Returns a list of `(task, rank)` tuples.
+        """
+        where_clause, params = self._build_where_clause(
+            {"person_id": person_id}
+            if is_completed is None
+            else {"person_id": person_id, "is_completed": is_completed}
+        )
+
+        seek_clause = ""
+        seek_params = []
+        if cursor is not None:
+            seek_clause = "WHERE (search_rank, entity_id) < (%s, %s)"
+            seek_params = list(cursor)
+
+        # `task.*` rather than `*`, which would also pick up the `query` column.
+        select_list = "task.*" if columns is None else self._build_select_list(columns)
+
+        # The rank is cast to float8 so it round-trips exactly through the cursor.
+        sql = f"""
+            SELECT *
+            FROM (
+                SELECT {select_list}, ts_rank({TASK_SEARCH_VECTOR}, query)::float8 AS search_rank
+                FROM task, websearch_to_tsquery('english', %s) AS query
+                WHERE {TASK_SEARCH_VECTOR} @@ query AND {where_clause}
+            ) AS ranked
+            {seek_clause}
+            ORDER BY search_rank DESC, entity_id DESC
+            LIMIT %s
+        """
+        params = [q] + params + seek_params + [limit]
+
+        with self.adapter:
+            results = self.adapter.execute_query(sql, tuple(params))
+
+        ranked_tasks = []
+        for result in results:
+            rank = result.pop("search_rank")
+            ranked_tasks.append((self._hydrate(result, columns), rank))
+        return ranked_tasks
+
+    @reads_from_replica
+    def get_changed_since(self, person_id, after=None, until=None, limit: int = 100):
+        """Get a person's tasks changed after the `(changed_on, entity_id)` key in `after`, oldest change first.
+
+        Soft-deleted tasks are included, so callers can report deletions. Only changes made
+        up to `until` are returned when it is given.
+        """
+        where_conditions = ["person_id = %s"]
+        params = [person_id]
+        if after is not None:
+            where_conditions.append("(changed_on, entity_id) > (%s, %s)")
+            params.extend(after)
+        if until is not None:
+            where_conditions.append("changed_on <= %s")
+            params.append(until)
+
+        sql = f"""
+            SELECT *
+            FROM task
+            WHERE {" AND ".join(where_conditions)}
+            ORDER BY changed_on, entity_id
+            LIMIT %s
+        """
+        params.append(limit)
+
         with self.adapter:
             results = self.adapter.execute_query(sql, tuple(params))
             return [self.MODEL(**result) for result in results]
 
+    def iter_all(self, query=None, batch_size: int = 500):
+        """Yield matching task rows as dicts, newest first, through a named server-side cursor.
+
+        Rows are pulled from Postgres `batch_size` at a time, so memory use does not
+        grow with the number of tasks.
+        """
+        if query is None:
+            query = {}
+
+        where_clause, params = self._build_where_clause(query)
+        sql = f"""
+            SELECT *
+            FROM task
+            WHERE {where_clause}
+            ORDER BY created_at DESC, entity_id DESC
+        """
+
+        with self.adapter:
+            connection = self.adapter._connection
+            cursor = connection.cursor(name=f"task_export_{uuid.uuid4().hex}")
+            cursor.itersize = batch_size
+            try:
+                cursor.execute(sql, tuple(params))
+                column_names = None
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    if column_names is None:
+                        column_names = [desc[0] for desc in cursor.description]
+                    for row in rows:
+                        yield dict(zip(column_names, row))
+            finally:
+                cursor.close()
+                # Named cursors live inside a transaction; end it so the connection is clean.
+                connection.rollback()
+
     def get_by_id(self, task_id):
         """Get a task by its ID"""
         return self.get_one({"entity_id": task_id})
@@ -68,6 +250,7 @@ class TaskRepository(BaseRepository):
         task = self.MODEL(**task_data)
         return self.save(task)
 
+    @uses_primary
     def update(self, task_id, task_data):
         """Update an existing task"""
         task = self.get_by_id(task_id)
@@ -77,6 +260,7 @@ class TaskRepository(BaseRepository):
             return self.save(task)
         return None
 
+    @uses_primary
     def delete(self, task_id):
         """Delete a task"""
         task = self.get_by_id(task_id)
@@ -84,7 +268,204 @@ class TaskRepository(BaseRepository):
             return super().delete(task)
         return None
 
+    def _update_owned(self, task_id, person_id, assignments, params, expected_versions=None):
+        """Apply `assignments` to the person's active task and bump its version in a single statement.
+
+        The locked current row is copied to task_audit by the same statement, as `save` does
+        in its transaction. When `expected_versions` is given, the task is only changed if its
+        current version is one of them. Returns the updated task, or None if nothing matched.
+        """
+        version_condition = ""
+        condition_params = [task_id, person_id]
+        if expected_versions is not None:
+            version_condition = "AND version = ANY(%s)"
+            condition_params.append(list(expected_versions))
+
+        sql = f"""
+            WITH locked AS (
+                SELECT * FROM task
+                WHERE entity_id = %s AND person_id = %s AND active = true {version_condition}
+                FOR UPDATE
+            ), audit AS (
+                INSERT INTO task_audit SELECT * FROM locked
+            )
+            UPDATE task
+            SET {", ".join(assignments)},
+                previous_version = task.version,
+                version = %s,
+                changed_on = %s,
+                changed_by_id = %s
+            FROM locked
+            WHERE task.entity_id = locked.entity_id
+            RETURNING task.*
+        """
+        params = (
+            condition_params
+            + list(params)
+            + [uuid.uuid4().hex, datetime.utcnow(), self.user_id or person_id]
+        )
+
+        results = self._execute_returning(sql, tuple(params))
+        if not results:
+            identity_map.forget(self.table_name, task_id)
+            return None
+
+        task = self.MODEL(**results[0])
+        identity_map.remember_saved(self.table_name, task)
+        return task
+
+    def update_owned(self, task_id, person_id, task_data, expected_versions=None):
+        """Update a task only if it belongs to the person, without reading it first"""
+        # Run the values through model validation so they are type-checked and cast like in `save`.
+        probe = self.MODEL(**{"person_id": person_id, "title": "", **task_data})
+        probe.validate()
+
+        task_data = {key: getattr(probe, key) for key in task_data}
+        task_data["updated_at"] = datetime.utcnow()
+
+        assignments = [f"{key} = %s" for key in task_data]
+        return self._update_owned(
+            task_id, person_id, assignments, task_data.values(), expected_versions
+        )
+
+    def delete_owned(self, task_id, person_id, expected_versions=None):
+        """Soft-delete a task only if it belongs to the person, without reading it first"""
+        return self._update_owned(
+            task_id, person_id, ["active = false"], [], expected_versions
+        )
+
+    def get_by_ids_for_person(self, person_id, task_ids):
+        """Get the active tasks among `task_ids` that belong to the person, keyed by entity_id"""
+        if not task_ids:
+            return {}
+
+        sql = """
+            SELECT *
+            FROM task
+            WHERE person_id = %s AND entity_id = ANY(%s) AND active = true
+        """
+
+        with self.adapter:
+            results = self.adapter.execute_query(sql, (person_id, list(task_ids)))
+            return {result["entity_id"]: self.MODEL(**result) for result in results}
+
+    @uses_primary
+    def save_many_for_person(self, person_id, task_ids, prepare):
+        """Lock the person's active tasks among `task_ids`, let `prepare` change them, and save
+        the tasks it returns, all in one transaction.
+
+        `prepare` is called with the locked tasks keyed by entity_id. The rows stay locked
+        (SELECT ... FOR UPDATE) until the commit, so the ownership and versions `prepare`
+        sees cannot change before its tasks are written.
+        """
+        sql = """
+            SELECT *
+            FROM task
+            WHERE person_id = %s AND entity_id = ANY(%s) AND active = true
+            ORDER BY entity_id
+            FOR UPDATE
+        """
+
+        with self.adapter:
+            try:
+                owned_tasks = {}
+                if task_ids:
+                    self.adapter._call_cursor('execute', sql, (person_id, list(task_ids)))
+                    column_names = [desc[0] for desc in self.adapter._cursor.description]
+                    for row in self.adapter._call_cursor('fetchall'):
+                        task = self.MODEL(**dict(zip(column_names, row)))
+                        owned_tasks[task.entity_id] = task
+
+                tasks = prepare(owned_tasks)
+                if tasks:
+                    self.adapter.run_transaction(self._get_save_many_queries(tasks))
+                else:
+                    self.adapter._connection.rollback()
+            except Exception:
+                self.adapter._connection.rollback()
+                raise
+
+        for task in tasks:
+            identity_map.remember_saved(self.table_name, task)
+        return tasks
+
+    def _get_save_many_queries(self, tasks):
+        """The audit copy and multi-row upsert statements saving `tasks`"""
+        rows = [self._process_data_before_save(task) for task in tasks]
+        columns = list(rows[0].keys())
+
+        row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        update_columns = ", ".join(
+            f"{column} = EXCLUDED.{column}" for column in columns if column != "entity_id"
+        )
+
+        move_to_audit_query = (
+            "INSERT INTO task_audit (SELECT * FROM task WHERE entity_id = ANY(%s))",
+            ([row["entity_id"] for row in rows],),
+        )
+        upsert_query = (
+            f"INSERT INTO task ({', '.join(columns)}) "
+            f"VALUES {', '.join([row_placeholder] * len(rows))} "
+            f"ON CONFLICT (entity_id) DO UPDATE SET {update_columns}",
+            tuple(row[column] for row in rows for column in columns),
+        )
+        return [move_to_audit_query, upsert_query]
+
+    @reads_from_replica
+    def get_all_with_total(self, query=None, offset: int = 0, limit: int = None, columns=None, read_only: bool = False):
+        """Get one page of tasks together with the total number of matching tasks in a single statement.
+
+        With `read_only`, full rows are returned as a RowSet instead of Task models.
+        """
+        if query is None:
+            query = {}
+
+        where_clause, params = self._build_where_clause(query)
+
+        # The window count is computed over all matching rows before LIMIT/OFFSET apply.
+        sql = f"""
+            SELECT {self._build_select_list(columns)}, count(*) OVER () AS total_count
+            FROM task
+            WHERE {where_clause}
+            ORDER BY created_at DESC, entity_id DESC
+        """
+
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+        if offset > 0:
+            sql += " OFFSET %s"
+            params.append(offset)
+
+        if read_only and columns is None:
+            column_names, rows = self._fetch_rows(sql, tuple(params))
+            if not rows and offset > 0:
+                return RowSet.from_rows(self.MODEL, column_names, rows), self.count(query)
+
+            total = rows[0][column_names.index("total_count")] if rows else 0
+            return RowSet.from_rows(self.MODEL, column_names, rows), total
+
+        with self.adapter:
+            results = self.adapter.execute_query(sql, tuple(params))
+
+        if not results:
+            # A page past the end carries no rows to read the window count from.
+            total = self.count(query) if offset > 0 else 0
+            return [], total
+
+        total = results[0]["total_count"]
+        tasks = []
+        for result in results:
+            result.pop("total_count")
+            tasks.append(self._hydrate(result, columns))
+        return tasks, total
+
+    @reads_from_replica
     def count(self, filter_dict):
         """Count records matching the given filter"""
-        results = self.get_many(filter_dict)
-        return len(results)
+        where_clause, params = self._build_where_clause(filter_dict)
+        sql = f"SELECT count(*) AS total_count FROM task WHERE {where_clause}"
+
+        with self.adapter:
+            results = self.adapter.execute_query(sql, tuple(params))
+            return results[0]["total_count"]
@@ -0,0 +1,78 @@
+import json
+
+from rococo.data.postgresql import PostgreSQLAdapter
+
+from common.app_logger import logger
+from common.repositories import identity_map
+
+
+class UnitOfWork:
+    """Queues versioned saves across repositories and writes them in a single transaction.
+
+    Use it as a context manager: saves queued inside the block are flushed when the block
+    exits without an error, and dropped otherwise.
+
+        with repository_factory.unit_of_work() as unit_of_work:
+            unit_of_work.save(person_repo, person)
+            unit_of_work.save(email_repo, email)
+    """
+
+    def __init__(self, db_adapter: PostgreSQLAdapter):
+        self.adapter = db_adapter
+        self._queue = []
+        self._saved = []
+        self._on_commit = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._queue = []
+            self._saved = []
+            self._on_commit = []
+
+    def save(self, repository, instance):
+        """Queue a save of `instance` through `repository`. The instance is versioned and validated right away."""
+        self._queue.extend(repository.get_save_queries(instance))
+        self._saved.append((repository.table_name, instance))
+        return instance
+
+    def on_commit(self, callback):
+        """Call `callback()` once the queued saves are committed, such as to invalidate a cache
+        entry; it is never called if they are rolled back or dropped."""
+        self._on_commit.append(callback)
+
+    def flush(self):
+        """Write all queued saves in one transaction and one round trip."""
+        callbacks, self._on_commit = self._on_commit, []
+        if not self._queue:
+            return
+
+        queries, self._queue = self._queue, []
+        saved, self._saved = self._saved, []
+        with self.adapter:
+            # psycopg2 has no pipeline mode, so the statements are bound client-side and sent
+            # as a single multi-statement execute instead of one round trip per statement.
+            statements = []
+            for query, values in queries:
+                values = [json.dumps(value) if isinstance(value, dict) else value for value in values]
+                statements.append(self.adapter._call_cursor('mogrify', query, values))
+            try:
+                self.adapter._call_cursor('execute', b";\n".join(statements))
+                self.adapter._connection.commit()
+            except Exception:
+                self.adapter._connection.rollback()
+                raise
+
+        for table_name, instance in saved:
+            identity_map.remember_saved(table_name, instance)
+
+        # The data is committed at this point, so a failing callback must not fail the caller.
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.exception(e)
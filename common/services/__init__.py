@@ -5,3 +5,4 @@ from .organization import OrganizationService
 from .person_organization_role import PersonOrganizationRoleService
 from .auth import AuthService
 from .task import TaskService
+from .container import get_service
@@ -13,17 +13,19 @@ from common.models import (
     PersonOrganizationRole,
 )
 from common.models.login_method import LoginMethodType
+from common.repositories.factory import get_repository_factory
+from common.services.container import get_service
+from common.services.caches import roles_version_cache
 from common.tasks.send_message import MessageSender
+from common.utils.password_hashing import password_hasher
 from common.app_logger import logger
 
-from werkzeug.security import check_password_hash
-
 import jwt
 import time
 
-from app.helpers.string_utils import urlsafe_base64_encode, force_bytes
-from app.helpers.string_utils import force_str, urlsafe_base64_decode
-from app.helpers.exceptions import InputValidationError, APIException
+from common.utils.string_utils import urlsafe_base64_encode, force_bytes
+from common.utils.string_utils import force_str, urlsafe_base64_decode
+from common.exceptions import InputValidationError, APIException
 
 
 class AuthService:
@@ -34,12 +36,13 @@ class AuthService:
             config.QUEUE_NAME_PREFIX + config.EMAIL_SERVICE_PROCESSOR_QUEUE_NAME
         )
 
-        self.person_service = PersonService(config)
-        self.email_service = EmailService(config)
-        self.login_method_service = LoginMethodService(config)
-        self.organization_service = OrganizationService(config)
-        self.person_organization_role_service = PersonOrganizationRoleService(config)
+        self.person_service = get_service(PersonService, config)
+        self.email_service = get_service(EmailService, config)
+        self.login_method_service = get_service(LoginMethodService, config)
+        self.organization_service = get_service(OrganizationService, config)
+        self.person_organization_role_service = get_service(PersonOrganizationRoleService, config)
 
+        self.repository_factory = get_repository_factory(config)
         self.message_sender = MessageSender()
 
     def signup(self, email, first_name, last_name):
@@ -69,15 +72,21 @@ class AuthService:
             role="admin",
         )
 
-        email = self.email_service.save_email(email)
-        person = self.person_service.save_person(person)
-        login_method = self.login_method_service.save_login_method(login_method)
-        organization = self.organization_service.save_organization(organization)
-        person_organization_role = (
-            self.person_organization_role_service.save_person_organization_role(
-                person_organization_role
+        # All five rows and their audit entries are written in one transaction.
+        with self.repository_factory.unit_of_work() as unit_of_work:
+            email = self.email_service.save_email(email, unit_of_work)
+            person = self.person_service.save_person(person, unit_of_work)
+            login_method = self.login_method_service.save_login_method(
+                login_method, unit_of_work
+            )
+            organization = self.organization_service.save_organization(
+                organization, unit_of_work
+            )
+            person_organization_role = (
+                self.person_organization_role_service.save_person_organization_role(
+                    person_organization_role, unit_of_work
+                )
             )
-        )
 
         self.send_welcome_email(login_method, person, email.email)
 
@@ -118,26 +127,33 @@ class AuthService:
             self.message_sender.send_message(self.EMAIL_TRANSMITTER_QUEUE_NAME, message)
 
     def login_user_by_email_password(self, email: str, password: str):
-        email_obj = self.email_service.get_email_by_email_address(email)
-        if not email_obj:
+        identity = self.login_method_service.get_identity_by_email_address(email)
+        if not identity:
             raise InputValidationError("Email is not registered.")
 
-        login_method = self.login_method_service.get_login_method_by_email_id(
-            email_obj.entity_id
-        )
-        if not check_password_hash(login_method.password, password):
+        _, login_method, person = identity
+        if not login_method or not password_hasher.check_password(login_method.password, password):
             raise InputValidationError("Incorrect email or password.")
 
         access_token, expiry = self.generate_access_token(login_method)
 
-        return access_token, expiry
+        return access_token, expiry, person
 
     def generate_access_token(self, login_method: LoginMethod) -> str:
         expiry = time.time() + int(self.config.ACCESS_TOKEN_EXPIRE)
+
+        # Organization roles travel in the token so that `has_role` needs no lookup. `rv` is the
+        # roles version they were read at; a token whose version is no longer current is rejected.
+        role_map = self.person_organization_role_service.get_role_map_by_person_id(login_method.person_id)
+        roles_version = self.person_organization_role_service.get_roles_version(role_map)
+        roles_version_cache.set(login_method.person_id, roles_version)
+
         token = jwt.encode(
             {
                 "email_id": login_method.email_id,
                 "person_id": login_method.person_id,
+                "roles": role_map,
+                "rv": roles_version,
                 "exp": expiry,
             },
             self.config.AUTH_JWT_SECRET,
@@ -167,17 +183,14 @@ class AuthService:
             return
 
     def trigger_forgot_password_email(self, email: str):
-        email_obj = self.email_service.get_email_by_email_address(email)
-        if not email_obj:
+        identity = self.login_method_service.get_identity_by_email_address(email)
+        if not identity:
             raise APIException("Email is not registered.")
 
-        person = self.person_service.get_person_by_id(email_obj.person_id)
+        email_obj, login_method, person = identity
         if not person:
             raise APIException("Person does not exist.")
 
-        login_method = self.login_method_service.get_login_method_by_email_id(
-            email_obj.entity_id
-        )
         if not login_method:
             raise APIException("Login method does not exist.")
 
@@ -200,22 +213,22 @@ class AuthService:
         )
 
         login_method_id = force_str(urlsafe_base64_decode(uidb64))
-        login_method = self.login_method_service.get_login_method_by_id(login_method_id)
+        identity = self.login_method_service.get_identity_by_login_method_id(login_method_id)
 
-        if not login_method:
+        if not identity:
             raise APIException("Invalid password reset URL.")
 
+        email_obj, login_method, person_obj = identity
+
         parsed_token = self.parse_reset_password_token(token, login_method)
 
         if not parsed_token:
             raise APIException("Invalid reset password token.")
 
-        email_obj = self.email_service.get_email_by_id(parsed_token["email_id"])
-        if not email_obj:
+        if email_obj.entity_id != parsed_token["email_id"]:
             raise APIException("Email not found.")
 
-        person_obj = self.person_service.get_person_by_id(parsed_token["person_id"])
-        if not person_obj:
+        if not person_obj or person_obj.entity_id != parsed_token["person_id"]:
             raise APIException("Person with email not found.")
 
         login_method = self.login_method_service.update_password(
@@ -0,0 +1,40 @@
+import uuid
+
+from common.app_config import config
+from common.utils.cache import MISSING, ModelCache
+
+# Models looked up on every authenticated request, cached per process (see ModelCache).
+
+# Person and email of the access token, keyed by their entity_id.
+person_cache = ModelCache(maxsize=config.IDENTITY_CACHE_MAX_SIZE, ttl=config.IDENTITY_CACHE_TTL)
+email_cache = ModelCache(maxsize=config.IDENTITY_CACHE_MAX_SIZE, ttl=config.IDENTITY_CACHE_TTL)
+
+# Organizations of org-scoped requests, keyed by entity_id, and the requester's role in them, keyed
+# by (person_id, organization_id). The role is None when the person is not a member. Kept apart so
+# that saving an organization or a role invalidates a single key.
+organization_cache = ModelCache(maxsize=config.MEMBERSHIP_CACHE_MAX_SIZE, ttl=config.MEMBERSHIP_CACHE_TTL)
+organization_role_cache = ModelCache(
+    maxsize=config.MEMBERSHIP_CACHE_MAX_SIZE, ttl=config.MEMBERSHIP_CACHE_TTL, cache_none=True
+)
+
+# Current roles version of each person, as carried in the `rv` claim of access tokens.
+roles_version_cache = ModelCache(maxsize=config.ROLES_VERSION_CACHE_MAX_SIZE, ttl=config.ROLES_VERSION_CACHE_TTL)
+
+
+def get_or_load_membership(person_id: str, organization_id: str, load):
+    """The `(organization, role)` of a person in an organization from the caches, or from `load()`
+    when either is missing. Returns None if the organization does not exist.
+
+    The organization ID may be given in any form `uuid.UUID` accepts; it is keyed by its hex form,
+    the one that saves invalidate."""
+    organization_id = uuid.UUID(organization_id).hex
+    organization = organization_cache.get(organization_id)
+    role = organization_role_cache.get((person_id, organization_id))
+    if organization is not MISSING and role is not MISSING:
+        return organization, role
+
+    membership = load()
+    if membership is not None:
+        organization_cache.set(organization_id, membership[0])
+        organization_role_cache.set((person_id, organization_id), membership[1])
+    return membership
@@ -0,0 +1,23 @@
+import threading
+
+# Services are stateless, but the PostgreSQLAdapter inside each repository keeps the
+# connection and cursor of the call in progress on itself, so instances are shared
+# per worker thread rather than across the whole process.
+_local = threading.local()
+
+
+def get_service(service_class, config):
+    """Return the current thread's instance of `service_class`, building it on first use."""
+    services = getattr(_local, "services", None)
+    if services is None:
+        services = _local.services = {}
+
+    service = services.get(service_class)
+    if service is None:
+        service = services[service_class] = service_class(config)
+    return service
+
+
+def clear_services():
+    """Drop the current thread's service instances, e.g. after the config changed in tests."""
+    _local.services = {}
@@ -1,16 +1,23 @@
-from common.repositories.factory import RepositoryFactory, RepoType
+from common.repositories.factory import get_repository_factory, RepoType
+from common.repositories.unit_of_work import UnitOfWork
 from common.models import Email
+from common.services.caches import email_cache
 
 
 class EmailService:
 
     def __init__(self, config):
         self.config = config
-        self.repository_factory = RepositoryFactory(config)
+        self.repository_factory = get_repository_factory(config)
         self.email_repo = self.repository_factory.get_repository(RepoType.EMAIL)
 
-    def save_email(self, email: Email):
-        email = self.email_repo.save(email)
+    def save_email(self, email: Email, unit_of_work: UnitOfWork = None):
+        if unit_of_work is not None:
+            email = unit_of_work.save(self.email_repo, email)
+            unit_of_work.on_commit(lambda: email_cache.invalidate(email.entity_id))
+        else:
+            email = self.email_repo.save(email)
+            email_cache.invalidate(email.entity_id)
         return email
 
     def get_email_by_email_address(self, email_address: str):
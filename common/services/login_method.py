@@ -1,4 +1,5 @@
-from common.repositories.factory import RepositoryFactory, RepoType
+from common.repositories.factory import get_repository_factory, RepoType
+from common.repositories.unit_of_work import UnitOfWork
 from common.models import LoginMethod
 from common.models.login_method import LoginMethodType
 
@@ -7,11 +8,14 @@ class LoginMethodService:
 
     def __init__(self, config):
         self.config = config
-        self.repository_factory = RepositoryFactory(config)
+        self.repository_factory = get_repository_factory(config)
         self.login_method_repo = self.repository_factory.get_repository(RepoType.LOGIN_METHOD)
 
-    def save_login_method(self, login_method: LoginMethod):
-        login_method = self.login_method_repo.save(login_method)
+    def save_login_method(self, login_method: LoginMethod, unit_of_work: UnitOfWork = None):
+        if unit_of_work is not None:
+            login_method = unit_of_work.save(self.login_method_repo, login_method)
+        else:
+            login_method = self.login_method_repo.save(login_method)
         return login_method
 
     def get_login_method_by_email_id(self, email_id: str):
@@ -22,6 +26,14 @@ class LoginMethodService:
         login_method = self.login_method_repo.get_one({"entity_id": entity_id})
         return login_method
 
+    def get_identity_by_email_address(self, email_address: str):
+        """Get the `(email, login_method, person)` of an email address in one query, or None."""
+        return self.login_method_repo.get_identity_by_email_address(email_address)
+
+    def get_identity_by_login_method_id(self, entity_id: str):
+        """Get the `(email, login_method, person)` of a login method in one query, or None."""
+        return self.login_method_repo.get_identity_by_login_method_id(entity_id)
+
     def update_password(self, login_method: LoginMethod, password: str) -> LoginMethod:
         login_method.password = password
         return self.login_method_repo.save(login_method)
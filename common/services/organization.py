@@ -1,22 +1,48 @@
-from common.repositories.factory import RepositoryFactory, RepoType
+from common.repositories.batch_loader import get_batch_loader
+from common.repositories.factory import get_repository_factory, RepoType
+from common.repositories.unit_of_work import UnitOfWork
 from common.models import Organization
+from common.services.caches import organization_cache
 
 
 class OrganizationService:
 
     def __init__(self, config):
         self.config = config
-        self.repository_factory = RepositoryFactory(config)
+        self.repository_factory = get_repository_factory(config)
         self.organization_repo = self.repository_factory.get_repository(RepoType.ORGANIZATION)
+        self.person_organization_role_repo = self.repository_factory.get_repository(RepoType.PERSON_ORGANIZATION_ROLE)
 
-    def save_organization(self, organization: Organization):
-        organization = self.organization_repo.save(organization)
+    def save_organization(self, organization: Organization, unit_of_work: UnitOfWork = None):
+        if unit_of_work is not None:
+            organization = unit_of_work.save(self.organization_repo, organization)
+            unit_of_work.on_commit(lambda: organization_cache.invalidate(organization.entity_id))
+        else:
+            organization = self.organization_repo.save(organization)
+            organization_cache.invalidate(organization.entity_id)
         return organization
 
     def get_organization_by_id(self, entity_id: str):
         organization = self.organization_repo.get_one({"entity_id": entity_id})
         return organization
 
+    def get_latest_organization_by_id(self, entity_id: str):
+        """Get the organization from the primary database, bypassing every cache"""
+        return self.organization_repo.get_latest_by_id(entity_id)
+
     def get_organizations_with_roles_by_person(self, person_id: str):
-        results = self.organization_repo.get_organizations_by_person_id(person_id)
-        return results
+        """Get the person's active organizations as dicts, each with the person's `role` in it.
+
+        The organizations are read through the request's batch loader, so all of them cost one
+        query, and none that the request has already loaded.
+        """
+        person_organization_roles = self.person_organization_role_repo.get_many({"person_id": person_id})
+        loader = get_batch_loader(self.organization_repo)
+        loader.want(*(role.organization_id for role in person_organization_roles))
+
+        organizations = []
+        for person_organization_role in person_organization_roles:
+            organization = loader.get(person_organization_role.organization_id)
+            if organization is not None:
+                organizations.append({**organization.as_dict(), "role": person_organization_role.role})
+        return organizations
@@ -1,5 +1,7 @@
-from common.repositories.factory import RepositoryFactory, RepoType
+from common.repositories.factory import get_repository_factory, RepoType
+from common.repositories.unit_of_work import UnitOfWork
 from common.models.person import Person
+from common.services.caches import person_cache
 
 
 class PersonService:
@@ -8,13 +10,19 @@ class PersonService:
         self.config = config
 
         from common.services import EmailService
-        self.email_service = EmailService(config)
+        from common.services.container import get_service
+        self.email_service = get_service(EmailService, config)
 
-        self.repository_factory = RepositoryFactory(config)
+        self.repository_factory = get_repository_factory(config)
         self.person_repo = self.repository_factory.get_repository(RepoType.PERSON)
 
-    def save_person(self, person: Person):
-        person = self.person_repo.save(person)
+    def save_person(self, person: Person, unit_of_work: UnitOfWork = None):
+        if unit_of_work is not None:
+            person = unit_of_work.save(self.person_repo, person)
+            unit_of_work.on_commit(lambda: person_cache.invalidate(person.entity_id))
+        else:
+            person = self.person_repo.save(person)
+            person_cache.invalidate(person.entity_id)
         return person
 
     def get_person_by_email_address(self, email_address: str):
@@ -27,4 +35,8 @@ class PersonService:
 
     def get_person_by_id(self, entity_id: str):
         person = self.person_repo.get_one({"entity_id": entity_id})
-        return person
\ No newline at end of file
+        return person
+
+    def get_latest_person_by_id(self, entity_id: str):
+        """Get the person from the primary database, bypassing every cache"""
+        return self.person_repo.get_latest_by_id(entity_id)
@@ -1,24 +1,68 @@
-from common.repositories.factory import RepositoryFactory, RepoType
+import hashlib
+import json
+
+from common.repositories.factory import get_repository_factory, RepoType
+from common.repositories.unit_of_work import UnitOfWork
 from common.models import PersonOrganizationRole
+from common.services.caches import organization_role_cache, roles_version_cache
 
 
 class PersonOrganizationRoleService:
 
     def __init__(self, config):
         self.config = config
-        self.repository_factory = RepositoryFactory(config)
+        self.repository_factory = get_repository_factory(config)
         self.person_organization_role_repo = self.repository_factory.get_repository(RepoType.PERSON_ORGANIZATION_ROLE)
 
-    def save_person_organization_role(self, person_organization_role: PersonOrganizationRole):
-        person_organization_role = self.person_organization_role_repo.save(person_organization_role)
+    def save_person_organization_role(
+        self, person_organization_role: PersonOrganizationRole, unit_of_work: UnitOfWork = None
+    ):
+        person_id = person_organization_role.person_id
+        organization_id = person_organization_role.organization_id
+
+        def invalidate_caches():
+            organization_role_cache.invalidate((person_id, organization_id))
+            roles_version_cache.invalidate(person_id)
+
+        if unit_of_work is not None:
+            person_organization_role = unit_of_work.save(
+                self.person_organization_role_repo, person_organization_role
+            )
+            unit_of_work.on_commit(invalidate_caches)
+        else:
+            person_organization_role = self.person_organization_role_repo.save(person_organization_role)
+            invalidate_caches()
         return person_organization_role
 
     def get_roles_by_person_id(self, person_id: str):
         person_organization_roles = self.person_organization_role_repo.get_many({"person_id": person_id})
-        
+        return person_organization_roles
+
+    def get_role_map_by_person_id(self, person_id: str):
+        """Get the person's roles as an `{organization_id: role}` dict"""
+        return {
+            person_organization_role.organization_id: person_organization_role.role
+            for person_organization_role in self.get_roles_by_person_id(person_id)
+        }
+
+    @staticmethod
+    def get_roles_version(role_map: dict):
+        """A short digest of a role map; it changes whenever any of the person's roles change."""
+        payload = json.dumps(role_map, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+    def get_roles_version_by_person_id(self, person_id: str):
+        return roles_version_cache.get_or_load(
+            person_id, lambda: self.get_roles_version(self.get_role_map_by_person_id(person_id))
+        )
+
     def get_role_of_person_in_organization(self, person_id: str, organization_id: str):
         person_organization_role = self.person_organization_role_repo.get_one({
             "person_id": person_id,
             "organization_id": organization_id
         })
-        return person_organization_role
\ No newline at end of file
+        return person_organization_role
+
+    def get_membership(self, person_id: str, organization_id: str):
+        """Get the `(organization, role)` of a person in an organization"""
+        return self.person_organization_role_repo.get_membership(person_id, organization_id)
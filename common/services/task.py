@@ -1,13 +1,31 @@
-from common.repositories.factory import RepositoryFactory, RepoType
+from common.repositories.factory import get_repository_factory, RepoType
 from common.models.task import Task
+from common.utils.pagination import (
+    encode_cursor,
+    decode_cursor,
+    encode_rank_cursor,
+    decode_rank_cursor,
+)
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from rococo.models.versioned_model import ModelValidationError
+
+from common.exceptions import InputValidationError, PreconditionFailedError
+
+MAX_BATCH_SIZE = 100
+MAX_PAGE_SIZE = 100
+
+# Changes newer than this are held back from the change feed, so a write that commits
+# slightly after a later one cannot slip behind a watermark that was already handed out.
+CHANGE_FEED_SETTLE_SECONDS = 5
+BATCH_ACTIONS = ("create", "update", "delete")
 
 
 class TaskService:
     def __init__(self, config):
         self.config = config
-        self.repository_factory = RepositoryFactory(config)
+        self.repository_factory = get_repository_factory(config)
         self.task_repo = self.repository_factory.get_repository(RepoType.TASK)
 
     def create_task(self, title: str, person_id: str, description: str = None) -> Task:
@@ -47,6 +65,193 @@ class TaskService:
             query["is_completed"] = is_completed
         return self.task_repo.get_all(query, offset=offset, limit=limit)
 
+    @staticmethod
+    def _check_limit(limit: int, maximum: int, name: str):
+        if isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= maximum:
+            raise InputValidationError(f"'{name}' must be between 1 and {maximum}.")
+
+    @staticmethod
+    def _get_columns(fields: list, *required: str) -> list:
+        """Column list for a sparse fieldset, always including entity_id and the `required` columns.
+
+        Returns None when no fieldset is requested, meaning full Task models.
+        """
+        if fields is None:
+            return None
+
+        unknown_fields = [field for field in fields if field not in Task.fields()]
+        if unknown_fields:
+            raise InputValidationError(f"Unknown task fields: {', '.join(unknown_fields)}.")
+        return list(dict.fromkeys(["entity_id", *required, *fields]))
+
+    def get_tasks_with_total_by_person(
+        self,
+        person_id: str,
+        is_completed: bool = None,
+        offset: int = 0,
+        limit: int = None,
+        fields: list = None,
+    ) -> tuple:
+        """Get a page of a person's tasks and the total count of their matching tasks in one query.
+
+        When `fields` is given, only those fields (plus entity_id) are read, and the tasks
+        are returned as plain dicts; otherwise they are returned as a read-only RowSet.
+
+        Returns:
+            tuple: The tasks of the page and the total number of matching tasks.
+        """
+        self._check_limit(limit, MAX_PAGE_SIZE, "per_page")
+        if offset < 0:
+            raise InputValidationError("'offset' cannot be negative.")
+
+        query = {"person_id": person_id}
+        if is_completed is not None:
+            query["is_completed"] = is_completed
+        return self.task_repo.get_all_with_total(
+            query, offset=offset, limit=limit, columns=self._get_columns(fields), read_only=True
+        )
+
+    def get_tasks_page_by_person(
+        self,
+        person_id: str,
+        is_completed: bool = None,
+        cursor: str = None,
+        limit: int = 20,
+        fields: list = None,
+    ) -> tuple:
+        """Get one keyset-paginated page of a person's tasks.
+
+        Args:
+            person_id (str): The ID of the person owning the tasks.
+            is_completed (bool, optional): Filter by completion status. Defaults to None.
+            cursor (str, optional): The `next_cursor` of the previous page. Defaults to None,
+                which returns the first page.
+            limit (int, optional): The page size. Defaults to 20.
+            fields (list, optional): A sparse fieldset; tasks are then returned as dicts. Defaults to None,
+                which returns the tasks as a read-only RowSet.
+
+        Returns:
+            tuple: The tasks of the page and the cursor of the next page, or None on the last page.
+        """
+        self._check_limit(limit, MAX_PAGE_SIZE, "per_page")
+
+        query = {"person_id": person_id}
+        if is_completed is not None:
+            query["is_completed"] = is_completed
+
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                raise InputValidationError("Invalid pagination cursor.")
+
+        # The sort key is always read, since the next cursor is built from it.
+        columns = self._get_columns(fields, "created_at")
+
+        # Fetch one extra row to know whether another page follows.
+        tasks = self.task_repo.get_page_after(
+            query, after=after, limit=limit + 1, columns=columns, read_only=True
+        )
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            last_task = tasks[-1]
+            next_cursor = encode_cursor(last_task["created_at"], last_task["entity_id"])
+
+        if columns is not None and "created_at" not in fields:
+            for task in tasks:
+                del task["created_at"]
+        return tasks, next_cursor
+
+    def search_tasks_by_person(
+        self,
+        person_id: str,
+        q: str,
+        is_completed: bool = None,
+        cursor: str = None,
+        limit: int = 20,
+        fields: list = None,
+    ) -> tuple:
+        """Search a person's tasks by title and description, ranked by relevance.
+
+        Args:
+            person_id (str): The ID of the person owning the tasks.
+            q (str): The search text, in web search syntax (quotes, `or`, `-word`).
+            is_completed (bool, optional): Filter by completion status. Defaults to None.
+            cursor (str, optional): The `next_cursor` of the previous page. Defaults to None.
+            limit (int, optional): The page size. Defaults to 20.
+            fields (list, optional): A sparse fieldset; tasks are then returned as dicts. Defaults to None.
+
+        Returns:
+            tuple: The matching tasks of the page and the cursor of the next page, or None on the last page.
+        """
+        self._check_limit(limit, MAX_PAGE_SIZE, "per_page")
+
+        after = None
+        if cursor:
+            try:
+                after = decode_rank_cursor(cursor)
+            except ValueError:
+                raise InputValidationError("Invalid pagination cursor.")
+
+        columns = self._get_columns(fields)
+        ranked_tasks = self.task_repo.search(
+            person_id, q, limit=limit + 1, cursor=after, is_completed=is_completed, columns=columns
+        )
+        next_cursor = None
+        if len(ranked_tasks) > limit:
+            ranked_tasks = ranked_tasks[:limit]
+            last_task, last_rank = ranked_tasks[-1]
+            last_entity_id = last_task.entity_id if columns is None else last_task["entity_id"]
+            next_cursor = encode_rank_cursor(last_rank, last_entity_id)
+        return [task for task, _ in ranked_tasks], next_cursor
+
+    def get_task_changes_by_person(
+        self, person_id: str, watermark: str = None, limit: int = 100
+    ) -> dict:
+        """Get a person's task changes since a watermark, for delta sync.
+
+        Args:
+            person_id (str): The ID of the person owning the tasks.
+            watermark (str, optional): The `watermark` of the previous call. Defaults to None,
+                which starts from the first change.
+            limit (int, optional): The maximum number of changes to return, from 1 to
+                MAX_BATCH_SIZE. Defaults to 100.
+
+        Returns:
+            dict: The changed active tasks under `changed`, the IDs of deleted tasks under `deleted`,
+                the `watermark` to pass next time and whether more changes are pending under `has_more`.
+        """
+        # A limit of 0 would report has_more with an unchanged watermark forever.
+        self._check_limit(limit, MAX_BATCH_SIZE, "limit")
+
+        after = None
+        if watermark:
+            try:
+                after = decode_cursor(watermark)
+            except ValueError:
+                raise InputValidationError("Invalid watermark.")
+
+        until = datetime.utcnow() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+        tasks = self.task_repo.get_changed_since(person_id, after=after, until=until, limit=limit + 1)
+
+        has_more = len(tasks) > limit
+        tasks = tasks[:limit]
+        if tasks:
+            watermark = encode_cursor(tasks[-1].changed_on, tasks[-1].entity_id)
+
+        return {
+            "changed": [task for task in tasks if task.active],
+            "deleted": [task.entity_id for task in tasks if not task.active],
+            "watermark": watermark,
+            "has_more": has_more,
+        }
+
+    def export_tasks_by_person(self, person_id: str, batch_size: int = 500):
+        """Iterate over all of a person's tasks as plain row dicts, without loading them all at once."""
+        return self.task_repo.iter_all({"person_id": person_id}, batch_size=batch_size)
+
     def count_tasks_by_person(self, person_id: str, is_completed: bool = None) -> int:
         query = {"person_id": person_id}
         if is_completed is not None:
@@ -70,6 +275,167 @@ class TaskService:
 
         return self.task_repo.update(task_id, task_data)
 
+    def update_task_for_person(
+        self,
+        task_id: str,
+        person_id: str,
+        title: str = None,
+        description: str = None,
+        is_completed: bool = None,
+        expected_versions: list = None,
+    ) -> Task:
+        """Update a task owned by the person in a single statement.
+
+        Args:
+            expected_versions (list, optional): Only update the task if its current version
+                is one of these, e.g. the ETags of an If-Match header. Defaults to None.
+
+        Raises:
+            PreconditionFailedError: If the task exists but its version does not match.
+
+        Returns:
+            Task: The updated task, or None if the person owns no such task.
+        """
+        task_data = {}
+        if title is not None:
+            task_data["title"] = title
+        if description is not None:
+            task_data["description"] = description
+        if is_completed is not None:
+            task_data["is_completed"] = is_completed
+
+        task = self.task_repo.update_owned(task_id, person_id, task_data, expected_versions)
+        if task is None and expected_versions is not None:
+            self._raise_if_version_conflict(task_id, person_id)
+        return task
+
+    def delete_task_for_person(
+        self, task_id: str, person_id: str, expected_versions: list = None
+    ) -> bool:
+        task = self.task_repo.delete_owned(task_id, person_id, expected_versions)
+        if task is None and expected_versions is not None:
+            self._raise_if_version_conflict(task_id, person_id)
+        return task is not None
+
+    def _raise_if_version_conflict(self, task_id: str, person_id: str):
+        # Only reached when a conditional write matched nothing, to tell a stale version from a missing task.
+        if self.task_repo.get_by_ids_for_person(person_id, [task_id]):
+            raise PreconditionFailedError("Task has been modified since it was fetched.")
+
+    @staticmethod
+    def _check_batch_operation(operation: dict) -> str:
+        """The error message of a malformed batch operation, or None if it is well-formed"""
+        action = operation.get("action")
+        if action not in BATCH_ACTIONS:
+            return f"'action' must be one of {', '.join(BATCH_ACTIONS)}."
+
+        if action == "create":
+            title = operation.get("title")
+            if not isinstance(title, str) or not title:
+                return "'title' is required and cannot be empty."
+        else:
+            task_id = operation.get("task_id")
+            try:
+                uuid.UUID(task_id)
+            except (TypeError, ValueError, AttributeError):
+                return "'task_id' must be a valid task ID."
+
+        for key in ("title", "description"):
+            if operation.get(key) is not None and not isinstance(operation[key], str):
+                return f"'{key}' must be a string."
+        if operation.get("is_completed") is not None and not isinstance(operation["is_completed"], bool):
+            return "'is_completed' must be true or false."
+        return None
+
+    def apply_batch(self, person_id: str, operations: list) -> list:
+        """Create, update and delete many of a person's tasks in one transaction.
+
+        The referenced tasks are read and locked with a single query in the same
+        transaction that writes them. An operation that is malformed, fails validation
+        or references a missing task only fails its own result.
+
+        Args:
+            person_id (str): The ID of the person owning the tasks.
+            operations (list): Dicts with an `action` of create, update or delete, a
+                `task_id` for update and delete, and the task fields to write.
+
+        Returns:
+            list: One result dict per operation, in request order.
+        """
+        if len(operations) > MAX_BATCH_SIZE:
+            raise InputValidationError(f"A batch can contain at most {MAX_BATCH_SIZE} operations.")
+
+        results = []
+        checked = []
+        for operation in operations:
+            result = {"action": operation.get("action"), "task_id": operation.get("task_id"), "success": False}
+            results.append(result)
+
+            message = self._check_batch_operation(operation)
+            if message:
+                result["message"] = message
+                continue
+
+            task_id = None if operation["action"] == "create" else uuid.UUID(operation["task_id"]).hex
+            checked.append((result, operation, task_id))
+
+        if not checked:
+            # Nothing to write, so no transaction or row locks are needed.
+            return results
+
+        pending = []
+
+        def prepare(owned_tasks):
+            seen_task_ids = set()
+            now = datetime.utcnow()
+            for result, operation, task_id in checked:
+                action = operation["action"]
+                if action == "create":
+                    task = Task(
+                        title=operation["title"],
+                        description=operation.get("description"),
+                        person_id=person_id,
+                        is_completed=operation.get("is_completed") or False,
+                        changed_by_id=person_id,
+                    )
+                else:
+                    task = owned_tasks.get(task_id)
+                    if not task:
+                        result["message"] = "Task not found"
+                        continue
+                    if task_id in seen_task_ids:
+                        result["message"] = "Task appears more than once in the batch."
+                        continue
+                    seen_task_ids.add(task_id)
+
+                    if action == "update":
+                        for key in ("title", "description", "is_completed"):
+                            if operation.get(key) is not None:
+                                setattr(task, key, operation[key])
+                        task.updated_at = now
+                    else:
+                        task.active = False
+                    task.changed_by_id = person_id
+
+                try:
+                    task.validate()
+                except ModelValidationError as e:
+                    result["message"] = "\n".join(e.errors)
+                    continue
+
+                result["task_id"] = task.entity_id
+                pending.append((result, task))
+            return [task for _, task in pending]
+
+        task_ids = [task_id for _, _, task_id in checked if task_id is not None]
+        self.task_repo.save_many_for_person(person_id, task_ids, prepare)
+
+        for result, task in pending:
+            result["success"] = True
+            if result["action"] != "delete":
+                result["task"] = task.as_dict()
+        return results
+
     def delete_task(self, task_id: str) -> bool:
         return self.task_repo.delete(task_id) is not None
 
@@ -0,0 +1,94 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """A thread-safe, size-bounded LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+MISSING = object()
+
+
+def _copy(value):
+    if isinstance(value, tuple):
+        return tuple(copy.copy(item) for item in value)
+    return copy.copy(value)
+
+
+class ModelCache:
+    """A TTLCache that only ever hands out copies of what it holds.
+
+    Callers may modify the models they get back, so the cached instances are never shared.
+    The cache lives in one process: a write made by another worker is only seen once the
+    entry expires, and every writer in this process must invalidate the keys it changes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, cache_none: bool = False):
+        self.cache_none = cache_none
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key, default=MISSING):
+        value = self._cache.get(key, MISSING)
+        return default if value is MISSING else _copy(value)
+
+    def set(self, key, value):
+        self._cache.set(key, _copy(value))
+
+    def get_or_load(self, key, load):
+        """Return a copy of the value cached for `key`, or call `load()` and cache its result.
+        A None result is only cached with `cache_none`."""
+        value = self.get(key)
+        if value is MISSING:
+            value = load()
+            if value is not None or self.cache_none:
+                self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        self._cache.delete(key)
+
+    def clear(self):
+        self._cache.clear()
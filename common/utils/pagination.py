@@ -0,0 +1,45 @@
+import base64
+import binascii
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, entity_id: str) -> str:
+    """Build an opaque keyset cursor from the sort key of the last row on a page."""
+    raw = f"{created_at.isoformat()}|{entity_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor built by `encode_cursor` into a `(created_at, entity_id)` tuple.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        created_at, entity_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), entity_id
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def encode_rank_cursor(rank: float, entity_id: str) -> str:
+    """Build an opaque keyset cursor for results ordered by relevance rank."""
+    raw = f"{rank!r}|{entity_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).rstrip(b'=').decode('ascii')
+
+
+def decode_rank_cursor(cursor: str):
+    """Decode a cursor built by `encode_rank_cursor` into a `(rank, entity_id)` tuple.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        rank, entity_id = raw.split('|', 1)
+        return float(rank), entity_id
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,95 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from common.app_config import config
+from common.app_logger import logger
+from common.exceptions import ServiceUnavailableError
+
+
+class PasswordHasher:
+    """Runs the CPU-heavy scrypt hashing and verification in a bounded process pool.
+
+    Request threads only wait on the result, so a burst of logins no longer holds the
+    GIL for every other endpoint. At most `workers + max_pending` operations are in
+    flight; beyond that, calls fail fast with a ServiceUnavailableError.
+    With the `inline` backend, hashing runs in the calling thread as before.
+    """
+
+    def __init__(self, backend: str = "process", workers: int = 2, max_pending: int = 16, timeout: float = 10):
+        if backend not in ("process", "inline"):
+            raise ValueError(f"Unknown password hashing backend: {backend}")
+
+        self.backend = backend
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created on first use, so importing this module never starts worker processes.
+        # Workers are not forked from the request process: a fork would copy its threads'
+        # locks and its open database and broker connections into every worker.
+        with self._lock:
+            if self._executor is None:
+                start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(start_method)
+                )
+            return self._executor
+
+    def _reset_executor(self, executor):
+        # Only the broken pool is replaced; another thread may already have created a new one.
+        with self._lock:
+            if self._executor is executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _run(self, func, *args, **kwargs):
+        if self.backend == "inline":
+            return func(*args, **kwargs)
+
+        if not self._slots.acquire(blocking=False):
+            raise ServiceUnavailableError("The server is busy, please try again shortly.")
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(func, *args, **kwargs)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._on_broken_pool(executor)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the worker is done, even if the caller stops waiting.
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except BrokenProcessPool:
+            self._on_broken_pool(executor)
+        except TimeoutError:
+            raise ServiceUnavailableError("The server is busy, please try again shortly.")
+
+    def _on_broken_pool(self, executor):
+        logger.error("Password hashing pool is broken, recreating it.")
+        self._reset_executor(executor)
+        raise ServiceUnavailableError("The server is busy, please try again shortly.")
+
+    def hash_password(self, password: str) -> str:
+        return self._run(generate_password_hash, password, method='scrypt')
+
+    def check_password(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+
+password_hasher = PasswordHasher(
+    backend=config.PASSWORD_HASH_BACKEND,
+    workers=config.PASSWORD_HASH_WORKERS,
+    max_pending=config.PASSWORD_HASH_MAX_PENDING,
+    timeout=config.PASSWORD_HASH_TIMEOUT,
+)
@@ -0,0 +1,123 @@
+import math
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class RateLimitBackend(ABC):
+    """Stores token buckets. `consume` takes one token from the bucket of `key` if it has one.
+
+    Buckets hold up to `capacity` tokens and refill at `refill_rate` tokens per second.
+    Returns an `(allowed, retry_after)` tuple, where retry_after is in seconds.
+    """
+
+    @abstractmethod
+    def consume(self, key: str, capacity: int, refill_rate: float):
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process token buckets with O(1) updates, holding at most `max_keys` buckets (LRU)."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill_rate: float):
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens, updated_at = bucket
+                tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+                self._buckets.move_to_end(key)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        retry_after = 0 if allowed else (1 - tokens) / refill_rate
+        return allowed, retry_after
+
+
+class PostgresRateLimitBackend(RateLimitBackend):
+    """Token buckets in the `rate_limit_bucket` table, shared by every worker process.
+
+    Each check is a single upsert. Rejected requests drain the bucket too (down to -1 token),
+    so sustained abuse stays rejected. Idle buckets are purged now and then.
+    """
+
+    CONSUME_QUERY = """
+        INSERT INTO rate_limit_bucket (bucket_key, tokens, updated_at)
+        VALUES (%(key)s, %(capacity)s - 1, clock_timestamp())
+        ON CONFLICT (bucket_key) DO UPDATE SET
+            tokens = GREATEST(
+                LEAST(
+                    %(capacity)s,
+                    rate_limit_bucket.tokens
+                    + EXTRACT(EPOCH FROM clock_timestamp() - rate_limit_bucket.updated_at) * %(refill_rate)s
+                ) - 1,
+                -1
+            ),
+            updated_at = clock_timestamp()
+        RETURNING tokens
+    """
+    PURGE_QUERY = "DELETE FROM rate_limit_bucket WHERE updated_at < clock_timestamp() - interval '1 day'"
+    PURGE_PROBABILITY = 0.001
+
+    def __init__(self, connection_pool):
+        self.connection_pool = connection_pool
+
+    def consume(self, key: str, capacity: int, refill_rate: float):
+        connection = self.connection_pool.acquire()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    self.CONSUME_QUERY,
+                    {"key": key, "capacity": capacity, "refill_rate": refill_rate},
+                )
+                tokens = cursor.fetchone()[0]
+                if random.random() < self.PURGE_PROBABILITY:
+                    cursor.execute(self.PURGE_QUERY)
+            connection.commit()
+        finally:
+            self.connection_pool.release(connection)
+
+        allowed = tokens >= 0
+        retry_after = 0 if allowed else (1 - tokens) / refill_rate
+        return allowed, retry_after
+
+
+class RateLimiter:
+    """Token-bucket rate limiter on top of a pluggable backend."""
+
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+
+    def hit(self, key: str, capacity: int, per_minute: float):
+        """Count one request against `key`, allowing bursts of `capacity` and `per_minute` sustained.
+
+        Returns:
+            tuple: Whether the request is allowed, and the whole seconds to wait before retrying.
+        """
+        allowed, retry_after = self.backend.consume(key, capacity, per_minute / 60)
+        return allowed, math.ceil(retry_after)
+
+
+def get_rate_limiter(config):
+    if config.RATE_LIMIT_BACKEND == "postgres":
+        # Buckets are checked on the same bounded, health-checked pool as the repositories.
+        from common.repositories.factory import get_repository_factory
+        return RateLimiter(PostgresRateLimitBackend(get_repository_factory(config).connection_pool))
+    if config.RATE_LIMIT_BACKEND == "memory":
+        return RateLimiter(MemoryRateLimitBackend(max_keys=config.RATE_LIMIT_MAX_KEYS))
+    return None
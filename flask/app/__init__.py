@@ -2,14 +2,24 @@ from flask import Flask, g, Request, request
 from flask_restx import Api
 from flask_cors import CORS
 from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from rococo.plugins.pooled_connection import PooledConnectionPlugin
 from rococo.models.versioned_model import ModelValidationError
 
-from app.helpers.exceptions import InputValidationError, APIException
-from app.helpers.response import get_failure_response
+from app.helpers.exceptions import (
+    InputValidationError,
+    APIException,
+    PreconditionFailedError,
+    ServiceUnavailableError,
+)
+from app.helpers.response import get_failure_data, get_failure_response
 
 from common.app_config import get_config
+from common.repositories.instrumentation import start_query_stats, finish_query_stats
+from common.repositories.routing import start_read_routing, finish_read_routing
+from common.repositories.identity_map import start_identity_map, clear_identity_map
+from common.repositories.batch_loader import start_batch_loaders, clear_batch_loaders
 from common.utils.version import get_service_version, get_project_name
 from logger import set_request_exception_signal, logger
 
@@ -33,6 +43,11 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(config)
 
+    # Behind a load balancer, request.remote_addr (used by the rate limits) is the client
+    # address taken from X-Forwarded-For rather than the balancer's own.
+    if config.PROXY_FIX_X_FOR:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=config.PROXY_FIX_X_FOR)
+
     with app.app_context():
         set_request_exception_signal(app)
 
@@ -44,7 +59,7 @@ def create_app():
     api.init_app(app)
 
     # Add simple CORS support
-    CORS(app)
+    CORS(app, expose_headers=["ETag", "X-DB-Query-Count", "X-DB-Query-Time-Ms"])
 
     @app.before_request
     def handle_options():
@@ -54,13 +69,57 @@ def create_app():
                 "GET, POST, PUT, DELETE, OPTIONS"
             )
             response.headers["Access-Control-Allow-Headers"] = (
-                "Content-Type, Authorization"
+                "Content-Type, Authorization, If-Match, If-None-Match"
             )
             response.headers["Access-Control-Allow-Credentials"] = "true"
             return response
 
     PooledConnectionPlugin(app, database_type="postgres")
 
+    @app.before_request
+    def start_request_read_routing():
+        start_read_routing()
+
+    @app.teardown_request
+    def finish_request_read_routing(exception):
+        finish_read_routing()
+
+    @app.before_request
+    def start_request_identity_map():
+        start_identity_map()
+        start_batch_loaders()
+
+    @app.teardown_request
+    def clear_request_identity_map(exception):
+        clear_identity_map()
+        clear_batch_loaders()
+
+    @app.before_request
+    def start_sql_instrumentation():
+        if config.SQL_INSTRUMENTATION_ENABLED:
+            start_query_stats()
+
+    @app.after_request
+    def report_sql_instrumentation(response):
+        stats = finish_query_stats()
+        if stats is None:
+            return response
+
+        for shape, count in stats.get_repeated_shapes(config.SQL_N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                f"Possible N+1 queries in {request.method} {request.path}: statement run {count} times: {shape}"
+            )
+
+        if config.APP_ENV != "production":
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Query-Time-Ms"] = f"{stats.total_time * 1000:.1f}"
+        return response
+
+    @app.teardown_request
+    def clear_sql_instrumentation(exception):
+        # after_request is skipped when a request fails outside the error handlers.
+        finish_query_stats()
+
     @app.route("/")
     def hello_world():
         return "Welcome to Rococo Sample API."
@@ -77,6 +136,16 @@ def create_app():
     def handle_application_error(exception):
         return get_failure_response(message=str(exception))
 
+    @app.errorhandler(PreconditionFailedError)
+    def handle_precondition_failed_error(exception):
+        return get_failure_response(message=str(exception), status_code=412)
+
+    @app.errorhandler(ServiceUnavailableError)
+    def handle_service_unavailable_error(exception):
+        response = get_failure_response(message=str(exception), status_code=503)
+        response.headers["Retry-After"] = "1"
+        return response
+
     @app.errorhandler(HTTPException)
     def handle_http_error(exception):
         return get_failure_response(
@@ -90,4 +159,31 @@ def create_app():
             message="An unexpected error occurred", status_code=500
         )
 
+    # Exceptions raised in Flask-RESTX resources are answered by the api, not by the app
+    # handlers above, so it gets the same handlers; its default one covers the rest.
+    @api.errorhandler(ModelValidationError)
+    def handle_resource_model_validation_error(exception):
+        return get_failure_data(message="\n".join(exception.errors)), 200
+
+    @api.errorhandler(InputValidationError)
+    def handle_resource_input_validation_error(exception):
+        return get_failure_data(message=str(exception)), 200
+
+    @api.errorhandler(APIException)
+    def handle_resource_application_error(exception):
+        return get_failure_data(message=str(exception)), 200
+
+    @api.errorhandler(PreconditionFailedError)
+    def handle_resource_precondition_failed_error(exception):
+        return get_failure_data(message=str(exception)), 412
+
+    @api.errorhandler(ServiceUnavailableError)
+    def handle_resource_service_unavailable_error(exception):
+        return get_failure_data(message=str(exception)), 503, {"Retry-After": "1"}
+
+    @api.errorhandler
+    def handle_resource_generic_error(exception):
+        logger.exception(exception)
+        return get_failure_data(message="An unexpected error occurred"), 500
+
     return app
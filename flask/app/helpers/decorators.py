@@ -1,3 +1,4 @@
+import uuid
 from functools import wraps
 from flask import request
 from flask import g, abort
@@ -10,9 +11,55 @@ from common.app_config import config
 from common.services.email import EmailService
 from common.services.person import PersonService
 from common.services.auth import AuthService
-from common.services.auth import AuthService
-from common.services import OrganizationService, PersonOrganizationRoleService
+from common.services import PersonOrganizationRoleService, get_service
+from common.services.caches import person_cache, email_cache, get_or_load_membership
+from common.utils.rate_limit import get_rate_limiter
+
+
+rate_limiter = get_rate_limiter(config)
+
+
+def rate_limited(scope, email_field=None):
+    """
+    Reject requests over the token-bucket limits for the client IP and, when `email_field`
+    is given, for the email address in that field of the JSON body.
+    """
 
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if rate_limiter is None:
+                return func(self, *args, **kwargs)
+
+            limits = [(f"{scope}:ip:{request.remote_addr}", config.RATE_LIMIT_IP_BURST, config.RATE_LIMIT_IP_PER_MINUTE)]
+            if email_field:
+                body = request.get_json(force=True, silent=True)
+                email = body.get(email_field) if isinstance(body, dict) else None
+                if isinstance(email, str) and email.strip():
+                    limits.append((
+                        f"{scope}:email:{email.strip().lower()[:254]}",
+                        config.RATE_LIMIT_EMAIL_BURST,
+                        config.RATE_LIMIT_EMAIL_PER_MINUTE,
+                    ))
+
+            for key, burst, per_minute in limits:
+                try:
+                    allowed, retry_after = rate_limiter.hit(key, burst, per_minute)
+                except Exception as e:
+                    # Fail open: an unavailable shared backend must not lock everyone out.
+                    logger.exception(e)
+                    break
+
+                if not allowed:
+                    response = get_failure_response(message="Too many requests, please try again later.", status_code=429)
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response
+
+            return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
 
 
 def login_required():
@@ -22,9 +69,7 @@ def login_required():
             if 'Authorization' not in request.headers:
                 return get_failure_response(message="Authorization header not present", status_code=401)
             
-            auth_service = AuthService(config)
-            email_service = EmailService(config)
-            person_service = PersonService(config)
+            auth_service = get_service(AuthService, config)
 
             data = request.headers['Authorization']
             token = str.replace(str(data), 'Bearer ', '')
@@ -37,11 +82,16 @@ def login_required():
                 person_id = parsed_token.get('person_id')
                 email_id = parsed_token.get('email_id')
 
-                email = email_service.get_email_by_id(email_id)
-                person = person_service.get_person_by_id(person_id)
+                email = email_cache.get_or_load(
+                    email_id, lambda: get_service(EmailService, config).get_email_by_id(email_id)
+                )
+                person = person_cache.get_or_load(
+                    person_id, lambda: get_service(PersonService, config).get_person_by_id(person_id)
+                )
 
                 g.person = person
                 g.email = email
+                g.access_token = parsed_token
 
             except Exception as e:
                 logger.exception(e)
@@ -64,6 +114,14 @@ def login_required():
     return decorator
 
 
+def get_organization_id_header():
+    """The `x-organization-id` header as a hex entity_id, or None when it is not a valid UUID."""
+    try:
+        return uuid.UUID(request.headers['x-organization-id']).hex
+    except ValueError:
+        return None
+
+
 def organization_required(with_roles=None):
     def decorator(func):
         @wraps(func)
@@ -76,18 +134,24 @@ def organization_required(with_roles=None):
             if not person:
                 raise Exception("organization_required decorator should be used after login_required decorator.")
 
-            organization_service = OrganizationService(config)
-            person_organization_role_service = PersonOrganizationRoleService(config)
+            organization_id = get_organization_id_header()
+            if organization_id is None:
+                return get_failure_response(message="x-organization-id header is invalid", status_code=400)
+
+            person_organization_role_service = get_service(PersonOrganizationRoleService, config)
+            membership = get_or_load_membership(
+                person.entity_id,
+                organization_id,
+                lambda: person_organization_role_service.get_membership(
+                    person_id=person.entity_id,
+                    organization_id=organization_id
+                )
+            )
 
-            organization_id = request.headers['x-organization-id']
-            organization = organization_service.get_organization_by_id(organization_id)
-            if not organization:
+            if not membership:
                 return get_failure_response(message='Organization ID is invalid', status_code=403)
-            
-            person_organization_role = person_organization_role_service.get_role_of_person_in_organization(
-                person_id=person.entity_id,
-                organization_id=organization.entity_id
-            )
+
+            organization, person_organization_role = membership
             if not person_organization_role:
                 return get_failure_response(message="User is not authorized to use this organization.", status_code=401)
 
@@ -121,32 +185,34 @@ def organization_required(with_roles=None):
 
 def has_role(*allowed_roles):
     """
-    A generic decorator to check if a user has one of the allowed roles.
+    Allow the request only if the caller's role in the `x-organization-id` organization is one of
+    `allowed_roles`. Roles are read from the access token, so this must be used after login_required.
     """
 
     def decorator(func):
         @wraps(func)
-        def wrapper(*args, **kwargs):
-            agency_organization_id = kwargs.get("agency_organization_id")
+        def wrapper(self, *args, **kwargs):
+            parsed_token = getattr(g, 'access_token', None)
+            if parsed_token is None:
+                raise Exception("has_role decorator should be used after login_required decorator.")
 
-            person_organization_service = PorService(config)
-            # Retrieve all roles for the user
-            user_roles = person_organization_service.get_all_by_person_id(person_id=g.person_id)
-            roles_list = [role.role for role in user_roles]
+            if 'x-organization-id' not in request.headers:
+                return get_failure_response(message="x-organization-id header is not present", status_code=401)
 
-            # Check if user has any allowed role
-            if not any(role in allowed_roles for role in roles_list):
-                return get_failure_response("Access denied: insufficient permissions.", status_code=403)
+            organization_id = get_organization_id_header()
+            if organization_id is None:
+                return get_failure_response(message="x-organization-id header is invalid", status_code=400)
 
-            # Validate admin role permissions
-            if PersonOrganizationRoleEnum.ADMIN in roles_list:
-                is_super_admin = g.user_organization_name.lower() == config.SUPER_ADMIN_ORGANIZATION_NAME.lower()
-                is_valid_agency = agency_organization_id == g.user_organization_id
+            person_organization_role_service = get_service(PersonOrganizationRoleService, config)
+            roles_version = person_organization_role_service.get_roles_version_by_person_id(parsed_token.get('person_id'))
+            if parsed_token.get('rv') != roles_version:
+                return get_failure_response(message="Access token roles are out of date, please log in again.", status_code=401)
 
-                if not is_super_admin and not is_valid_agency:
-                    return get_failure_response("Access denied: invalid organization.", status_code=403)
+            role = (parsed_token.get('roles') or {}).get(organization_id)
+            if role not in allowed_roles:
+                return get_failure_response(message="Access denied: insufficient permissions.", status_code=403)
 
-            return func(*args, **kwargs)
+            return func(self, *args, **kwargs)
 
         return wrapper
 
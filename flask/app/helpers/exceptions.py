@@ -1,9 +1,6 @@
-
-
-
-class InputValidationError(Exception):
-    pass
-
-
-class APIException(Exception):
-    pass
+from common.exceptions import (  # noqa: F401
+    InputValidationError,
+    APIException,
+    PreconditionFailedError,
+    ServiceUnavailableError,
+)
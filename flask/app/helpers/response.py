@@ -1,5 +1,13 @@
+import json
+import uuid
+from datetime import date, datetime
+
 from flask import current_app as app
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
 from app.helpers.exceptions import InputValidationError
+from common.repositories.rows import RowSet
 
 
 def parse_request_body(request, keys, default_value=None):
@@ -16,20 +24,91 @@ def validate_required_fields(required_fields):
             raise InputValidationError(f"'{field}' is required and cannot be empty.")
 
 
+def _get_value_encoder(encode_string):
+    """JSON encoding of a single value, matching the default Flask JSON provider"""
+    dumps = app.json.dumps
+
+    def encode_value(value):
+        value_type = type(value)
+        if value_type is str:
+            return encode_string(value)
+        if value is None:
+            return "null"
+        if value is True:
+            return "true"
+        if value is False:
+            return "false"
+        if value_type is int:
+            return int.__repr__(value)
+        if value_type is datetime or value_type is date:
+            return encode_string(http_date(value))
+        return dumps(value)
+
+    return encode_value
+
+
+def dumps_row_set(row_set: RowSet) -> str:
+    """Serialize a RowSet as a JSON array of objects straight from its row tuples.
+
+    The output is the same as `app.json.dumps(list(row_set))`, without building a dict per row.
+    """
+    json_provider = app.json
+    if type(json_provider) is not DefaultJSONProvider:
+        return json_provider.dumps(list(row_set))
+
+    encode_string = (
+        json.encoder.encode_basestring_ascii if json_provider.ensure_ascii else json.encoder.encode_basestring
+    )
+    encode_value = _get_value_encoder(encode_string)
+
+    positions = range(len(row_set.fields))
+    if json_provider.sort_keys:
+        positions = sorted(positions, key=row_set.fields.__getitem__)
+    prefixes = [(position, encode_string(row_set.fields[position]) + ": ") for position in positions]
+
+    return "[" + ", ".join(
+        "{" + ", ".join(prefix + encode_value(row[position]) for position, prefix in prefixes) + "}"
+        for row in row_set.rows
+    ) + "]"
+
+
+def _dumps(data):
+    row_sets = {key: value for key, value in data.items() if isinstance(value, RowSet)}
+    if not row_sets:
+        return app.json.dumps(data)
+
+    # Row sets are encoded on their own and spliced in where a placeholder string was dumped.
+    placeholders = {key: f"row-set-{uuid.uuid4().hex}" for key in row_sets}
+    body = app.json.dumps({**data, **placeholders})
+    for key, placeholder in placeholders.items():
+        body = body.replace(json.dumps(placeholder), dumps_row_set(row_sets[key]), 1)
+    return body
+
+
 def _get_response(data, status_code=200):
     response = app.response_class(
-        response=app.json.dumps(data),
+        response=_dumps(data),
         status=status_code,
         mimetype=app.config["MIME_TYPE"],
     )
     return response
 
 
+def get_failure_data(message):
+    return dict(success=False, message=message)
+
+
 def get_failure_response(message, status_code=200):
-    response = _get_response(dict(success=False, message=message), status_code)
+    response = _get_response(get_failure_data(message), status_code)
     return response
 
 
 def get_success_response(status_code=200, **data):
     response = _get_response(dict(success=True, **data), status_code)
     return response
+
+
+def get_not_modified_response(etag):
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    return response
@@ -0,0 +1,32 @@
+revision = "0000000008"
+down_revision = "0000000007"
+
+
+def upgrade(migration):
+    # Task listings filter on person_id (and optionally is_completed) and sort by
+    # created_at DESC, entity_id DESC; both indexes below serve that order directly.
+    migration.add_index(
+        "task",
+        "task_person_id_is_completed_created_at_ind",
+        "person_id, is_completed, created_at DESC, entity_id DESC",
+    )
+    migration.execute(
+        """
+        CREATE INDEX task_person_id_created_at_active_ind
+        ON task (person_id, created_at DESC, entity_id DESC)
+        WHERE active = true;
+    """
+    )
+
+    # Superseded by the indexes above, which lead with person_id.
+    migration.remove_index("task", "task_person_id_ind")
+
+    migration.update_version_table(version=revision)
+
+
+def downgrade(migration):
+    migration.add_index("task", "task_person_id_ind", "person_id")
+    migration.remove_index("task", "task_person_id_created_at_active_ind")
+    migration.remove_index("task", "task_person_id_is_completed_created_at_ind")
+
+    migration.update_version_table(version=down_revision)
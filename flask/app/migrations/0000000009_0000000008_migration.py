@@ -0,0 +1,24 @@
+revision = "0000000009"
+down_revision = "0000000008"
+
+
+def upgrade(migration):
+    # Expression index instead of a stored tsvector column: `save` copies rows into
+    # task_audit with SELECT *, so task and task_audit must keep identical columns.
+    # The expression must match TASK_SEARCH_VECTOR in common/repositories/task.py.
+    migration.execute(
+        """
+        CREATE INDEX task_search_vector_ind
+        ON task USING GIN (
+            to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))
+        );
+    """
+    )
+
+    migration.update_version_table(version=revision)
+
+
+def downgrade(migration):
+    migration.remove_index("task", "task_search_vector_ind")
+
+    migration.update_version_table(version=down_revision)
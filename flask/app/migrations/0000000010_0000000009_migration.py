@@ -0,0 +1,16 @@
+revision = "0000000010"
+down_revision = "0000000009"
+
+
+def upgrade(migration):
+    # Serves the task change feed, which seeks on (changed_on, entity_id) per person
+    # and includes soft-deleted rows, so the index is not limited to active ones.
+    migration.add_index("task", "task_person_id_changed_on_ind", "person_id, changed_on, entity_id")
+
+    migration.update_version_table(version=revision)
+
+
+def downgrade(migration):
+    migration.remove_index("task", "task_person_id_changed_on_ind")
+
+    migration.update_version_table(version=down_revision)
@@ -0,0 +1,24 @@
+revision = "0000000011"
+down_revision = "0000000010"
+
+
+def upgrade(migration):
+    # Token buckets of the shared (postgres) rate limit backend; not a versioned entity.
+    migration.create_table(
+        "rate_limit_bucket",
+        """
+            "bucket_key" varchar(320) NOT NULL,
+            "tokens" double precision NOT NULL,
+            "updated_at" timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY ("bucket_key")
+        """,
+    )
+    migration.add_index("rate_limit_bucket", "rate_limit_bucket_updated_at_ind", "updated_at")
+
+    migration.update_version_table(version=revision)
+
+
+def downgrade(migration):
+    migration.drop_table(table_name="rate_limit_bucket")
+
+    migration.update_version_table(version=down_revision)
@@ -7,7 +7,8 @@ from app.helpers.response import (
     validate_required_fields,
 )
 from common.app_config import config
-from common.services import AuthService, PersonService
+from common.services import AuthService, get_service
+from app.helpers.decorators import rate_limited
 
 # Create the auth blueprint
 auth_api = Namespace("auth", description="Auth related APIs")
@@ -32,13 +33,14 @@ class Signup(Resource):
             },
         }
     )
+    @rate_limited("signup", email_field="email_address")
     def post(self):
         parsed_body = parse_request_body(
             request, ["first_name", "last_name", "email_address"]
         )
         validate_required_fields(parsed_body)
 
-        auth_service = AuthService(config)
+        auth_service = get_service(AuthService, config)
 
         auth_service.signup(
             parsed_body["email_address"],
@@ -58,20 +60,16 @@ class Login(Resource):
             "properties": {"email": {"type": "string"}, "password": {"type": "string"}},
         }
     )
+    @rate_limited("login", email_field="email")
     def post(self):
         parsed_body = parse_request_body(request, ["email", "password"])
         validate_required_fields(parsed_body)
 
-        auth_service = AuthService(config)
-        access_token, expiry = auth_service.login_user_by_email_password(
+        auth_service = get_service(AuthService, config)
+        access_token, expiry, person = auth_service.login_user_by_email_password(
             parsed_body["email"], parsed_body["password"]
         )
 
-        person_service = PersonService(config)
-        person = person_service.get_person_by_email_address(
-            email_address=parsed_body["email"]
-        )
-
         return get_success_response(
             person=person.as_dict(), access_token=access_token, expiry=expiry
         )
@@ -80,11 +78,12 @@ class Login(Resource):
 @auth_api.route("/forgot_password", doc=dict(description="Send reset password link"))
 class ForgotPassword(Resource):
     @auth_api.expect({"type": "object", "properties": {"email": {"type": "string"}}})
+    @rate_limited("forgot_password", email_field="email")
     def post(self):
         parsed_body = parse_request_body(request, ["email"])
         validate_required_fields(parsed_body)
 
-        auth_service = AuthService(config)
+        auth_service = get_service(AuthService, config)
         auth_service.trigger_forgot_password_email(parsed_body.get("email"))
 
         return get_success_response(message="Password reset email sent successfully.")
@@ -96,11 +95,12 @@ class ForgotPassword(Resource):
 )
 class ResetPassword(Resource):
     @auth_api.expect({"type": "object", "properties": {"password": {"type": "string"}}})
+    @rate_limited("reset_password")
     def post(self, token, uidb64):
         parsed_body = parse_request_body(request, ["password"])
         validate_required_fields(parsed_body)
 
-        auth_service = AuthService(config)
+        auth_service = get_service(AuthService, config)
         access_token, expiry, person_obj = auth_service.reset_user_password(
             token, uidb64, parsed_body.get("password")
         )
@@ -2,7 +2,7 @@ from flask_restx import Namespace, Resource
 from flask import request
 from app.helpers.response import get_success_response, get_failure_response, parse_request_body, validate_required_fields
 from common.app_config import config
-from common.services import OrganizationService, PersonService
+from common.services import OrganizationService, PersonService, get_service
 from app.helpers.decorators import login_required, organization_required
 
 # Create the organization blueprint
@@ -14,7 +14,7 @@ class Organizations(Resource):
     
     @login_required()
     def get(self, person):
-        organization_service = OrganizationService(config)
+        organization_service = get_service(OrganizationService, config)
         organizations = organization_service.get_organizations_with_roles_by_person(person.entity_id)
         return get_success_response(organizations=organizations)
 
@@ -24,8 +24,10 @@ class Organizations(Resource):
         parsed_body = parse_request_body(request, ["name"])
         validate_required_fields(parsed_body)
         
-        organization_service = OrganizationService(config)
+        organization_service = get_service(OrganizationService, config)
+        # The injected organization may be a cached copy; update the current row instead.
+        organization = organization_service.get_latest_organization_by_id(organization.entity_id)
         organization.name = parsed_body["name"]
-        organization_service.save_organization(organization)
+        organization = organization_service.save_organization(organization)
 
         return get_success_response(message="Organization updated successfully.", organization=organization)
@@ -8,7 +8,7 @@ from app.helpers.response import (
     validate_required_fields,
 )
 from common.app_config import config
-from common.services import PersonService
+from common.services import PersonService, get_service
 
 # Create the organization blueprint
 person_api = Namespace("person", description="Person-related APIs")
@@ -26,7 +26,9 @@ class Me(Resource):
         parsed_body = parse_request_body(request, ["first_name", "last_name"])
         validate_required_fields(parsed_body)
 
-        person_service = PersonService(config)
+        person_service = get_service(PersonService, config)
+        # The injected person may be a cached copy; update the current row instead.
+        person = person_service.get_latest_person_by_id(person.entity_id)
         person.first_name = parsed_body["first_name"]
         person.last_name = parsed_body["last_name"]
         person = person_service.save_person(person)
@@ -1,13 +1,19 @@
+import csv
+import io
+
 from flask_restx import Namespace, Resource, reqparse
-from flask import request
+from flask import request, current_app, Response, stream_with_context
 from app.helpers.response import (
     get_success_response,
     get_failure_response,
+    get_not_modified_response,
     parse_request_body,
     validate_required_fields,
 )
 from common.app_config import config
-from common.services import TaskService
+from common.services import TaskService, get_service
+from common.services.task import MAX_BATCH_SIZE, MAX_PAGE_SIZE
+from common.repositories.rows import RowSet
 from app.helpers.decorators import login_required
 
 # Create the task blueprint
@@ -19,12 +25,95 @@ task_filter_parser.add_argument(
     "is_completed", type=int, required=False, help="Filter tasks by completion status"
 )
 task_filter_parser.add_argument(
-    "page", type=int, required=False, default=1, help="Page number"
+    "page", type=int, required=False, default=1, help="Page number, starting at 1"
+)
+task_filter_parser.add_argument(
+    "per_page",
+    type=int,
+    required=False,
+    default=2,
+    help=f"Number of items per page, from 1 to {MAX_PAGE_SIZE}",
+)
+task_filter_parser.add_argument(
+    "cursor",
+    type=str,
+    required=False,
+    help="Opaque cursor for keyset pagination; pass it empty for the first page",
 )
 task_filter_parser.add_argument(
-    "per_page", type=int, required=False, default=2, help="Number of items per page"
+    "q", type=str, required=False, help="Full-text search over title and description"
+)
+task_filter_parser.add_argument(
+    "fields",
+    type=str,
+    required=False,
+    help="Comma-separated task fields to return, e.g. title,is_completed",
+)
+
+
+# Request parser for task exports
+task_export_parser = reqparse.RequestParser()
+task_export_parser.add_argument(
+    "format",
+    type=str,
+    required=False,
+    default="ndjson",
+    choices=("ndjson", "csv"),
+    help="Export format: ndjson or csv",
 )
 
+# Request parser for the task change feed
+task_changes_parser = reqparse.RequestParser()
+task_changes_parser.add_argument(
+    "watermark",
+    type=str,
+    required=False,
+    help="Watermark returned by the previous call; omit it for a full sync",
+)
+task_changes_parser.add_argument(
+    "limit",
+    type=int,
+    required=False,
+    default=100,
+    help=f"Maximum number of changes, from 1 to {MAX_BATCH_SIZE}",
+)
+
+EXPORT_MIME_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def generate_ndjson(rows):
+    for row in rows:
+        yield current_app.json.dumps(row) + "\n"
+
+
+def generate_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+    for row in rows:
+        if not header_written:
+            writer.writerow(row.keys())
+            header_written = True
+        writer.writerow(row.values())
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+
+def serialize_tasks(tasks):
+    # Read-only row sets are serialized straight from their rows by the response helpers.
+    if isinstance(tasks, RowSet):
+        return tasks
+    # Sparse fieldset queries already return plain dicts.
+    return [task if isinstance(task, dict) else task.as_dict() for task in tasks]
+
+
+def get_expected_versions():
+    """Task versions listed in the If-Match header, or None when the write is unconditional"""
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    return list(request.if_match.as_set())
+
 
 @task_api.route("/")
 class Tasks(Resource):
@@ -35,18 +124,49 @@ class Tasks(Resource):
         is_completed = args.get("is_completed")
         page = args.get("page")
         per_page = args.get("per_page")
+        cursor = args.get("cursor")
+        q = args.get("q")
+        fields = args.get("fields")
+
+        if fields is not None:
+            fields = [field.strip() for field in fields.split(",") if field.strip()] or None
 
         if is_completed is not None:
             is_completed = True if is_completed == 1 else False
 
-        task_service = TaskService(config)
-        tasks = task_service.get_tasks_by_person(
-            person.entity_id, is_completed, offset=(page - 1) * per_page, limit=per_page
+        task_service = get_service(TaskService, config)
+
+        if q and q.strip():
+            tasks, next_cursor = task_service.search_tasks_by_person(
+                person.entity_id, q, is_completed, cursor=cursor, limit=per_page, fields=fields
+            )
+            return get_success_response(
+                tasks=serialize_tasks(tasks),
+                pagination={"per_page": per_page, "next_cursor": next_cursor},
+            )
+
+        if cursor is not None:
+            tasks, next_cursor = task_service.get_tasks_page_by_person(
+                person.entity_id, is_completed, cursor=cursor, limit=per_page, fields=fields
+            )
+            return get_success_response(
+                tasks=serialize_tasks(tasks),
+                pagination={"per_page": per_page, "next_cursor": next_cursor},
+            )
+
+        if page < 1:
+            return get_failure_response(message="'page' must be at least 1.")
+
+        tasks, total_tasks = task_service.get_tasks_with_total_by_person(
+            person.entity_id,
+            is_completed,
+            offset=(page - 1) * per_page,
+            limit=per_page,
+            fields=fields,
         )
-        total_tasks = task_service.count_tasks_by_person(person.entity_id, is_completed)
 
         return get_success_response(
-            tasks=[task.as_dict() for task in tasks],
+            tasks=serialize_tasks(tasks),
             pagination={
                 "total": total_tasks,
                 "page": page,
@@ -61,7 +181,7 @@ class Tasks(Resource):
         parsed_body = parse_request_body(request, ["title", "description"])
         validate_required_fields(parsed_body)
 
-        task_service = TaskService(config)
+        task_service = get_service(TaskService, config)
         task = task_service.create_task(
             title=parsed_body["title"],
             description=parsed_body.get("description"),
@@ -72,12 +192,92 @@ class Tasks(Resource):
         )
 
 
+@task_api.route("/export")
+class TaskExport(Resource):
+    @task_api.expect(task_export_parser)
+    @login_required()
+    def get(self, person):
+        """Stream all tasks of the current user as NDJSON or CSV"""
+        args = task_export_parser.parse_args()
+        export_format = args.get("format")
+
+        task_service = get_service(TaskService, config)
+        rows = task_service.export_tasks_by_person(person.entity_id)
+        generate = generate_csv if export_format == "csv" else generate_ndjson
+
+        return Response(
+            stream_with_context(generate(rows)),
+            mimetype=EXPORT_MIME_TYPES[export_format],
+            headers={"Content-Disposition": f"attachment; filename=tasks.{export_format}"},
+        )
+
+
+@task_api.route("/changes")
+class TaskChanges(Resource):
+    @task_api.expect(task_changes_parser)
+    @login_required()
+    def get(self, person):
+        """Get the tasks created, updated or deleted since a watermark"""
+        args = task_changes_parser.parse_args()
+
+        task_service = get_service(TaskService, config)
+        changes = task_service.get_task_changes_by_person(
+            person.entity_id, watermark=args.get("watermark"), limit=args.get("limit")
+        )
+
+        return get_success_response(
+            changed=[task.as_dict() for task in changes["changed"]],
+            deleted=changes["deleted"],
+            watermark=changes["watermark"],
+            has_more=changes["has_more"],
+        )
+
+
+@task_api.route("/batch")
+class TaskBatch(Resource):
+    @task_api.expect(
+        {
+            "type": "object",
+            "properties": {
+                "operations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "action": {"type": "string", "enum": ["create", "update", "delete"]},
+                            "task_id": {"type": "string"},
+                            "title": {"type": "string"},
+                            "description": {"type": "string"},
+                            "is_completed": {"type": "boolean"},
+                        },
+                    },
+                }
+            },
+        }
+    )
+    @login_required()
+    def post(self, person):
+        """Create, update and delete many tasks in one request"""
+        parsed_body = parse_request_body(request, ["operations"])
+        validate_required_fields(parsed_body)
+
+        operations = parsed_body["operations"]
+        if not isinstance(operations, list) or not all(
+            isinstance(operation, dict) for operation in operations
+        ):
+            return get_failure_response(message="'operations' must be a list of objects.")
+
+        task_service = get_service(TaskService, config)
+        results = task_service.apply_batch(person.entity_id, operations)
+        return get_success_response(results=results)
+
+
 @task_api.route("/<string:task_id>")
 class Task(Resource):
     @login_required()
     def get(self, person, task_id):
         """Get a specific task"""
-        task_service = TaskService(config)
+        task_service = get_service(TaskService, config)
         task = task_service.get_task_by_id(task_id)
 
         if not task:
@@ -86,7 +286,12 @@ class Task(Resource):
         if task.person_id != person.entity_id:
             return get_failure_response(message="Unauthorized access to task")
 
-        return get_success_response(task=task.as_dict())
+        if request.if_none_match.contains_weak(task.version):
+            return get_not_modified_response(task.version)
+
+        response = get_success_response(task=task.as_dict())
+        response.set_etag(task.version)
+        return response
 
     @login_required()
     def patch(self, person, task_id):
@@ -94,26 +299,23 @@ class Task(Resource):
         parsed_body = parse_request_body(request, ["is_completed"])
         validate_required_fields(parsed_body)
 
-        task_service = TaskService(config)
-        task = task_service.get_task_by_id(task_id)
-
-        if not task:
-            return get_failure_response(message="Task not found")
-
-        if task.person_id != person.entity_id:
-            return get_failure_response(message="Unauthorized access to task")
-
-        updated_task = task_service.update_task(
-            task_id=task_id, is_completed=parsed_body["is_completed"]
+        task_service = get_service(TaskService, config)
+        updated_task = task_service.update_task_for_person(
+            task_id=task_id,
+            person_id=person.entity_id,
+            is_completed=parsed_body["is_completed"],
+            expected_versions=get_expected_versions(),
         )
 
         if not updated_task:
-            return get_failure_response(message="Failed to update task")
+            return get_failure_response(message="Task not found")
 
-        return get_success_response(
+        response = get_success_response(
             message="Task completion status updated successfully.",
             task=updated_task.as_dict(),
         )
+        response.set_etag(updated_task.version)
+        return response
 
     @login_required()
     def put(self, person, task_id):
@@ -129,44 +331,34 @@ class Task(Resource):
             }
         )
 
-        task_service = TaskService(config)
-        task = task_service.get_task_by_id(task_id)
-
-        if not task:
-            return get_failure_response(message="Task not found")
-
-        if task.person_id != person.entity_id:
-            return get_failure_response(message="Unauthorized access to task")
-
-        updated_task = task_service.update_task(
+        task_service = get_service(TaskService, config)
+        updated_task = task_service.update_task_for_person(
             task_id=task_id,
+            person_id=person.entity_id,
             title=parsed_body.get("title"),
             description=parsed_body.get("description"),
             is_completed=parsed_body.get(
                 "is_completed"
             ),  # This will be None if not provided
+            expected_versions=get_expected_versions(),
         )
 
         if not updated_task:
-            return get_failure_response(message="Failed to update task")
+            return get_failure_response(message="Task not found")
 
-        return get_success_response(
+        response = get_success_response(
             message="Task updated successfully.", task=updated_task.as_dict()
         )
+        response.set_etag(updated_task.version)
+        return response
 
     @login_required()
     def delete(self, person, task_id):
         """Delete a task"""
-        task_service = TaskService(config)
-        task = task_service.get_task_by_id(task_id)
-
-        if not task:
+        task_service = get_service(TaskService, config)
+        if not task_service.delete_task_for_person(
+            task_id, person.entity_id, expected_versions=get_expected_versions()
+        ):
             return get_failure_response(message="Task not found")
 
-        if task.person_id != person.entity_id:
-            return get_failure_response(message="Unauthorized access to task")
-
-        if not task_service.delete_task(task_id):
-            return get_failure_response(message="Failed to delete task")
-
         return get_success_response(message="Task deleted successfully.")
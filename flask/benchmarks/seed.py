@@ -0,0 +1,67 @@
+"""
+Synthetic task data shared by the benchmark scripts.
+"""
+import psycopg2
+
+from common.app_config import config
+
+SEED_MARKER = "benchmark"
+
+# Each seeded task gets two of these words in its title and one in its description.
+SEED_WORDS = (
+    "invoice", "meeting", "groceries", "report", "deploy", "dentist", "budget", "review",
+    "garden", "flight", "payroll", "laundry", "renewal", "backup", "birthday", "workshop",
+)
+
+
+def get_connection():
+    return psycopg2.connect(
+        host=config.POSTGRES_HOST,
+        port=int(config.POSTGRES_PORT),
+        user=config.POSTGRES_USER,
+        password=config.POSTGRES_PASSWORD,
+        database=config.POSTGRES_DB,
+    )
+
+
+def get_seeded_person_id(connection, index: int = 0) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT md5('bench-person-' || %s)", (index,))
+        return cursor.fetchone()[0]
+
+
+def seed_tasks(connection, persons: int, tasks_per_person: int):
+    """Insert `persons * tasks_per_person` tasks, a third completed and one in fifty soft-deleted."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO task (
+                entity_id, version, previous_version, active, changed_by_id, changed_on,
+                person_id, title, description, is_completed, created_at, updated_at
+            )
+            SELECT
+                md5('bench-task-' || g),
+                md5('bench-version-' || g),
+                '00000000000000000000000000000000',
+                g %% 50 <> 0,
+                %s,
+                now(),
+                md5('bench-person-' || (g %% %s)),
+                'Task ' || g || ' ' || (%s::text[])[1 + g %% 16] || ' ' || (%s::text[])[1 + (g / 16) %% 16],
+                repeat('Synthetic description about ' || (%s::text[])[1 + (g / 7) %% 16] || '. ', 1 + g %% 20),
+                g %% 3 = 0,
+                now() - (g || ' seconds')::interval,
+                now()
+            FROM generate_series(1, %s) AS g
+            ON CONFLICT (entity_id) DO NOTHING
+            """,
+            (SEED_MARKER, persons, list(SEED_WORDS), list(SEED_WORDS), list(SEED_WORDS), persons * tasks_per_person),
+        )
+        cursor.execute("ANALYZE task")
+    connection.commit()
+
+
+def remove_seeded_tasks(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM task WHERE changed_by_id = %s", (SEED_MARKER,))
+    connection.commit()
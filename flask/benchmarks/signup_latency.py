@@ -0,0 +1,92 @@
+"""
+Measure the latency of the signup write path against a local Postgres: the five
+versioned saves made one by one (one transaction each, as before) versus a single
+unit of work. Password hashing and the welcome email are left out of the timing.
+
+Run from the api directory against a migrated database:
+
+    python -m benchmarks.signup_latency --signups 200
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.seed import get_connection
+from common.app_config import config
+from common.models import Email, LoginMethod, Organization, Person, PersonOrganizationRole
+from common.models.login_method import LoginMethodType
+from common.repositories.factory import get_repository_factory, RepoType
+
+SIGNUP_TABLES = ("email", "person", "login_method", "organization", "person_organization_role")
+
+
+def build_signup(index: int, password_hash: str):
+    person = Person(first_name="Bench", last_name=f"Signup {index}")
+    email = Email(person_id=person.entity_id, email=f"bench-signup-{index}-{person.entity_id}@example.com")
+    login_method = LoginMethod(
+        method_type=LoginMethodType.EMAIL_PASSWORD,
+        person_id=person.entity_id,
+        email_id=email.entity_id,
+        password=password_hash,
+    )
+    organization = Organization(name="Bench's Organization")
+    role = PersonOrganizationRole(
+        person_id=person.entity_id, organization_id=organization.entity_id, role="admin"
+    )
+    return email, person, login_method, organization, role
+
+
+def remove_signups(entity_ids):
+    connection = get_connection()
+    with connection.cursor() as cursor:
+        for table in SIGNUP_TABLES:
+            for suffix in ("", "_audit"):
+                cursor.execute(f"DELETE FROM {table}{suffix} WHERE entity_id = ANY(%s)", (list(entity_ids),))
+    connection.commit()
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--signups", type=int, default=200)
+    args = parser.parse_args()
+
+    factory = get_repository_factory(config)
+    repositories = [
+        factory.get_repository(RepoType.EMAIL),
+        factory.get_repository(RepoType.PERSON),
+        factory.get_repository(RepoType.LOGIN_METHOD),
+        factory.get_repository(RepoType.ORGANIZATION),
+        factory.get_repository(RepoType.PERSON_ORGANIZATION_ROLE),
+    ]
+    # Hash once up front; this benchmark is about the database writes.
+    password_hash = LoginMethod(raw_password=config.DEFAULT_USER_PASSWORD).password
+
+    timings = {"sequential saves": [], "unit of work": []}
+    entity_ids = []
+    try:
+        for index in range(args.signups):
+            for mode, durations in timings.items():
+                models = build_signup(index, password_hash)
+                entity_ids.extend(model.entity_id for model in models)
+
+                started = time.perf_counter()
+                if mode == "sequential saves":
+                    for repository, model in zip(repositories, models):
+                        repository.save(model)
+                else:
+                    with factory.unit_of_work() as unit_of_work:
+                        for repository, model in zip(repositories, models):
+                            unit_of_work.save(repository, model)
+                durations.append((time.perf_counter() - started) * 1000)
+    finally:
+        remove_signups(entity_ids)
+
+    for mode, durations in timings.items():
+        durations.sort()
+        p95 = durations[int(len(durations) * 0.95) - 1]
+        print(f"{mode:<18} median {statistics.median(durations):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Seed a synthetic task dataset into a local Postgres and check that the queries
+issued by `TaskService` are planned as index scans.
+
+Run from the api directory against a migrated database:
+
+    python -m benchmarks.task_query_plans --persons 200 --tasks-per-person 500
+"""
+import argparse
+import json
+import sys
+
+from rococo.data.postgresql import PostgreSQLAdapter
+
+from benchmarks.seed import get_connection, get_seeded_person_id, seed_tasks, remove_seeded_tasks
+from common.app_config import config
+from common.services.task import TaskService
+
+INDEX_NODE_TYPES = ("Index Scan", "Index Only Scan", "Bitmap Heap Scan")
+
+
+class ExplainingAdapter(PostgreSQLAdapter):
+    """PostgreSQLAdapter that records the EXPLAIN plan of every SELECT before running it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.plans = []
+
+    def _call_cursor(self, function_name, *args, **kwargs):
+        # Hooked at the cursor, since the read-only listings bypass `execute_query`.
+        if function_name == "execute" and isinstance(args[0], str) and args[0].strip().upper().startswith("SELECT"):
+            sql, _vars = args[0], (args[1] if len(args) > 1 else ())
+            super()._call_cursor("execute", "EXPLAIN (FORMAT JSON) " + sql, _vars or ())
+            plan = super()._call_cursor("fetchone")[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            self.plans.append((" ".join(sql.split()), plan[0]["Plan"]))
+        return super()._call_cursor(function_name, *args, **kwargs)
+
+
+def iter_plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+
+def task_scan_types(plan):
+    return [
+        node["Node Type"]
+        for node in iter_plan_nodes(plan)
+        if node.get("Relation Name") == "task"
+    ]
+
+
+def run_service_queries(task_service: TaskService, person_id: str, per_page: int):
+    for is_completed in (None, True, False):
+        task_service.get_tasks_with_total_by_person(person_id, is_completed, offset=0, limit=per_page)
+        task_service.get_tasks_with_total_by_person(person_id, is_completed, offset=per_page * 10, limit=per_page)
+        _, next_cursor = task_service.get_tasks_page_by_person(person_id, is_completed, limit=per_page)
+        task_service.get_tasks_page_by_person(person_id, is_completed, cursor=next_cursor, limit=per_page)
+        task_service.count_tasks_by_person(person_id, is_completed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--persons", type=int, default=200)
+    parser.add_argument("--tasks-per-person", type=int, default=500)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded rows after the run")
+    args = parser.parse_args()
+
+    connection = get_connection()
+    seed_tasks(connection, args.persons, args.tasks_per_person)
+
+    adapter = ExplainingAdapter(
+        config.POSTGRES_HOST,
+        int(config.POSTGRES_PORT),
+        config.POSTGRES_USER,
+        config.POSTGRES_PASSWORD,
+        config.POSTGRES_DB,
+    )
+    task_service = TaskService(config)
+    task_service.task_repo.adapter = adapter
+
+    person_id = get_seeded_person_id(connection)
+
+    failures = 0
+    try:
+        run_service_queries(task_service, person_id, args.per_page)
+    finally:
+        if not args.keep:
+            remove_seeded_tasks(connection)
+        connection.close()
+
+    for sql, plan in adapter.plans:
+        scans = task_scan_types(plan)
+        ok = bool(scans) and all(scan in INDEX_NODE_TYPES for scan in scans)
+        failures += not ok
+        print(f"[{'OK' if ok else 'FAIL'}] {', '.join(scans) or 'no scan'}: {sql}")
+
+    print(f"{len(adapter.plans) - failures}/{len(adapter.plans)} task queries use index scans.")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
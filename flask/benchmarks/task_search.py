@@ -0,0 +1,75 @@
+"""
+Compare `TaskRepository.search` (GIN full-text index) against a naive ILIKE scan
+on a seeded dataset, one million tasks by default.
+
+Run from the api directory against a migrated database:
+
+    python -m benchmarks.task_search --persons 100 --tasks-per-person 10000
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.seed import get_connection, get_seeded_person_id, seed_tasks, remove_seeded_tasks
+from common.app_config import config
+from common.services.task import TaskService
+
+SEARCH_TERMS = ("invoice", "dentist budget", "payroll renewal", "garden")
+
+ILIKE_SQL = """
+    SELECT *
+    FROM task
+    WHERE person_id = %s AND active = true
+      AND (title ILIKE %s OR description ILIKE %s)
+    ORDER BY created_at DESC
+    LIMIT %s
+"""
+
+
+def time_call(func, repeat: int) -> float:
+    """Median wall time of `func` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--persons", type=int, default=100)
+    parser.add_argument("--tasks-per-person", type=int, default=10000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded rows after the run")
+    args = parser.parse_args()
+
+    connection = get_connection()
+    print(f"Seeding {args.persons * args.tasks_per_person} tasks...")
+    seed_tasks(connection, args.persons, args.tasks_per_person)
+    person_id = get_seeded_person_id(connection)
+
+    task_repo = TaskService(config).task_repo
+
+    def run_ilike(term):
+        # Naive substring match on the first word, as a client-side "contains" search would do.
+        pattern = f"%{term.split()[0]}%"
+        with connection.cursor() as cursor:
+            cursor.execute(ILIKE_SQL, (person_id, pattern, pattern, args.limit))
+            cursor.fetchall()
+
+    try:
+        print(f"{'term':<20} {'full-text ms':>14} {'ILIKE ms':>10}")
+        for term in SEARCH_TERMS:
+            full_text_ms = time_call(lambda: task_repo.search(person_id, term, limit=args.limit), args.repeat)
+            ilike_ms = time_call(lambda: run_ilike(term), args.repeat)
+            print(f"{term:<20} {full_text_ms:>14.2f} {ilike_ms:>10.2f}")
+    finally:
+        if not args.keep:
+            remove_seeded_tasks(connection)
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
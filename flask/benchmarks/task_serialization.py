@@ -0,0 +1,96 @@
+"""
+Compare the model path of the task listing (a Task per row, `as_dict`, `app.json.dumps`)
+with the read-only RowSet fast path, on synthetic rows shaped like `SELECT * FROM task`.
+No database is needed; both paths must produce the same response body.
+
+Run from the api directory:
+
+    python -m benchmarks.task_serialization --rows 10000
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from app.helpers.response import get_success_response
+from common.models.task import Task
+from common.repositories.rows import RowSet
+
+# Column order as returned by the task table, including a non-model column dropped by the mapping.
+COLUMNS = tuple(Task.fields()) + ("total_count",)
+
+
+def make_rows(count: int):
+    started = datetime(2026, 1, 1)
+    person_id = uuid.uuid4().hex
+    rows = []
+    for index in range(count):
+        values = {
+            "entity_id": uuid.uuid4().hex,
+            "version": uuid.uuid4().hex,
+            "previous_version": "00000000000000000000000000000000",
+            "active": True,
+            "changed_by_id": person_id,
+            "changed_on": started + timedelta(seconds=index),
+            "person_id": person_id,
+            "title": f"Task {index}: renew the insurance policy",
+            "description": "Compare quotes and call the broker before Friday" if index % 3 else None,
+            "is_completed": index % 2 == 0,
+            "created_at": started + timedelta(seconds=index),
+            "updated_at": started + timedelta(seconds=index),
+            "total_count": count,
+        }
+        rows.append(tuple(values[column] for column in COLUMNS))
+    return rows
+
+
+def model_path(rows):
+    tasks = []
+    for row in rows:
+        result = dict(zip(COLUMNS, row))
+        result.pop("total_count")
+        tasks.append(Task(**result))
+    return get_success_response(tasks=[task.as_dict() for task in tasks]).get_data()
+
+
+def row_set_path(rows):
+    return get_success_response(tasks=RowSet.from_rows(Task, COLUMNS, rows)).get_data()
+
+
+def time_call(func, repeat: int) -> float:
+    """Median wall time of `func` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config["MIME_TYPE"] = "application/json"
+    rows = make_rows(args.rows)
+
+    with app.app_context():
+        if model_path(rows) != row_set_path(rows):
+            raise SystemExit("The RowSet fast path does not produce the same response body.")
+
+        model_ms = time_call(lambda: model_path(rows), args.repeat)
+        row_set_ms = time_call(lambda: row_set_path(rows), args.repeat)
+
+    print(f"{args.rows} rows, median of {args.repeat} runs")
+    print(f"  Task models + as_dict: {model_ms:8.1f} ms")
+    print(f"  RowSet fast path:      {row_set_ms:8.1f} ms  ({model_ms / row_set_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import sys
+
+# The settings are read when `common.app_config` is first imported, so placeholders for the
+# required ones must be in place before any test module imports `common` or `app`.
+for name, value in {
+    "APP_ENV": "test",
+    "SECRET_KEY": "test-secret-key",
+    "SECURITY_PASSWORD_SALT": "test-salt",
+    "VUE_APP_URI": "http://localhost:9000",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_DB": "test",
+    "RABBITMQ_HOST": "localhost",
+    "RABBITMQ_PORT": "5672",
+    "RABBITMQ_USER": "test",
+    "RABBITMQ_PASSWORD": "test",
+    "AUTH_JWT_SECRET": "test-jwt-secret",
+    "ROLLBAR_ACCESS_TOKEN": "",
+    "PASSWORD_HASH_BACKEND": "inline",
+}.items():
+    os.environ.setdefault(name, value)
+
+# In the container `common` is copied next to `app`; in a checkout it is a sibling of `flask`.
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if not os.path.isdir(os.path.join(API_ROOT, "common")):
+    sys.path.append(os.path.dirname(API_ROOT))
+
+
+import time  # noqa: E402
+
+import jwt  # noqa: E402
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    # The flask_restx Api of `app` binds to the first app it is initialized with, so the
+    # app is built once; tests needing another one must also patch in a fresh `app.api`.
+    from app import create_app
+
+    return create_app()
+
+
+@pytest.fixture
+def person():
+    """A signed-in person, served by login_required from the identity caches."""
+    from common.models import Email, Person
+    from common.services.caches import email_cache, person_cache
+
+    person = Person(first_name="Ada", last_name="Lovelace")
+    email = Email(person_id=person.entity_id, email="ada@example.com", is_verified=True)
+    person_cache.set(person.entity_id, person)
+    email_cache.set(email.entity_id, email)
+    person.email_id = email.entity_id
+    yield person
+    person_cache.clear()
+    email_cache.clear()
+
+
+@pytest.fixture
+def client(app, person):
+    from common.app_config import config
+
+    token = jwt.encode(
+        {"person_id": person.entity_id, "email_id": person.email_id, "exp": time.time() + 60},
+        config.AUTH_JWT_SECRET,
+        algorithm="HS256",
+    )
+    client = app.test_client()
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
+
+
+@pytest.fixture
+def task_repo(monkeypatch):
+    """Swap the task repository of this thread's TaskService for an in-memory one."""
+    from common.app_config import config
+    from common.services import TaskService, get_service
+    from tests.fakes import FakeTaskRepository
+
+    task_repo = FakeTaskRepository()
+    monkeypatch.setattr(get_service(TaskService, config), "task_repo", task_repo)
+    return task_repo
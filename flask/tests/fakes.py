@@ -0,0 +1,239 @@
+class FakeAdapter:
+    """Stands in for a PostgreSQLAdapter: records the calls made to it and answers `get_one`
+    from `rows`, a dict of entity_id to row dict."""
+
+    def __init__(self, name="primary", rows=None):
+        self.name = name
+        self.rows = rows or {}
+        self.calls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def execute_query(self, sql, params=None):
+        # Only the `entity_id = ANY(%s)` lookups of the repositories are answered; the IDs are the last param.
+        self.calls.append(("execute_query", sql, params))
+        return [dict(self.rows[entity_id]) for entity_id in params[-1] if entity_id in self.rows]
+
+    def get_one(self, table, conditions, *args, **kwargs):
+        self.calls.append(("get_one", table, conditions))
+        row = self.rows.get(conditions.get("entity_id"))
+        return dict(row) if row else None
+
+
+class FakeConnection:
+    def __init__(self, fail_on_execute=False):
+        self.fail_on_execute = fail_on_execute
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeCursor:
+    def __init__(self, column_names=()):
+        self.description = [(name,) for name in column_names]
+
+
+class FakeNamedCursor:
+    """A server-side cursor over `rows`, handing them out `fetchmany` at a time."""
+
+    def __init__(self, column_names, rows):
+        self.description = [(name,) for name in column_names]
+        self.rows = list(rows)
+        self.executed = []
+        self.fetches = 0
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTransactionAdapter(FakeAdapter):
+    """A FakeAdapter with the cursor and connection calls of a UnitOfWork and of the repositories'
+    raw SQL. Every statement run is appended to `executed`; `fetchall` returns `fetch_rows`."""
+
+    def __init__(self, fail_on_execute=False, column_names=(), fetch_rows=()):
+        super().__init__()
+        self._connection = FakeConnection()
+        self._cursor = FakeCursor(column_names)
+        self.fail_on_execute = fail_on_execute
+        self.fetch_rows = list(fetch_rows)
+        self.executed = []
+        self.executed_params = []
+
+    def _call_cursor(self, method, *args):
+        if method == "mogrify":
+            query, values = args
+            return f"{query} {values!r}".encode()
+        if method == "execute":
+            if self.fail_on_execute:
+                raise RuntimeError("The statement failed.")
+            self.executed.append(args[0])
+            self.executed_params.append(args[1] if len(args) > 1 else None)
+        if method == "fetchall":
+            return self.fetch_rows
+        return None
+
+    def run_transaction(self, queries):
+        for query, values in queries:
+            self._call_cursor("execute", query, values)
+        self._connection.commit()
+
+
+class ScriptedAdapter(FakeTransactionAdapter):
+    """Answers each statement, whether run through `execute_query` or the raw cursor, with the
+    next of `results`: `(column_names, rows)` pairs, rows being tuples."""
+
+    def __init__(self, *results):
+        super().__init__()
+        self.results = list(results)
+
+    def _next_result(self):
+        column_names, rows = self.results.pop(0) if self.results else ((), [])
+        self._cursor = FakeCursor(column_names)
+        self.fetch_rows = list(rows)
+
+    def _call_cursor(self, method, *args):
+        if method == "execute":
+            self._next_result()
+        return super()._call_cursor(method, *args)
+
+    def execute_query(self, sql, params=None):
+        self.executed.append(sql)
+        self.executed_params.append(params)
+        self._next_result()
+        column_names = [desc[0] for desc in self._cursor.description]
+        return [dict(zip(column_names, row)) for row in self.fetch_rows]
+
+
+class FakeTaskRepository:
+    """An in-memory stand-in for TaskRepository, implementing the listing queries TaskService uses."""
+
+    def __init__(self, tasks=()):
+        from common.models.task import Task
+
+        self.model = Task
+        self.tasks = {task.entity_id: task for task in tasks}
+        self.calls = []
+
+    def _active(self, query):
+        tasks = [
+            task for task in self.tasks.values()
+            if task.active and all(getattr(task, key) == value for key, value in query.items())
+        ]
+        return sorted(tasks, key=lambda task: (task.created_at, task.entity_id), reverse=True)
+
+    def _rows(self, tasks, columns):
+        # Projections come back as dicts, full rows as a RowSet, like the real repository.
+        if columns is not None:
+            return [{column: getattr(task, column) for column in columns} for task in tasks]
+
+        from common.repositories.rows import RowSet
+
+        columns = tuple(self.model.fields())
+        rows = [tuple(getattr(task, column) for column in columns) for task in tasks]
+        return RowSet.from_rows(self.model, columns, rows)
+
+    def get_page_after(self, query=None, after=None, limit=None, columns=None, read_only=False):
+        self.calls.append(("get_page_after", limit))
+        tasks = self._active(query or {})
+        if after is not None:
+            tasks = [task for task in tasks if (task.created_at, task.entity_id) < tuple(after)]
+        return self._rows(tasks[:limit], columns)
+
+    def get_all_with_total(self, query=None, offset=0, limit=None, columns=None, read_only=False):
+        self.calls.append(("get_all_with_total", offset, limit))
+        tasks = self._active(query or {})
+        return self._rows(tasks[offset:offset + limit], columns), len(tasks)
+
+    def iter_all(self, query=None, batch_size=500):
+        self.calls.append(("iter_all", batch_size))
+        for task in self._active(query or {}):
+            yield task.as_dict(convert_datetime_to_iso_string=False)
+
+    def save_many_for_person(self, person_id, task_ids, prepare):
+        import copy
+
+        self.calls.append(("save_many_for_person", list(task_ids)))
+        owned_tasks = {
+            task_id: copy.copy(self.tasks[task_id]) for task_id in task_ids
+            if task_id in self.tasks and self.tasks[task_id].active and self.tasks[task_id].person_id == person_id
+        }
+        tasks = prepare(owned_tasks)
+        for task in tasks:
+            self.tasks[task.entity_id] = task
+        return tasks
+
+    def get_by_id(self, task_id):
+        import copy
+
+        task = self.tasks.get(task_id)
+        return copy.copy(task) if task and task.active else None
+
+    def get_by_ids_for_person(self, person_id, task_ids):
+        tasks = (self.get_by_id(task_id) for task_id in task_ids)
+        return {task.entity_id: task for task in tasks if task and task.person_id == person_id}
+
+    def update_owned(self, task_id, person_id, task_data, expected_versions=None):
+        import copy
+        import uuid
+
+        self.calls.append(("update_owned", task_id, expected_versions))
+        task = self.get_by_ids_for_person(person_id, [task_id]).get(task_id)
+        if task is None or (expected_versions is not None and task.version not in expected_versions):
+            return None
+
+        for key, value in task_data.items():
+            setattr(task, key, value)
+        task.previous_version, task.version = task.version, uuid.uuid4().hex
+        self.tasks[task_id] = task
+        return copy.copy(task)
+
+    def delete_owned(self, task_id, person_id, expected_versions=None):
+        return self.update_owned(task_id, person_id, {"active": False}, expected_versions)
+
+    def search(self, person_id, q, limit=20, cursor=None, is_completed=None, columns=None):
+        # Ranks by how often `q` occurs in the title and description, a stand-in for ts_rank.
+        self.calls.append(("search", limit))
+        query = {"person_id": person_id}
+        if is_completed is not None:
+            query["is_completed"] = is_completed
+
+        ranked = []
+        for task in self._active(query):
+            rank = f"{task.title} {task.description or ''}".lower().count(q.lower()) / 10
+            if rank and (cursor is None or (rank, task.entity_id) < tuple(cursor)):
+                ranked.append((task, rank))
+        ranked.sort(key=lambda item: (item[1], item[0].entity_id), reverse=True)
+
+        if columns is None:
+            return ranked[:limit]
+        return [({column: getattr(task, column) for column in columns}, rank) for task, rank in ranked[:limit]]
+
+    def get_changed_since(self, person_id, after=None, until=None, limit=100):
+        self.calls.append(("get_changed_since", limit))
+        tasks = sorted(
+            (task for task in self.tasks.values() if task.person_id == person_id),
+            key=lambda task: (task.changed_on, task.entity_id),
+        )
+        if after is not None:
+            tasks = [task for task in tasks if (task.changed_on, task.entity_id) > tuple(after)]
+        if until is not None:
+            tasks = [task for task in tasks if task.changed_on <= until]
+        return tasks[:limit]
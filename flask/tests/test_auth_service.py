@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import pytest
+
+from common.app_config import config
+from common.exceptions import InputValidationError
+from common.models import Email, LoginMethod, Person
+from common.models.login_method import LoginMethodType
+from common.repositories.unit_of_work import UnitOfWork
+from common.services.auth import AuthService
+from tests.fakes import FakeTransactionAdapter
+
+PASSWORD = "Correct-Horse-7"
+
+
+@pytest.fixture
+def identity():
+    person = Person(first_name="Ada", last_name="Lovelace")
+    email = Email(person_id=person.entity_id, email="ada@example.com")
+    login_method = LoginMethod(
+        method_type=LoginMethodType.EMAIL_PASSWORD,
+        person_id=person.entity_id,
+        email_id=email.entity_id,
+        raw_password=PASSWORD,
+    )
+    return email, login_method, person
+
+
+@pytest.fixture
+def auth_service(identity):
+    lookups = []
+
+    def get_identity_by_email_address(email_address):
+        lookups.append(email_address)
+        return identity if email_address == identity[0].email else None
+
+    auth_service = AuthService(config)
+    auth_service.login_method_service = SimpleNamespace(
+        get_identity_by_email_address=get_identity_by_email_address, lookups=lookups
+    )
+    auth_service.person_organization_role_service = SimpleNamespace(
+        get_role_map_by_person_id=lambda person_id: {},
+        get_roles_version=auth_service.person_organization_role_service.get_roles_version,
+    )
+    return auth_service
+
+
+def test_login_needs_a_single_identity_lookup(auth_service, identity):
+    access_token, _, person = auth_service.login_user_by_email_password("ada@example.com", PASSWORD)
+
+    assert person.entity_id == identity[2].entity_id
+    assert auth_service.parse_access_token(access_token)["email_id"] == identity[0].entity_id
+    assert auth_service.login_method_service.lookups == ["ada@example.com"]
+
+
+def test_login_with_an_unknown_email(auth_service):
+    with pytest.raises(InputValidationError, match="not registered"):
+        auth_service.login_user_by_email_password("nobody@example.com", PASSWORD)
+
+
+def test_login_with_a_wrong_password(auth_service):
+    with pytest.raises(InputValidationError, match="Incorrect"):
+        auth_service.login_user_by_email_password("ada@example.com", "Wrong-Horse-7")
+
+
+def test_login_without_a_password_login_method(auth_service, identity):
+    email, _, person = identity
+    auth_service.login_method_service.get_identity_by_email_address = lambda email_address: (email, None, person)
+
+    with pytest.raises(InputValidationError, match="Incorrect"):
+        auth_service.login_user_by_email_password("ada@example.com", PASSWORD)
+
+
+@pytest.fixture
+def signup_service(monkeypatch):
+    adapter = FakeTransactionAdapter()
+    welcome_emails = []
+
+    auth_service = AuthService(config)
+    monkeypatch.setattr(auth_service.repository_factory, "unit_of_work", lambda: UnitOfWork(adapter))
+    monkeypatch.setattr(
+        auth_service.email_service, "get_email_by_email_address",
+        lambda email_address: Email(email=email_address) if email_address == "taken@example.com" else None,
+    )
+    monkeypatch.setattr(auth_service, "send_welcome_email", lambda *args: welcome_emails.append(args))
+    return auth_service, adapter, welcome_emails
+
+
+def test_signup_writes_every_row_in_one_transaction(signup_service):
+    auth_service, adapter, welcome_emails = signup_service
+
+    auth_service.signup("grace@example.com", "Grace", "Hopper")
+
+    assert len(adapter.executed) == 1
+    assert adapter._connection.commits == 1
+    statements = adapter.executed[0].decode()
+    for table in ("person", "email", "login_method", "organization", "person_organization_role"):
+        assert f"INSERT INTO {table} (" in statements
+    login_method, person, email = welcome_emails[0]
+    assert (login_method.person_id, email) == (person.entity_id, "grace@example.com")
+
+
+def test_signup_with_a_registered_email_writes_nothing(signup_service):
+    auth_service, adapter, welcome_emails = signup_service
+
+    with pytest.raises(InputValidationError):
+        auth_service.signup("taken@example.com", "Grace", "Hopper")
+
+    assert adapter.executed == [] and welcome_emails == []
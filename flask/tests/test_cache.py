@@ -0,0 +1,131 @@
+import uuid
+
+from common.models import Organization, Person, PersonOrganizationRole
+from common.services.caches import get_or_load_membership, organization_cache, organization_role_cache
+from common.utils.cache import MISSING, ModelCache, TTLCache
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("common.utils.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("key", "value")
+
+    now[0] += 29
+    assert cache.get("key") == "value"
+    now[0] += 2
+    assert cache.get("key") is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_model_cache_hands_out_copies():
+    cache = ModelCache(maxsize=10, ttl=30)
+    person = Person(first_name="Ada", last_name="Lovelace")
+    cache.set(person.entity_id, person)
+    person.first_name = "Changed after caching"
+
+    cached = cache.get(person.entity_id)
+    cached.first_name = "Changed by a caller"
+
+    assert cache.get(person.entity_id).first_name == "Ada"
+
+
+def test_model_cache_get_or_load_loads_once():
+    cache = ModelCache(maxsize=10, ttl=30)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return Person(first_name="Ada", last_name="Lovelace")
+
+    first = cache.get_or_load("key", load)
+    second = cache.get_or_load("key", load)
+
+    assert len(calls) == 1
+    assert first is not second
+    assert second.first_name == "Ada"
+
+
+def test_model_cache_does_not_cache_none_unless_asked():
+    calls = []
+
+    def load():
+        calls.append(1)
+        return None
+
+    cache = ModelCache(maxsize=10, ttl=30)
+    assert cache.get_or_load("key", load) is None
+    assert cache.get_or_load("key", load) is None
+    assert len(calls) == 2
+
+    cache = ModelCache(maxsize=10, ttl=30, cache_none=True)
+    cache.get_or_load("key", load)
+    assert cache.get_or_load("key", load) is None
+    assert len(calls) == 3
+
+
+def test_model_cache_invalidate():
+    cache = ModelCache(maxsize=10, ttl=30)
+    cache.set("key", "value")
+    cache.invalidate("key")
+
+    assert cache.get("key") is MISSING
+
+
+def test_membership_is_loaded_once_and_invalidated_per_key():
+    organization = Organization(name="Acme")
+    role = PersonOrganizationRole(person_id="p1", organization_id=organization.entity_id, role="admin")
+    calls = []
+
+    def load():
+        calls.append(1)
+        return organization, role
+
+    try:
+        get_or_load_membership("p1", organization.entity_id, load)
+        cached_organization, cached_role = get_or_load_membership("p1", organization.entity_id, load)
+        assert len(calls) == 1
+        assert (cached_organization.name, cached_role.role) == ("Acme", "admin")
+        # The dashed form of the ID is the same cache entry.
+        get_or_load_membership("p1", str(uuid.UUID(organization.entity_id)), load)
+        assert len(calls) == 1
+
+        organization_cache.invalidate(organization.entity_id)
+        get_or_load_membership("p1", organization.entity_id, load)
+        assert len(calls) == 2
+    finally:
+        organization_cache.clear()
+        organization_role_cache.clear()
+
+
+def test_non_membership_is_cached():
+    organization = Organization(name="Acme")
+    calls = []
+
+    def load():
+        calls.append(1)
+        return organization, None
+
+    try:
+        get_or_load_membership("p1", organization.entity_id, load)
+        assert get_or_load_membership("p1", organization.entity_id, load)[1] is None
+        assert len(calls) == 1
+        # An unknown organization is not cached.
+        unknown_id = "f" * 32
+        assert get_or_load_membership("p1", unknown_id, lambda: calls.append(1)) is None
+        assert get_or_load_membership("p1", unknown_id, lambda: calls.append(1)) is None
+        assert len(calls) == 3
+    finally:
+        organization_cache.clear()
+        organization_role_cache.clear()
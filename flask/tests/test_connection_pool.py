@@ -0,0 +1,180 @@
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+from common.exceptions import ServiceUnavailableError
+from common.repositories.connection_pool import ConnectionPool
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, sql):
+        if self.connection.broken:
+            raise RuntimeError("server closed the connection unexpectedly")
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.status = TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("common.repositories.connection_pool.time.monotonic", clock)
+    return clock
+
+
+def make_pool(**kwargs):
+    connections = []
+
+    def connect():
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    pool = ConnectionPool(connect, **kwargs)
+    # Maintenance is exercised through `maintain`, not the background thread.
+    pool._start_maintenance = lambda: None
+    return pool, connections
+
+
+def test_released_connections_are_reused():
+    pool, connections = make_pool(max_size=2)
+
+    connection = pool.acquire()
+    assert pool.owns(connection)
+    pool.release(connection)
+
+    assert pool.acquire() is connection
+    assert len(connections) == 1
+
+
+def test_release_rolls_back_an_open_transaction():
+    pool, _ = make_pool()
+    connection = pool.acquire()
+    connection.status = TRANSACTION_STATUS_INTRANS
+
+    pool.release(connection)
+
+    assert connection.rollbacks == 1
+    assert pool.stats()["idle"] == 1
+
+
+def test_acquire_times_out_when_the_pool_is_exhausted():
+    pool, _ = make_pool(max_size=1, acquire_timeout=0.01)
+    pool.acquire()
+
+    with pytest.raises(ServiceUnavailableError):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_connection_failing_its_health_check_is_replaced(clock):
+    pool, connections = make_pool(health_check_interval=30)
+    connection = pool.acquire()
+    pool.release(connection)
+
+    connection.broken = True
+    clock.now += 31
+
+    replacement = pool.acquire()
+    assert replacement is not connection
+    assert connection.closed
+    assert pool.stats()["failed_health_checks"] == 1
+    assert pool.stats()["size"] == 1
+
+
+def test_maintain_closes_idle_connections_and_keeps_min_size_open(clock):
+    pool, connections = make_pool(min_size=1, max_size=5, idle_timeout=60)
+    pool.maintain()
+    assert pool.stats()["idle"] == 1
+
+    checked_out = [pool.acquire() for _ in range(3)]
+    for connection in checked_out:
+        pool.release(connection)
+    assert pool.stats()["size"] == 3
+
+    clock.now += 61
+    pool.maintain()
+
+    stats = pool.stats()
+    assert stats["size"] == stats["idle"] == 1
+    assert sum(connection.closed for connection in connections) == 2
+
+
+def test_maintain_survives_connect_failures():
+    def connect():
+        raise RuntimeError("could not connect to server")
+
+    pool = ConnectionPool(connect, min_size=2)
+    pool.maintain()
+
+    assert pool.stats()["size"] == 0
+
+
+def test_forked_child_starts_with_an_empty_pool(monkeypatch):
+    pool, _ = make_pool()
+    connection = pool.acquire()
+
+    monkeypatch.setattr("common.repositories.connection_pool.os.getpid", lambda: -1)
+
+    assert not pool.owns(connection)
+    assert pool.acquire() is not connection
+    assert not connection.closed
+
+
+def test_close_closes_idle_connections_and_later_releases():
+    pool, _ = make_pool()
+    idle, in_use = pool.acquire(), pool.acquire()
+    pool.release(idle)
+
+    pool.close()
+    assert idle.closed
+
+    pool.release(in_use)
+    assert in_use.closed
+    assert pool.stats()["size"] == 0
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+def test_maintenance_thread_stops_on_close():
+    pool = ConnectionPool(FakeConnection, maintenance_interval=0.01)
+    pool.release(pool.acquire())
+    thread = pool._maintenance_thread
+    assert thread.is_alive()
+
+    pool.close()
+    thread.join(timeout=1)
+    assert not thread.is_alive()
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+COMMON_MODULES = [
+    "common.models",
+    "common.repositories",
+    "common.repositories.factory",
+    "common.services",
+    "common.services.auth",
+    "common.services.task",
+    "common.utils.password_hashing",
+    "common.utils.rate_limit",
+]
+
+
+def run_python(code):
+    # A fresh interpreter, so an import cycle hidden by modules already loaded in this
+    # process (for example through `app`) still fails here.
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+
+
+@pytest.mark.parametrize("module", COMMON_MODULES)
+def test_common_module_imports_on_its_own(module):
+    result = run_python(f"import {module}")
+    assert result.returncode == 0, result.stderr
+
+
+def test_common_does_not_import_app():
+    result = run_python(
+        "import sys\n"
+        + "".join(f"import {module}\n" for module in COMMON_MODULES)
+        + "print(sorted(name for name in sys.modules if name == 'app' or name.startswith('app.')))"
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def test_create_app(app):
+    assert "pooled_db" in app.extensions
@@ -0,0 +1,119 @@
+import pytest
+from flask_restx import Api
+
+from common.app_config import config
+from common.app_logger import logger
+from common.repositories import instrumentation
+from common.repositories.instrumentation import (
+    InstrumentedCursor,
+    QueryStats,
+    finish_query_stats,
+    normalize_sql,
+    start_query_stats,
+)
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, sql, *args, **kwargs):
+        self.executed.append(sql)
+
+    def executemany(self, sql, *args, **kwargs):
+        self.executed.append(sql)
+
+
+@pytest.fixture
+def warnings(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(logger, "warning", warnings.append)
+    return warnings
+
+
+@pytest.fixture
+def stats():
+    yield start_query_stats()
+    finish_query_stats()
+
+
+def test_normalize_sql_keeps_only_the_statement_shape():
+    sql = b"SELECT *\n  FROM task WHERE title = 'it''s' AND rank > 0.5 AND entity_id IN (%s, %s, %s) LIMIT 20"
+
+    assert normalize_sql(sql) == "SELECT * FROM task WHERE title = ? AND rank > ? AND entity_id IN (?, ...) LIMIT ?"
+
+
+def test_repeated_shapes_are_reported_from_the_threshold():
+    stats = QueryStats()
+    for entity_id in range(3):
+        stats.record(normalize_sql(f"SELECT * FROM email WHERE entity_id = {entity_id}"), 0.001)
+    stats.record("SELECT * FROM person", 0.001)
+
+    assert stats.count == 4
+    assert stats.get_repeated_shapes(3) == [("SELECT * FROM email WHERE entity_id = ?", 3)]
+    assert stats.get_repeated_shapes(4) == []
+
+
+def test_cursor_records_statements_and_reports_writes(stats):
+    writes = []
+    cursor = InstrumentedCursor(RecordingCursor(), on_write=lambda: writes.append(True))
+
+    cursor.execute("SELECT * FROM task")
+    assert not writes
+    cursor.execute("SELECT * FROM task FOR UPDATE")
+    cursor.execute("UPDATE task SET title = %s", ("New",))
+    cursor.executemany("INSERT INTO task VALUES (%s)", [(1,), (2,)])
+
+    assert len(writes) == 3
+    assert stats.count == 4
+
+
+def test_statements_outside_a_scope_are_only_logged_when_slow(monkeypatch, warnings):
+    instrumentation.record_query("SELECT 1", 0.001)
+    assert not warnings
+
+    monkeypatch.setattr(config, "SQL_SLOW_QUERY_MS", 0)
+    instrumentation.record_query("SELECT 1", 0.001)
+    assert warnings and warnings[0].startswith("Slow query")
+
+
+@pytest.fixture
+def queries_per_request(task_repo, monkeypatch):
+    """Make listing tasks run the same statement a number of times, like an N+1 pattern would."""
+    get_all_with_total = task_repo.get_all_with_total
+
+    def set_count(count):
+        def get_all_with_total_and_queries(*args, **kwargs):
+            for entity_id in range(count):
+                instrumentation.record_query(f"SELECT * FROM email WHERE entity_id = '{entity_id}'", 0.001)
+            return get_all_with_total(*args, **kwargs)
+
+        monkeypatch.setattr(task_repo, "get_all_with_total", get_all_with_total_and_queries)
+
+    return set_count
+
+
+def test_query_count_header_and_n_plus_one_warning(client, queries_per_request, caplog):
+    queries_per_request(config.SQL_N_PLUS_ONE_THRESHOLD)
+
+    response = client.get("/tasks/")
+
+    assert response.headers["X-DB-Query-Count"] == str(config.SQL_N_PLUS_ONE_THRESHOLD)
+    assert float(response.headers["X-DB-Query-Time-Ms"]) >= 0
+    assert [record.getMessage() for record in caplog.records if "N+1" in record.getMessage()] == [
+        f"Possible N+1 queries in GET /tasks/: statement run {config.SQL_N_PLUS_ONE_THRESHOLD} times: "
+        "SELECT * FROM email WHERE entity_id = ?"
+    ]
+
+
+def test_no_query_headers_in_production(client, monkeypatch):
+    import app as app_module
+
+    assert client.get("/").headers["X-DB-Query-Count"] == "0"
+
+    # The app reads its settings when it is created, so production needs an app of its own.
+    monkeypatch.setattr(app_module, "api", Api())
+    monkeypatch.setenv("APP_ENV", "production")
+    production_app = app_module.create_app()
+
+    assert "X-DB-Query-Count" not in production_app.test_client().get("/").headers
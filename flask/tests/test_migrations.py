@@ -0,0 +1,99 @@
+import importlib.util
+import re
+from pathlib import Path
+
+import pytest
+from rococo.migrations.postgres.migration import PostgresMigration
+
+from common.repositories.task import TASK_SEARCH_VECTOR
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[1] / "app" / "migrations"
+
+_CREATE_INDEX = re.compile(r"CREATE INDEX (\w+)\s+ON (\w+)(.*?);", re.S)
+_DROP_INDEX = re.compile(r"DROP INDEX IF EXISTS (\w+);")
+_DROP_TABLE = re.compile(r"DROP TABLE (?:IF EXISTS )?(\w+)")
+
+
+def load_migration(path):
+    spec = importlib.util.spec_from_file_location(f"migration_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+MIGRATIONS = {module.revision: module for module in map(load_migration, sorted(MIGRATIONS_DIR.glob("*.py")))}
+
+
+class RecordingMigration(PostgresMigration):
+    """Keeps the statements a migration runs and the indexes they leave in place, without a database."""
+
+    def __init__(self, indexes=None):
+        super().__init__(db_adapter=None)
+        self.statements = []
+        self.indexes = dict(indexes or {})  # name -> (table, definition)
+        self.version = None
+
+    def execute(self, query, commit: bool = True, args=None):
+        query = " ".join(query.split())
+        self.statements.append(query)
+
+        for name, table, definition in _CREATE_INDEX.findall(query):
+            assert name not in self.indexes, f"Index {name} already exists"
+            self.indexes[name] = (table, definition.strip())
+        for name in _DROP_INDEX.findall(query):
+            self.indexes.pop(name, None)
+        for table in _DROP_TABLE.findall(query):
+            self.indexes = {name: index for name, index in self.indexes.items() if index[0] != table}
+        if query.startswith("UPDATE db_version"):
+            self.version = re.search(r"'(\d+)'", query).group(1)
+        return []
+
+
+def test_revisions_form_a_single_chain():
+    revisions = sorted(MIGRATIONS)
+    for previous, current in zip(revisions, revisions[1:]):
+        assert MIGRATIONS[current].down_revision == previous
+
+
+@pytest.mark.parametrize("revision", ["0000000008", "0000000009", "0000000010", "0000000011"])
+def test_downgrade_restores_the_indexes(revision):
+    migration = MIGRATIONS[revision]
+    existing = {"task_person_id_ind": ("task", "(person_id)")} if revision == "0000000008" else {}
+
+    recorder = RecordingMigration(existing)
+    migration.upgrade(recorder)
+    assert recorder.version == revision
+    assert recorder.indexes != existing
+
+    migration.downgrade(recorder)
+    assert recorder.version == migration.down_revision
+    assert recorder.indexes.keys() == existing.keys()
+
+
+def test_task_listing_indexes_follow_the_listing_order():
+    recorder = RecordingMigration({"task_person_id_ind": ("task", "(person_id)")})
+    MIGRATIONS["0000000008"].upgrade(recorder)
+
+    assert "task_person_id_ind" not in recorder.indexes
+    table, definition = recorder.indexes["task_person_id_is_completed_created_at_ind"]
+    assert table == "task"
+    assert definition == "(person_id, is_completed, created_at DESC, entity_id DESC)"
+
+    table, definition = recorder.indexes["task_person_id_created_at_active_ind"]
+    assert table == "task"
+    assert definition == "(person_id, created_at DESC, entity_id DESC) WHERE active = true"
+
+
+def test_search_index_matches_the_search_query_expression():
+    recorder = RecordingMigration()
+    MIGRATIONS["0000000009"].upgrade(recorder)
+
+    _, definition = recorder.indexes["task_search_vector_ind"]
+    assert definition == f"USING GIN ( {TASK_SEARCH_VECTOR} )"
+
+
+def test_change_feed_index_matches_the_seek_order():
+    recorder = RecordingMigration()
+    MIGRATIONS["0000000010"].upgrade(recorder)
+
+    assert recorder.indexes["task_person_id_changed_on_ind"] == ("task", "(person_id, changed_on, entity_id)")
@@ -0,0 +1,140 @@
+import uuid
+
+import pytest
+
+from common.app_config import config
+from common.models import Organization, PersonOrganizationRole
+from common.services import OrganizationService, PersonOrganizationRoleService, get_service
+from common.repositories.organization import OrganizationRepository
+from common.services.caches import organization_cache, organization_role_cache
+from tests.fakes import FakeAdapter
+
+
+@pytest.fixture
+def organization():
+    organization = Organization(name="Acme")
+    yield organization
+    organization_cache.clear()
+    organization_role_cache.clear()
+
+
+@pytest.fixture
+def membership(person, organization):
+    """Serve the membership from the caches, as organization_required does for repeat requests."""
+
+    def set_role(role):
+        if role is not None:
+            role = PersonOrganizationRole(person_id=person.entity_id, organization_id=organization.entity_id, role=role)
+        organization_cache.set(organization.entity_id, organization)
+        organization_role_cache.set((person.entity_id, organization.entity_id), role)
+
+    return set_role
+
+
+@pytest.fixture
+def saved(monkeypatch, organization):
+    saved = []
+    organization_service = get_service(OrganizationService, config)
+    # The current row differs from the cached copy, so the test can tell which one was saved.
+    monkeypatch.setattr(
+        organization_service, "get_latest_organization_by_id",
+        lambda entity_id: Organization(entity_id=entity_id, name="Acme (current)", version=organization.version),
+    )
+    monkeypatch.setattr(
+        organization_service, "save_organization", lambda organization: saved.append(organization) or organization
+    )
+    return saved
+
+
+def put_name(client, organization_id, name="Acme Inc."):
+    return client.put("/organization/", json={"name": name}, headers={"x-organization-id": organization_id})
+
+
+def test_admin_updates_the_current_organization_row(client, organization, membership, saved):
+    membership("admin")
+
+    response = put_name(client, organization.entity_id)
+
+    assert response.get_json()["success"]
+    assert [(entity.entity_id, entity.name) for entity in saved] == [(organization.entity_id, "Acme Inc.")]
+
+
+def test_other_roles_are_forbidden(client, organization, membership, saved):
+    membership("member")
+
+    assert put_name(client, organization.entity_id).status_code == 403
+    assert not saved
+
+
+def test_non_members_are_rejected_from_the_cache(client, organization, membership, saved, monkeypatch):
+    membership(None)
+    monkeypatch.setattr(
+        get_service(PersonOrganizationRoleService, config), "get_membership",
+        lambda **kwargs: pytest.fail("The membership should be served from the cache."),
+    )
+
+    assert put_name(client, organization.entity_id).status_code == 401
+    assert not saved
+
+
+def test_unknown_organization(client, organization, saved, monkeypatch):
+    monkeypatch.setattr(
+        get_service(PersonOrganizationRoleService, config), "get_membership", lambda **kwargs: None
+    )
+
+    assert put_name(client, organization.entity_id).status_code == 403
+    assert organization_cache.get(organization.entity_id, None) is None
+
+
+def test_organization_header_is_required(client, saved):
+    assert client.put("/organization/", json={"name": "Acme Inc."}).status_code == 401
+
+
+def test_invalid_organization_header_is_rejected(client, person, saved):
+    assert put_name(client, "not-an-organization-id").status_code == 400
+    assert not saved
+
+
+def test_revoking_a_role_applies_to_dashed_organization_headers(client, person, organization, saved, monkeypatch):
+    person_organization_role_service = get_service(PersonOrganizationRoleService, config)
+    roles = {organization.entity_id: "admin"}
+    monkeypatch.setattr(
+        person_organization_role_service, "get_membership",
+        lambda person_id, organization_id: (organization, PersonOrganizationRole(
+            person_id=person_id, organization_id=organization_id, role=roles[organization_id]
+        )),
+    )
+    monkeypatch.setattr(person_organization_role_service.person_organization_role_repo, "save", lambda role: role)
+    dashed_organization_id = str(uuid.UUID(organization.entity_id))
+
+    assert put_name(client, dashed_organization_id).get_json()["success"]
+
+    roles[organization.entity_id] = "member"
+    person_organization_role_service.save_person_organization_role(
+        PersonOrganizationRole(person_id=person.entity_id, organization_id=organization.entity_id, role="member")
+    )
+
+    assert put_name(client, dashed_organization_id).status_code == 403
+    assert len(saved) == 1
+
+
+def test_listing_loads_every_organization_with_one_query(client, person, monkeypatch):
+    organizations = [Organization(name=f"Organization {index}") for index in range(3)]
+    roles = [
+        PersonOrganizationRole(person_id=person.entity_id, organization_id=organization.entity_id, role=role)
+        for organization, role in zip(organizations, ["admin", "member", "member"])
+    ]
+    adapter = FakeAdapter(rows={
+        organization.entity_id: organization.as_dict(convert_datetime_to_iso_string=False)
+        for organization in organizations
+    })
+    organization_service = get_service(OrganizationService, config)
+    monkeypatch.setattr(organization_service, "organization_repo", OrganizationRepository(adapter, None, ""))
+    monkeypatch.setattr(organization_service.person_organization_role_repo, "get_many", lambda conditions: roles)
+
+    response = client.get("/organization/")
+
+    assert [(entity["name"], entity["role"]) for entity in response.get_json()["organizations"]] == [
+        ("Organization 0", "admin"), ("Organization 1", "member"), ("Organization 2", "member")
+    ]
+    assert [call[0] for call in adapter.calls] == ["execute_query"]
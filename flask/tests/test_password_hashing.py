@@ -0,0 +1,62 @@
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from common.exceptions import ServiceUnavailableError
+from common.utils.password_hashing import PasswordHasher
+
+
+class BrokenExecutor:
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, func, *args, **kwargs):
+        raise BrokenProcessPool("A worker died.")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_inline_backend_round_trip():
+    hasher = PasswordHasher(backend="inline")
+    password_hash = hasher.hash_password("correct horse")
+
+    assert hasher.check_password(password_hash, "correct horse")
+    assert not hasher.check_password(password_hash, "battery staple")
+
+
+def test_process_backend_round_trip():
+    hasher = PasswordHasher(backend="process", workers=1)
+    try:
+        password_hash = hasher.hash_password("correct horse")
+        assert hasher.check_password(password_hash, "correct horse")
+        assert hasher._executor._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        hasher._executor.shutdown()
+
+
+def test_broken_pool_on_submit_is_reset_and_reported_as_unavailable():
+    hasher = PasswordHasher(backend="process", workers=1, max_pending=0)
+    broken = BrokenExecutor()
+    hasher._executor = broken
+
+    with pytest.raises(ServiceUnavailableError):
+        hasher.hash_password("correct horse")
+
+    assert broken.shut_down
+    assert hasher._executor is None
+    # The slot taken for the failed call was given back.
+    assert hasher._slots.acquire(blocking=False)
+
+
+def test_calls_beyond_the_pending_limit_fail_fast():
+    hasher = PasswordHasher(backend="process", workers=1, max_pending=0)
+    assert hasher._slots.acquire(blocking=False)
+
+    with pytest.raises(ServiceUnavailableError):
+        hasher.hash_password("correct horse")
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        PasswordHasher(backend="threads")
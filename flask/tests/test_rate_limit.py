@@ -0,0 +1,124 @@
+import pytest
+
+from common.utils.rate_limit import (
+    MemoryRateLimitBackend,
+    PostgresRateLimitBackend,
+    RateLimitBackend,
+    RateLimiter,
+)
+
+
+def test_backend_must_implement_consume():
+    class IncompleteBackend(RateLimitBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+def test_memory_backend_allows_a_burst_then_rejects(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("common.utils.rate_limit.time.monotonic", lambda: now[0])
+    limiter = RateLimiter(MemoryRateLimitBackend())
+
+    assert [limiter.hit("login:ip:1.2.3.4", 3, 60)[0] for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit("login:ip:1.2.3.4", 3, 60) == (False, 1)
+    # Other keys have their own bucket.
+    assert limiter.hit("login:ip:5.6.7.8", 3, 60)[0]
+
+    now[0] += 1
+    assert limiter.hit("login:ip:1.2.3.4", 3, 60)[0]
+
+
+def test_memory_backend_keeps_at_most_max_keys():
+    backend = MemoryRateLimitBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        backend.consume(key, 1, 1)
+
+    assert list(backend._buckets) == ["b", "c"]
+
+
+class FakeCursor:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+
+    def fetchone(self):
+        return (self.tokens,)
+
+
+class FakeConnection:
+    def __init__(self, tokens):
+        self.cursor_ = FakeCursor(tokens)
+        self.commits = 0
+
+    def cursor(self):
+        return self.cursor_
+
+    def commit(self):
+        self.commits += 1
+
+
+class FakePool:
+    def __init__(self, connection):
+        self.connection = connection
+        self.acquired = 0
+        self.released = 0
+
+    def acquire(self):
+        self.acquired += 1
+        return self.connection
+
+    def release(self, connection):
+        assert connection is self.connection
+        self.released += 1
+
+
+@pytest.mark.parametrize("tokens, expected", [(0, (True, 0)), (-1, (False, 2))])
+def test_postgres_backend_uses_a_pooled_connection(tokens, expected):
+    connection = FakeConnection(tokens)
+    pool = FakePool(connection)
+    limiter = RateLimiter(PostgresRateLimitBackend(pool))
+
+    assert limiter.hit("login:ip:1.2.3.4", 5, 60) == expected
+    assert pool.acquired == pool.released == 1
+    assert connection.commits == 1
+    assert connection.cursor_.statements[0][1]["key"] == "login:ip:1.2.3.4"
+
+
+def test_postgres_backend_releases_the_connection_on_errors():
+    connection = FakeConnection(0)
+    connection.cursor_.execute = lambda *args: 1 / 0
+    pool = FakePool(connection)
+
+    with pytest.raises(ZeroDivisionError):
+        PostgresRateLimitBackend(pool).consume("key", 5, 1)
+    assert pool.released == 1
+
+
+def test_proxy_fix_is_applied_when_proxies_are_trusted(monkeypatch):
+    from flask_restx import Api
+    from werkzeug.middleware.proxy_fix import ProxyFix
+
+    import app as app_module
+
+    def create_app():
+        monkeypatch.setattr(app_module, "api", Api())
+        return app_module.create_app()
+
+    monkeypatch.setenv("PROXY_FIX_X_FOR", "0")
+    assert not isinstance(create_app().wsgi_app, ProxyFix)
+
+    monkeypatch.setenv("PROXY_FIX_X_FOR", "1")
+    wsgi_app = create_app().wsgi_app
+    assert isinstance(wsgi_app, ProxyFix)
+    assert wsgi_app.x_for == 1
@@ -0,0 +1,276 @@
+import uuid
+
+import pytest
+
+from common.app_config import config
+from common.models import Email, LoginMethod, Person
+from common.models.login_method import LoginMethodType
+from common.models.task import Task
+from common.repositories import identity_map
+from common.repositories.batch_loader import clear_batch_loaders, get_batch_loader, start_batch_loaders
+from common.repositories.login_method import IDENTITY_TABLES, LoginMethodRepository
+from common.repositories.person import PersonRepository
+from common.repositories.factory import RepositoryFactory, RepoType
+from common.repositories.routing import is_read_statement, mark_primary_write, read_routing
+from common.repositories.task import TaskRepository
+from common.repositories.unit_of_work import UnitOfWork
+from tests.fakes import FakeAdapter, FakeTransactionAdapter, ScriptedAdapter
+
+
+def make_repository(person):
+    row = person.as_dict(convert_datetime_to_iso_string=False)
+    primary = FakeAdapter("primary", {person.entity_id: row})
+    replica = FakeAdapter("replica", {person.entity_id: row})
+    repository = PersonRepository(primary, None, "", replica_adapter=replica)
+    return repository, primary, replica
+
+
+def test_get_one_reads_from_the_replica_inside_a_routing_scope():
+    person = Person(first_name="Ada", last_name="Lovelace")
+    repository, primary, replica = make_repository(person)
+
+    with read_routing():
+        assert repository.get_one({"entity_id": person.entity_id}).first_name == "Ada"
+
+    assert replica.calls and not primary.calls
+
+
+def test_get_latest_by_id_reads_from_the_primary_and_skips_the_identity_map():
+    person = Person(first_name="Ada", last_name="Lovelace")
+    repository, primary, replica = make_repository(person)
+    identity_map.start_identity_map()
+    try:
+        with read_routing():
+            repository.get_one({"entity_id": person.entity_id})
+            assert repository.get_latest_by_id(person.entity_id).first_name == "Ada"
+            # Later lookups in the request are served the fresh copy from the identity map.
+            repository.get_one({"entity_id": person.entity_id})
+    finally:
+        identity_map.clear_identity_map()
+
+    assert len(replica.calls) == 1
+    assert len(primary.calls) == 1
+
+
+def test_save_many_for_person_locks_and_writes_in_one_transaction():
+    task = Task(person_id="a" * 32, title="Renew the insurance")
+    columns = tuple(Task.fields())
+    adapter = FakeTransactionAdapter(
+        column_names=columns, fetch_rows=[tuple(getattr(task, column) for column in columns)]
+    )
+    repository = TaskRepository(adapter)
+
+    def prepare(owned_tasks):
+        owned = owned_tasks[task.entity_id]
+        owned.title = "Renew the car insurance"
+        return [owned]
+
+    saved = repository.save_many_for_person("a" * 32, [task.entity_id], prepare)
+
+    assert saved[0].title == "Renew the car insurance"
+    select, audit, upsert = adapter.executed
+    assert "FOR UPDATE" in select
+    assert audit.startswith("INSERT INTO task_audit")
+    assert upsert.startswith("INSERT INTO task ")
+    assert adapter._connection.commits == 1
+    assert adapter._connection.rollbacks == 0
+
+
+def test_save_many_for_person_rolls_back_when_prepare_fails():
+    adapter = FakeTransactionAdapter(column_names=tuple(Task.fields()))
+    repository = TaskRepository(adapter)
+
+    def prepare(owned_tasks):
+        raise RuntimeError("Validation blew up.")
+
+    with pytest.raises(RuntimeError):
+        repository.save_many_for_person("a" * 32, ["b" * 32], prepare)
+
+    assert adapter._connection.rollbacks == 1
+    assert adapter._connection.commits == 0
+
+
+def test_get_many_by_ids_fetches_unknown_ids_in_one_query():
+    people = [Person(first_name=f"Person {index}", last_name="Test") for index in range(3)]
+    rows = {person.entity_id: person.as_dict(convert_datetime_to_iso_string=False) for person in people}
+    adapter = FakeAdapter(rows=rows)
+    repository = PersonRepository(adapter, None, "")
+    missing_id = "f" * 32
+    identity_map.start_identity_map()
+    try:
+        repository.get_one({"entity_id": people[0].entity_id})
+        found = repository.get_many_by_ids([person.entity_id for person in people] + [missing_id])
+        # Everything, including the ID known not to exist, is now served from the identity map.
+        again = repository.get_many_by_ids([person.entity_id for person in people] + [missing_id])
+    finally:
+        identity_map.clear_identity_map()
+
+    assert sorted(found) == sorted(again) == sorted(person.entity_id for person in people)
+    queries = [call for call in adapter.calls if call[0] == "execute_query"]
+    assert len(queries) == 1
+    assert sorted(queries[0][2][0]) == sorted([people[1].entity_id, people[2].entity_id, missing_id])
+
+
+def test_batch_loader_loads_every_wanted_id_with_one_query():
+    people = [Person(first_name=f"Person {index}", last_name="Test") for index in range(3)]
+    rows = {person.entity_id: person.as_dict(convert_datetime_to_iso_string=False) for person in people}
+    adapter = FakeAdapter(rows=rows)
+    repository = PersonRepository(adapter, None, "")
+    identity_map.start_identity_map()
+    start_batch_loaders()
+    try:
+        get_batch_loader(repository).want(*(person.entity_id for person in people))
+        # Every later read, with the ID in either form, goes to the same request-wide loader.
+        found = [get_batch_loader(repository).get(str(uuid.UUID(person.entity_id))) for person in people]
+        missing = get_batch_loader(repository).get("f" * 32)
+    finally:
+        clear_batch_loaders()
+        identity_map.clear_identity_map()
+
+    assert [person.first_name for person in found] == ["Person 0", "Person 1", "Person 2"]
+    assert missing is None
+    assert [call[0] for call in adapter.calls] == ["execute_query", "execute_query"]
+    assert sorted(adapter.calls[0][2][0]) == sorted(person.entity_id for person in people)
+
+def identity_row(*instances):
+    """Column names and the row of the joined identity query for `(email, login_method, person)`."""
+    row = {}
+    for (alias, (_, columns)), instance in zip(IDENTITY_TABLES.items(), instances):
+        for column in columns:
+            row[f"{alias}__{column}"] = getattr(instance, column) if instance is not None else None
+    return tuple(row), tuple(row.values())
+
+
+def test_identity_is_read_with_one_joined_query():
+    person = Person(first_name="Ada", last_name="Lovelace")
+    email = Email(person_id=person.entity_id, email="ada@example.com")
+    login_method = LoginMethod(
+        method_type=LoginMethodType.EMAIL_PASSWORD, person_id=person.entity_id, email_id=email.entity_id
+    )
+    column_names, row = identity_row(email, login_method, person)
+    adapter = ScriptedAdapter((column_names, [row]))
+
+    identity = LoginMethodRepository(adapter, None, "").get_identity_by_email_address("ada@example.com")
+
+    assert [instance.entity_id for instance in identity] == [email.entity_id, login_method.entity_id, person.entity_id]
+    assert identity[2].first_name == "Ada"
+    assert len(adapter.executed) == 1
+    assert adapter.executed_params == [(LoginMethodType.EMAIL_PASSWORD.value, "ada@example.com")]
+
+
+def test_identity_without_a_login_method_or_person_keeps_the_email():
+    email = Email(person_id="b" * 32, email="ada@example.com")
+    column_names, row = identity_row(email, None, None)
+    repository = LoginMethodRepository(ScriptedAdapter((column_names, [row])), None, "")
+
+    identity = repository.get_identity_by_login_method_id("c" * 32)
+
+    assert identity[0].email == "ada@example.com"
+    assert identity[1:] == (None, None)
+
+
+def test_unknown_email_has_no_identity():
+    adapter = ScriptedAdapter((("e__entity_id",), []))
+
+    assert LoginMethodRepository(adapter, None, "").get_identity_by_email_address("nobody@example.com") is None
+
+
+@pytest.mark.parametrize("sql, is_read", [
+    ("  select * from task", True),
+    (b"SELECT 1", True),
+    ("SELECT * FROM task FOR UPDATE", False),
+    ("SELECT * FROM task FOR SHARE", False),
+    ("WITH locked AS (SELECT 1) UPDATE task SET title = 'x'", False),
+    ("INSERT INTO task VALUES (1)", False),
+])
+def test_is_read_statement(sql, is_read):
+    assert is_read_statement(sql) is is_read
+
+
+def test_get_one_reads_from_the_primary_outside_a_routing_scope():
+    person = Person(first_name="Ada", last_name="Lovelace")
+    repository, primary, replica = make_repository(person)
+
+    repository.get_one({"entity_id": person.entity_id})
+
+    assert primary.calls and not replica.calls
+
+
+def test_reads_go_to_the_primary_after_a_write():
+    person = Person(first_name="Ada", last_name="Lovelace")
+    repository, primary, replica = make_repository(person)
+
+    with read_routing():
+        repository.get_one({"entity_id": person.entity_id})
+        mark_primary_write()
+        repository.get_one({"entity_id": person.entity_id})
+
+    assert len(replica.calls) == 1
+    assert len(primary.calls) == 1
+
+
+def test_factory_builds_replica_adapters_only_when_configured():
+    assert RepositoryFactory(config).get_replica_db_connection() is None
+
+    factory = RepositoryFactory(config.model_copy(update={"POSTGRES_REPLICA_HOST": "replica"}))
+    repository = factory.get_repository(RepoType.PERSON)
+
+    assert repository.replica_adapter is not None
+    assert repository.replica_adapter is not repository.adapter
+    assert factory.replica_connection_pool is not factory.connection_pool
+    # Writes through the primary adapter end the request's replica reads.
+    assert repository.adapter._on_write is mark_primary_write
+
+
+@pytest.fixture
+def request_identity_map():
+    identity_map.start_identity_map()
+    yield
+    identity_map.clear_identity_map()
+
+
+def test_get_one_by_id_is_served_from_the_identity_map(request_identity_map):
+    person = Person(first_name="Ada", last_name="Lovelace")
+    repository, primary, _ = make_repository(person)
+
+    first = repository.get_one({"entity_id": person.entity_id})
+    first.first_name = "Changed by the caller"
+    second = repository.get_one({"entity_id": str(uuid.UUID(person.entity_id))})
+
+    assert len(primary.calls) == 1
+    assert second.first_name == "Ada"
+
+
+def test_missing_entities_are_remembered(request_identity_map):
+    repository, primary, _ = make_repository(Person(first_name="Ada", last_name="Lovelace"))
+
+    assert repository.get_one({"entity_id": "f" * 32}) is None
+    assert repository.get_one({"entity_id": "f" * 32}) is None
+    assert len(primary.calls) == 1
+
+
+def test_other_lookups_and_lookups_outside_a_request_skip_the_identity_map(request_identity_map):
+    person = Person(first_name="Ada", last_name="Lovelace")
+    repository, primary, _ = make_repository(person)
+
+    repository.get_one({"entity_id": person.entity_id})
+    repository.get_one({"entity_id": person.entity_id, "active": True})
+    identity_map.clear_identity_map()
+    repository.get_one({"entity_id": person.entity_id})
+
+    assert len(primary.calls) == 3
+
+
+def test_committed_saves_are_mapped_and_soft_deletes_map_to_none(request_identity_map):
+    person = Person(first_name="Ada", last_name="Lovelace")
+    deleted = Person(first_name="Grace", last_name="Hopper", active=False)
+    # The adapter only builds the queries; reading through it would need a database.
+    repository = RepositoryFactory(config).get_repository(RepoType.PERSON)
+
+    with UnitOfWork(FakeTransactionAdapter()) as unit_of_work:
+        person.first_name = "Augusta"
+        unit_of_work.save(repository, person)
+        unit_of_work.save(repository, deleted)
+
+    assert repository.get_one({"entity_id": person.entity_id}).first_name == "Augusta"
+    assert repository.get_one({"entity_id": deleted.entity_id}) is None
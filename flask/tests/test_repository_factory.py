@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+from rococo.messaging.rabbitmq import RabbitMqConnection
+
+from common.app_config import config
+from common.repositories.factory import RepositoryFactory, RepoType, get_repository_factory
+from common.services.container import clear_services, get_service
+from common.services.task import TaskService
+
+
+def in_thread(func):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_get_service_reuses_one_instance_per_thread():
+    clear_services()
+    service = get_service(TaskService, config)
+
+    assert get_service(TaskService, config) is service
+    assert in_thread(lambda: get_service(TaskService, config)) is not service
+
+
+def test_clear_services_drops_the_thread_instances():
+    service = get_service(TaskService, config)
+    clear_services()
+
+    assert get_service(TaskService, config) is not service
+
+
+def test_repository_factory_is_shared_across_threads():
+    factory = get_repository_factory(config)
+
+    assert isinstance(factory, RepositoryFactory)
+    assert in_thread(lambda: get_repository_factory(config)) is factory
+
+
+def test_repository_factory_is_kept_per_config():
+    other_config = config.model_copy()
+
+    assert get_repository_factory(other_config) is not get_repository_factory(config)
+    assert get_repository_factory(other_config) is get_repository_factory(other_config)
+
+
+def test_repositories_without_a_queue_get_no_message_adapter():
+    repository = RepositoryFactory(config).get_repository(RepoType.PERSON)
+
+    assert repository.message_adapter is None
+    # Building the adapter must not open a connection; it is resolved on first use.
+    assert repository.adapter._connection is None
+
+
+def test_repositories_with_a_queue_get_a_message_adapter():
+    repository = RepositoryFactory(config).get_repository(RepoType.TASK, message_queue_name="task-events")
+
+    assert isinstance(repository.message_adapter, RabbitMqConnection)
+    assert repository.queue_name == "task-events"
+
+
+def test_unknown_repository_type():
+    with pytest.raises(ValueError):
+        RepositoryFactory(config).get_repository("unknown")
@@ -0,0 +1,89 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from flask import g
+
+from common.app_config import config
+from common.models import LoginMethod
+from common.models.login_method import LoginMethodType
+from common.services import PersonOrganizationRoleService
+from common.services.auth import AuthService
+from common.services.caches import roles_version_cache
+
+PERSON_ID = "a" * 32
+ORGANIZATION_ID = "b" * 32
+ROLE_MAP = {ORGANIZATION_ID: "admin", "c" * 32: "member"}
+
+
+@pytest.fixture(autouse=True)
+def clear_roles_versions():
+    yield
+    roles_version_cache.clear()
+
+
+def test_access_token_carries_the_roles_and_their_version():
+    auth_service = AuthService(config)
+    auth_service.person_organization_role_service = SimpleNamespace(
+        get_role_map_by_person_id=lambda person_id: ROLE_MAP,
+        get_roles_version=PersonOrganizationRoleService.get_roles_version,
+    )
+    login_method = LoginMethod(method_type=LoginMethodType.EMAIL_PASSWORD, person_id=PERSON_ID, email_id="d" * 32)
+
+    access_token, _ = auth_service.generate_access_token(login_method)
+
+    parsed_token = auth_service.parse_access_token(access_token)
+    assert parsed_token["roles"] == ROLE_MAP
+    assert parsed_token["rv"] == PersonOrganizationRoleService.get_roles_version(ROLE_MAP)
+    assert roles_version_cache.get(PERSON_ID) == parsed_token["rv"]
+
+
+def test_roles_version_changes_with_any_role():
+    roles_version = PersonOrganizationRoleService.get_roles_version(ROLE_MAP)
+
+    assert PersonOrganizationRoleService.get_roles_version(dict(reversed(ROLE_MAP.items()))) == roles_version
+    assert PersonOrganizationRoleService.get_roles_version({**ROLE_MAP, ORGANIZATION_ID: "member"}) != roles_version
+    assert PersonOrganizationRoleService.get_roles_version({}) != roles_version
+
+
+@pytest.fixture
+def call_with_role(app):
+    from app.helpers.decorators import has_role
+
+    @has_role("admin")
+    def view(self):
+        return "allowed"
+
+    def call(roles_version=None, organization_id=ORGANIZATION_ID):
+        current_version = PersonOrganizationRoleService.get_roles_version(ROLE_MAP)
+        roles_version_cache.set(PERSON_ID, current_version)
+        headers = {"x-organization-id": organization_id} if organization_id else {}
+        with app.test_request_context(headers=headers):
+            g.access_token = {"person_id": PERSON_ID, "roles": ROLE_MAP, "rv": roles_version or current_version}
+            result = view(None)
+        return result if isinstance(result, str) else result.status_code
+
+    return call
+
+
+def test_has_role_allows_a_role_from_the_token(call_with_role):
+    assert call_with_role() == "allowed"
+
+
+def test_has_role_rejects_other_roles(call_with_role):
+    assert call_with_role(organization_id="c" * 32) == 403
+    assert call_with_role(organization_id="e" * 32) == 403
+
+
+def test_has_role_requires_the_organization_header(call_with_role):
+    assert call_with_role(organization_id=None) == 401
+
+
+def test_has_role_normalizes_the_organization_header(call_with_role):
+    assert call_with_role(organization_id=str(uuid.UUID(ORGANIZATION_ID))) == "allowed"
+    assert call_with_role(organization_id=str(uuid.UUID("c" * 32))) == 403
+    assert call_with_role(organization_id="not-an-organization-id") == 400
+
+
+def test_has_role_rejects_tokens_with_outdated_roles(call_with_role):
+    assert call_with_role(roles_version="outdated") == 401
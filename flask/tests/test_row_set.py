@@ -0,0 +1,78 @@
+import uuid
+from datetime import date, datetime
+
+import pytest
+from flask import Flask
+
+from app.helpers.response import dumps_row_set, get_success_response
+from common.models.task import Task
+from common.repositories.rows import RowSet, get_row_mapping
+
+COLUMNS = tuple(Task.fields())
+
+
+@pytest.fixture
+def flask_app():
+    app = Flask(__name__)
+    app.config["MIME_TYPE"] = "application/json"
+    with app.app_context():
+        yield app
+
+
+def test_from_rows_drops_columns_that_are_not_fields():
+    row_set = RowSet.from_rows(Task, ("title", "total_count", "entity_id"), [("Renew", 7, "b" * 32)])
+
+    assert row_set.fields == ("title", "entity_id")
+    assert list(row_set) == [{"title": "Renew", "entity_id": "b" * 32}]
+
+
+def test_from_rows_with_a_single_field():
+    row_set = RowSet.from_rows(Task, ("total_count", "title"), [(7, "Renew"), (7, "Call")])
+
+    assert row_set.rows == [("Renew",), ("Call",)]
+
+
+def test_row_mapping_is_cached_per_model_and_columns():
+    assert get_row_mapping(Task, COLUMNS) is get_row_mapping(Task, COLUMNS)
+    assert get_row_mapping(Task, COLUMNS)[1] is None
+
+
+def test_indexing_and_slicing():
+    row_set = RowSet(("title",), [("A",), ("B",), ("C",)])
+
+    assert len(row_set) == 3
+    assert row_set[1] == {"title": "B"}
+    assert isinstance(row_set[1:], RowSet)
+    assert list(row_set[1:]) == [{"title": "B"}, {"title": "C"}]
+
+
+ROWS = [
+    ("Ünïcode \"quoted\" \\ title", None, True, 3, 1.5, datetime(2026, 1, 2, 3, 4, 5), date(2026, 1, 2)),
+    ("", "line\nbreak", False, -1, 0.1, datetime(2026, 12, 31), date(2000, 2, 29)),
+]
+FIELDS = ("title", "description", "is_completed", "count", "rank", "created_at", "due_on")
+
+
+@pytest.mark.parametrize("sort_keys, ensure_ascii", [(True, True), (False, True), (True, False)])
+def test_dumps_row_set_matches_the_json_provider(flask_app, sort_keys, ensure_ascii):
+    flask_app.json.sort_keys = sort_keys
+    flask_app.json.ensure_ascii = ensure_ascii
+    row_set = RowSet(FIELDS, ROWS)
+
+    assert dumps_row_set(row_set) == flask_app.json.dumps(list(row_set))
+
+
+def test_dumps_row_set_falls_back_to_the_provider_for_other_values(flask_app):
+    row_set = RowSet(("entity_id", "extra"), [(uuid.UUID(int=1), {"nested": [1, 2]})])
+
+    assert dumps_row_set(row_set) == flask_app.json.dumps(list(row_set))
+
+
+def test_success_response_body_is_the_same_for_models_and_row_sets(flask_app):
+    tasks = [Task(person_id="a" * 32, title=f"Task {index}", description=None) for index in range(3)]
+    rows = [tuple(getattr(task, column) for column in COLUMNS) for task in tasks]
+
+    model_body = get_success_response(tasks=[task.as_dict() for task in tasks], total=3).get_data()
+    row_set_body = get_success_response(tasks=RowSet.from_rows(Task, COLUMNS, rows), total=3).get_data()
+
+    assert row_set_body == model_body
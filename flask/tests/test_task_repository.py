@@ -0,0 +1,154 @@
+import pytest
+from rococo.models.versioned_model import ModelValidationError
+
+from common.models.task import Task
+from common.repositories import identity_map
+from common.repositories.rows import RowSet
+from common.repositories.task import TASK_SEARCH_VECTOR, TaskRepository
+from tests.fakes import FakeNamedCursor, FakeTransactionAdapter, ScriptedAdapter
+
+PERSON_ID = "a" * 32
+COLUMNS = tuple(Task.fields())
+
+
+def task_row(task, *extra):
+    return tuple(getattr(task, column) for column in COLUMNS) + extra
+
+
+def test_page_and_total_come_from_one_statement():
+    tasks = [Task(person_id=PERSON_ID, title=f"Task {index}") for index in range(2)]
+    adapter = ScriptedAdapter((COLUMNS + ("total_count",), [task_row(task, 7) for task in tasks]))
+
+    page, total = TaskRepository(adapter).get_all_with_total(
+        {"person_id": PERSON_ID}, offset=0, limit=2, read_only=True
+    )
+
+    assert isinstance(page, RowSet)
+    assert [task["title"] for task in page] == ["Task 0", "Task 1"]
+    assert "total_count" not in page.fields
+    assert total == 7
+    assert len(adapter.executed) == 1
+    assert "count(*) OVER ()" in adapter.executed[0]
+
+
+def test_page_past_the_end_falls_back_to_a_count():
+    adapter = ScriptedAdapter((COLUMNS + ("total_count",), []), (("total_count",), [(3,)]))
+
+    page, total = TaskRepository(adapter).get_all_with_total(
+        {"person_id": PERSON_ID}, offset=10, limit=2, read_only=True
+    )
+
+    assert len(page) == 0
+    assert total == 3
+    assert adapter.executed[1].startswith("SELECT count(*)")
+
+
+def test_empty_first_page_needs_no_count():
+    adapter = ScriptedAdapter((COLUMNS + ("total_count",), []))
+
+    page, total = TaskRepository(adapter).get_all_with_total({"person_id": PERSON_ID}, offset=0, limit=2)
+
+    assert (page, total) == ([], 0)
+    assert len(adapter.executed) == 1
+
+
+def test_count_is_done_in_sql():
+    adapter = ScriptedAdapter((("total_count",), [(42,)]))
+
+    assert TaskRepository(adapter).count({"person_id": PERSON_ID, "is_completed": True}) == 42
+    assert adapter.executed_params == [(PERSON_ID, True)]
+    assert "active = true AND person_id = %s AND is_completed = %s" in adapter.executed[0]
+
+
+def test_update_owned_checks_ownership_and_writes_the_audit_row_in_one_statement():
+    task = Task(person_id=PERSON_ID, title="Old")
+    updated = Task(**{**task.as_dict(convert_datetime_to_iso_string=False), "title": "New"})
+    adapter = ScriptedAdapter((COLUMNS, [task_row(updated)]))
+
+    result = TaskRepository(adapter).update_owned(task.entity_id, PERSON_ID, {"title": "New"})
+
+    assert result.title == "New"
+    assert len(adapter.executed) == 1
+    sql = adapter.executed[0]
+    assert "FOR UPDATE" in sql
+    assert "INSERT INTO task_audit SELECT * FROM locked" in sql
+    assert "version = ANY" not in sql
+    assert adapter.executed_params[0][:3] == (task.entity_id, PERSON_ID, "New")
+    assert adapter._connection.commits == 1
+
+
+def test_update_owned_with_expected_versions_adds_a_version_condition():
+    adapter = ScriptedAdapter((COLUMNS, []))
+
+    result = TaskRepository(adapter).update_owned("b" * 32, PERSON_ID, {"is_completed": True}, ["c" * 32])
+
+    assert result is None
+    assert "AND version = ANY(%s)" in adapter.executed[0]
+    assert adapter.executed_params[0][:4] == ("b" * 32, PERSON_ID, ["c" * 32], True)
+
+
+def test_delete_owned_that_matches_nothing_forgets_the_mapped_task():
+    task = Task(person_id=PERSON_ID, title="Mapped")
+    adapter = ScriptedAdapter((COLUMNS, []))
+    identity_map.start_identity_map()
+    try:
+        identity_map.remember("task", task.entity_id, task)
+
+        assert TaskRepository(adapter).delete_owned(task.entity_id, PERSON_ID) is None
+        assert "active = false" in adapter.executed[0]
+        assert identity_map.get_mapped("task", task.entity_id) is identity_map.MISSING
+    finally:
+        identity_map.clear_identity_map()
+
+
+def test_update_owned_validates_the_values_before_running_sql():
+    adapter = ScriptedAdapter()
+
+    with pytest.raises(ModelValidationError):
+        TaskRepository(adapter).update_owned("b" * 32, PERSON_ID, {"title": None})
+
+    assert adapter.executed == []
+
+
+def test_iter_all_streams_rows_through_a_named_cursor_in_batches():
+    tasks = [Task(person_id=PERSON_ID, title=f"Task {index}") for index in range(5)]
+    cursor = FakeNamedCursor(COLUMNS, [task_row(task) for task in tasks])
+    adapter = FakeTransactionAdapter()
+    names = []
+    adapter._connection.cursor = lambda name: names.append(name) or cursor
+
+    rows = TaskRepository(adapter).iter_all({"person_id": PERSON_ID}, batch_size=2)
+    assert not names  # nothing runs until the export is consumed
+
+    assert [row["title"] for row in rows] == [task.title for task in tasks]
+    assert names[0].startswith("task_export_")
+    assert cursor.executed[0][1] == (PERSON_ID,)
+    assert "ORDER BY created_at DESC, entity_id DESC" in cursor.executed[0][0]
+    assert cursor.fetches == 4  # three batches and the empty fetch that ends the export
+    assert cursor.closed and adapter._connection.rollbacks == 1
+
+
+def test_search_seeks_past_the_cursor_and_returns_ranks():
+    task = Task(person_id=PERSON_ID, title="Renew the insurance")
+    adapter = ScriptedAdapter((COLUMNS + ("search_rank",), [task_row(task, 0.25)]))
+
+    results = TaskRepository(adapter).search(PERSON_ID, "insurance", limit=3, cursor=(0.5, "c" * 32))
+
+    assert [(result.title, rank) for result, rank in results] == [("Renew the insurance", 0.25)]
+    assert f"{TASK_SEARCH_VECTOR} @@ query" in adapter.executed[0]
+    assert "WHERE (search_rank, entity_id) < (%s, %s)" in adapter.executed[0]
+    assert adapter.executed_params[0] == ("insurance", PERSON_ID, 0.5, "c" * 32, 3)
+
+
+def test_projection_selects_only_the_requested_columns():
+    adapter = ScriptedAdapter((("entity_id", "title"), [("b" * 32, "Mapped")]))
+
+    rows = TaskRepository(adapter).get_all({"person_id": PERSON_ID}, limit=1, columns=["entity_id", "title"])
+
+    assert rows == [{"entity_id": "b" * 32, "title": "Mapped"}]
+    assert adapter.executed[0].split("FROM")[0].split() == ["SELECT", "entity_id,", "title"]
+
+
+def test_projection_rejects_unknown_columns():
+    with pytest.raises(ValueError):
+        TaskRepository(ScriptedAdapter()).get_all(columns=["title; DROP TABLE task"])
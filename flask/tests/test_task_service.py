@@ -0,0 +1,273 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from common.app_config import config
+from common.exceptions import InputValidationError
+from common.models.task import Task
+from common.services.task import MAX_BATCH_SIZE, MAX_PAGE_SIZE, TaskService
+from common.utils.pagination import decode_rank_cursor, encode_rank_cursor
+from tests.fakes import FakeTaskRepository
+
+PERSON_ID = "a" * 32
+
+
+def make_tasks(count, person_id=PERSON_ID):
+    started = datetime(2026, 1, 1)
+    return [
+        Task(
+            person_id=person_id,
+            title=f"Task {index}",
+            created_at=started + timedelta(minutes=index),
+            changed_on=started + timedelta(minutes=index),
+        )
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def task_service():
+    task_service = TaskService(config)
+    task_service.task_repo = FakeTaskRepository(make_tasks(5))
+    return task_service
+
+
+def test_cursor_pages_cover_every_task_once(task_service):
+    seen = []
+    cursor = None
+    while True:
+        tasks, cursor = task_service.get_tasks_page_by_person(PERSON_ID, cursor=cursor, limit=2)
+        seen.extend(task["title"] for task in tasks)
+        if cursor is None:
+            break
+
+    assert seen == ["Task 4", "Task 3", "Task 2", "Task 1", "Task 0"]
+
+
+def test_last_full_page_has_no_next_cursor(task_service):
+    tasks, cursor = task_service.get_tasks_page_by_person(PERSON_ID, limit=5)
+
+    assert len(tasks) == 5
+    assert cursor is None
+
+
+def test_sparse_fieldset_drops_the_sort_key_it_did_not_ask_for(task_service):
+    tasks, cursor = task_service.get_tasks_page_by_person(PERSON_ID, limit=2, fields=["title"])
+
+    assert tasks[0] == {"entity_id": tasks[0]["entity_id"], "title": "Task 4"}
+    assert cursor is not None
+
+
+def test_invalid_cursor(task_service):
+    with pytest.raises(InputValidationError):
+        task_service.get_tasks_page_by_person(PERSON_ID, cursor="not a cursor")
+
+
+@pytest.mark.parametrize("limit", [0, -1, MAX_PAGE_SIZE + 1, None, True])
+def test_page_size_out_of_range_is_rejected(task_service, limit):
+    with pytest.raises(InputValidationError):
+        task_service.get_tasks_page_by_person(PERSON_ID, cursor="", limit=limit)
+    with pytest.raises(InputValidationError):
+        task_service.get_tasks_with_total_by_person(PERSON_ID, offset=0, limit=limit)
+    with pytest.raises(InputValidationError):
+        task_service.search_tasks_by_person(PERSON_ID, "task", limit=limit)
+    assert not task_service.task_repo.calls
+
+
+def test_negative_offset_is_rejected(task_service):
+    with pytest.raises(InputValidationError):
+        task_service.get_tasks_with_total_by_person(PERSON_ID, offset=-2, limit=2)
+
+
+def test_offset_page_with_total(task_service):
+    tasks, total = task_service.get_tasks_with_total_by_person(PERSON_ID, offset=4, limit=2)
+
+    assert [task["title"] for task in tasks] == ["Task 0"]
+    assert total == 5
+
+
+def test_change_feed_pages_until_has_more_is_false(task_service):
+    changed = []
+    watermark = None
+    while True:
+        changes = task_service.get_task_changes_by_person(PERSON_ID, watermark=watermark, limit=2)
+        changed.extend(task.title for task in changes["changed"])
+        assert changes["watermark"] != watermark
+        watermark = changes["watermark"]
+        if not changes["has_more"]:
+            break
+
+    assert changed == ["Task 0", "Task 1", "Task 2", "Task 3", "Task 4"]
+
+
+def test_change_feed_reports_deletions(task_service):
+    deleted_task = next(iter(task_service.task_repo.tasks.values()))
+    deleted_task.active = False
+
+    changes = task_service.get_task_changes_by_person(PERSON_ID, limit=10)
+
+    assert changes["deleted"] == [deleted_task.entity_id]
+    assert len(changes["changed"]) == 4
+
+
+def test_change_feed_holds_back_unsettled_changes(task_service):
+    recent = make_tasks(1)[0]
+    recent.changed_on = datetime.utcnow()
+    task_service.task_repo.tasks[recent.entity_id] = recent
+
+    changes = task_service.get_task_changes_by_person(PERSON_ID, limit=10)
+
+    assert recent not in changes["changed"]
+    assert len(changes["changed"]) == 5
+
+
+@pytest.mark.parametrize("limit", [0, -5, MAX_BATCH_SIZE + 1, 10 ** 9])
+def test_change_feed_limit_out_of_range_is_rejected(task_service, limit):
+    with pytest.raises(InputValidationError):
+        task_service.get_task_changes_by_person(PERSON_ID, limit=limit)
+    assert not task_service.task_repo.calls
+
+
+def test_invalid_watermark(task_service):
+    with pytest.raises(InputValidationError):
+        task_service.get_task_changes_by_person(PERSON_ID, watermark="%%%")
+
+
+def test_batch_creates_updates_and_deletes(task_service):
+    first, second = list(task_service.task_repo.tasks)[:2]
+
+    results = task_service.apply_batch(PERSON_ID, [
+        {"action": "create", "title": "New task", "is_completed": True},
+        {"action": "update", "task_id": first, "title": "Renamed", "is_completed": False},
+        {"action": "delete", "task_id": second},
+    ])
+
+    assert [result["success"] for result in results] == [True, True, True]
+    assert results[0]["task"]["is_completed"] is True
+    assert task_service.task_repo.tasks[first].title == "Renamed"
+    assert not task_service.task_repo.tasks[second].active
+    # The referenced tasks are locked and written in a single repository call.
+    assert [call[0] for call in task_service.task_repo.calls] == ["save_many_for_person"]
+
+
+def test_batch_accepts_dashed_task_ids(task_service):
+    task_id = next(iter(task_service.task_repo.tasks))
+    dashed = str(uuid.UUID(task_id))
+
+    results = task_service.apply_batch(PERSON_ID, [{"action": "delete", "task_id": dashed}])
+
+    assert results[0]["success"]
+    assert results[0]["task_id"] == task_id
+
+
+@pytest.mark.parametrize("task_id", [None, 42, ["x"], {"id": 1}, "", "not-a-uuid"])
+def test_batch_rejects_malformed_task_ids_per_operation(task_service, task_id):
+    valid_id = next(iter(task_service.task_repo.tasks))
+
+    results = task_service.apply_batch(PERSON_ID, [
+        {"action": "update", "task_id": task_id, "title": "Renamed"},
+        {"action": "update", "task_id": valid_id, "title": "Renamed"},
+    ])
+
+    assert results[0]["success"] is False
+    assert results[0]["message"] == "'task_id' must be a valid task ID."
+    assert results[1]["success"] is True
+
+
+@pytest.mark.parametrize("is_completed", ["false", "true", 0, 1, "yes"])
+def test_batch_requires_a_boolean_is_completed(task_service, is_completed):
+    task_id = next(iter(task_service.task_repo.tasks))
+
+    results = task_service.apply_batch(PERSON_ID, [
+        {"action": "create", "title": "New task", "is_completed": is_completed},
+        {"action": "update", "task_id": task_id, "is_completed": is_completed},
+    ])
+
+    assert [result["message"] for result in results] == ["'is_completed' must be true or false."] * 2
+    assert not task_service.task_repo.tasks[task_id].is_completed
+
+
+def test_batch_reports_missing_duplicate_and_foreign_tasks(task_service):
+    task_id = next(iter(task_service.task_repo.tasks))
+    foreign = make_tasks(1, person_id="b" * 32)[0]
+    task_service.task_repo.tasks[foreign.entity_id] = foreign
+
+    results = task_service.apply_batch(PERSON_ID, [
+        {"action": "delete", "task_id": uuid.uuid4().hex},
+        {"action": "delete", "task_id": foreign.entity_id},
+        {"action": "update", "task_id": task_id, "title": "Once"},
+        {"action": "update", "task_id": task_id, "title": "Twice"},
+        {"action": "archive", "task_id": task_id},
+        {"action": "create", "title": ""},
+    ])
+
+    assert [result["success"] for result in results] == [False, False, True, False, False, False]
+    assert results[0]["message"] == results[1]["message"] == "Task not found"
+    assert results[3]["message"] == "Task appears more than once in the batch."
+    assert foreign.active
+
+
+def test_empty_batch_skips_the_transaction(task_service):
+    assert task_service.apply_batch(PERSON_ID, []) == []
+    assert task_service.apply_batch(PERSON_ID, [{"action": "rename"}])[0]["success"] is False
+    assert task_service.task_repo.calls == []
+
+
+def test_batch_size_limit(task_service):
+    with pytest.raises(InputValidationError):
+        task_service.apply_batch(PERSON_ID, [{"action": "create", "title": "Task"}] * (MAX_BATCH_SIZE + 1))
+
+
+def test_search_pages_follow_rank_then_entity_id(task_service):
+    task_service.task_repo = FakeTaskRepository(
+        [Task(person_id=PERSON_ID, title="insurance insurance insurance")]
+        + [Task(person_id=PERSON_ID, title=f"Insurance {index}") for index in range(4)]
+        + [Task(person_id=PERSON_ID, title="Groceries")]
+    )
+
+    seen = []
+    cursor = None
+    while True:
+        tasks, cursor = task_service.search_tasks_by_person(PERSON_ID, "insurance", cursor=cursor, limit=2)
+        seen.extend(tasks)
+        if cursor is None:
+            break
+
+    assert seen[0].title == "insurance insurance insurance"
+    # Equal ranks are paged by entity_id, so none is skipped or repeated across pages.
+    assert [task.entity_id for task in seen[1:]] == sorted((task.entity_id for task in seen[1:]), reverse=True)
+    assert len({task.entity_id for task in seen}) == 5
+
+
+def test_search_cursor_keeps_the_exact_rank():
+    rank = 0.1 + 0.2
+
+    assert decode_rank_cursor(encode_rank_cursor(rank, "b" * 32)) == (rank, "b" * 32)
+
+
+def test_search_with_fields_returns_dicts_and_a_cursor(task_service):
+    tasks, cursor = task_service.search_tasks_by_person(PERSON_ID, "task", limit=2, fields=["title"])
+
+    assert all(set(task) == {"entity_id", "title"} for task in tasks)
+    assert cursor is not None
+
+
+def test_invalid_search_cursor(task_service):
+    with pytest.raises(InputValidationError):
+        task_service.search_tasks_by_person(PERSON_ID, "task", cursor="not a cursor")
+
+
+def test_sparse_fieldset_with_total_returns_only_the_requested_fields(task_service):
+    tasks, total = task_service.get_tasks_with_total_by_person(PERSON_ID, limit=2, fields=["title", "title"])
+
+    assert tasks == [
+        {"entity_id": tasks[0]["entity_id"], "title": "Task 4"},
+        {"entity_id": tasks[1]["entity_id"], "title": "Task 3"},
+    ]
+    assert total == 5
+
+
+def test_unknown_sparse_fields_are_rejected(task_service):
+    with pytest.raises(InputValidationError, match="password"):
+        task_service.get_tasks_page_by_person(PERSON_ID, fields=["title", "password"])
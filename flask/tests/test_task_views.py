@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+
+import pytest
+
+from common.models.task import Task
+
+
+@pytest.fixture
+def task(person, task_repo):
+    task = Task(person_id=person.entity_id, title="Renew the insurance")
+    task_repo.tasks[task.entity_id] = task
+    return task
+
+
+def test_get_sets_the_version_as_etag(client, task):
+    response = client.get(f"/tasks/{task.entity_id}")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{task.version}"'
+
+
+def test_get_with_a_matching_if_none_match_is_not_modified(client, task):
+    response = client.get(f"/tasks/{task.entity_id}", headers={"If-None-Match": f'"{task.version}"'})
+
+    assert response.status_code == 304
+    assert not response.get_data()
+
+
+def test_put_with_a_matching_if_match_updates_and_returns_the_new_etag(client, task):
+    response = client.put(
+        f"/tasks/{task.entity_id}",
+        json={"title": "Renew the car insurance", "description": "Before Friday"},
+        headers={"If-Match": f'"{task.version}"'},
+    )
+
+    body = response.get_json()
+    assert response.status_code == 200 and body["success"]
+    assert body["task"]["title"] == "Renew the car insurance"
+    assert response.headers["ETag"] == f'"{body["task"]["version"]}"'
+    assert body["task"]["version"] != task.version
+
+
+def test_put_with_a_stale_if_match_fails_with_412(client, task, task_repo):
+    response = client.put(
+        f"/tasks/{task.entity_id}",
+        json={"title": "Renew the car insurance", "description": "Before Friday"},
+        headers={"If-Match": '"stale-version"'},
+    )
+
+    assert response.status_code == 412
+    assert response.get_json()["success"] is False
+    assert task_repo.tasks[task.entity_id].title == "Renew the insurance"
+
+
+def test_delete_with_a_stale_if_match_fails_with_412(client, task, task_repo):
+    response = client.delete(f"/tasks/{task.entity_id}", headers={"If-Match": '"stale-version"'})
+
+    assert response.status_code == 412
+    assert task_repo.tasks[task.entity_id].active
+
+
+def test_writes_without_if_match_are_unconditional(client, task, task_repo):
+    response = client.patch(f"/tasks/{task.entity_id}", json={"is_completed": True})
+
+    assert response.get_json()["success"]
+    assert task_repo.calls[-1] == ("update_owned", task.entity_id, None)
+
+
+def test_tasks_of_other_people_are_not_found(client, task_repo):
+    task = Task(person_id="b" * 32, title="Someone else's task")
+    task_repo.tasks[task.entity_id] = task
+
+    response = client.patch(f"/tasks/{task.entity_id}", json={"is_completed": True}, headers={"If-Match": "*"})
+
+    assert response.get_json() == {"success": False, "message": "Task not found"}
+    assert not task_repo.tasks[task.entity_id].is_completed
+
+
+def test_input_validation_errors_are_failure_responses(client, app):
+    response = client.get("/tasks/?cursor=not-a-cursor")
+
+    assert not app.config["PROPAGATE_EXCEPTIONS"]
+    assert response.status_code == 200
+    assert response.get_json() == {"success": False, "message": "Invalid pagination cursor."}
+
+
+def test_unexpected_errors_are_answered_by_the_app_error_handler(client, task, task_repo, monkeypatch):
+    def fail(task_id):
+        raise RuntimeError("The database went away.")
+
+    monkeypatch.setattr(task_repo, "get_by_id", fail)
+
+    response = client.get(f"/tasks/{task.entity_id}")
+
+    assert response.status_code == 500
+    assert response.get_json() == {"success": False, "message": "An unexpected error occurred"}
+
+
+def test_service_unavailable_is_a_503_with_retry_after(client, task, task_repo, monkeypatch):
+    from common.exceptions import ServiceUnavailableError
+
+    def fail(task_id):
+        raise ServiceUnavailableError("Timed out waiting for a database connection.")
+
+    monkeypatch.setattr(task_repo, "get_by_id", fail)
+
+    response = client.get(f"/tasks/{task.entity_id}")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_export_streams_ndjson(client, person, task_repo):
+    for index in range(3):
+        task = Task(person_id=person.entity_id, title=f"Task {index}")
+        task_repo.tasks[task.entity_id] = task
+
+    response = client.get("/tasks/export")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["Content-Disposition"] == "attachment; filename=tasks.ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert sorted(json.loads(line)["title"] for line in lines) == ["Task 0", "Task 1", "Task 2"]
+
+
+def test_export_streams_csv_with_one_header_row(client, task, task_repo):
+    response = client.get("/tasks/export?format=csv")
+
+    assert response.mimetype == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row["title"] for row in rows] == [task.title]
+    assert rows[0]["entity_id"] == task.entity_id
+
+
+def test_list_with_fields_returns_only_those_fields(client, task):
+    response = client.get("/tasks/?fields=title, is_completed")
+
+    tasks = response.get_json()["tasks"]
+    assert tasks == [{"entity_id": task.entity_id, "title": task.title, "is_completed": False}]
@@ -0,0 +1,79 @@
+import pytest
+
+from common.app_config import config
+from common.models import Person
+from common.repositories.unit_of_work import UnitOfWork
+from common.services import PersonService, get_service
+from common.services.caches import person_cache
+from tests.fakes import FakeTransactionAdapter
+
+
+@pytest.fixture
+def person():
+    person = Person(first_name="Ada", last_name="Lovelace")
+    person_cache.set(person.entity_id, person)
+    yield person
+    person_cache.clear()
+
+
+def test_saves_are_sent_in_one_execute_and_committed(person):
+    adapter = FakeTransactionAdapter()
+    person_service = get_service(PersonService, config)
+
+    with UnitOfWork(adapter) as unit_of_work:
+        person_service.save_person(person, unit_of_work)
+        person_service.save_person(Person(first_name="Grace", last_name="Hopper"), unit_of_work)
+
+    assert len(adapter.executed) == 1
+    assert adapter._connection.commits == 1
+
+
+def test_cache_is_invalidated_only_after_commit(person):
+    adapter = FakeTransactionAdapter()
+    person_service = get_service(PersonService, config)
+
+    with UnitOfWork(adapter) as unit_of_work:
+        person_service.save_person(person, unit_of_work)
+        # Queued, not committed: other requests must keep seeing the cached, committed row.
+        assert person_cache.get(person.entity_id).first_name == "Ada"
+
+    assert person_cache.get(person.entity_id, None) is None
+
+
+def test_callbacks_do_not_run_on_rollback(person):
+    adapter = FakeTransactionAdapter(fail_on_execute=True)
+    person_service = get_service(PersonService, config)
+
+    with pytest.raises(RuntimeError):
+        with UnitOfWork(adapter) as unit_of_work:
+            person_service.save_person(person, unit_of_work)
+
+    assert adapter._connection.rollbacks == 1
+    assert person_cache.get(person.entity_id, None) is not None
+
+
+def test_callbacks_are_dropped_when_the_block_fails(person):
+    adapter = FakeTransactionAdapter()
+    person_service = get_service(PersonService, config)
+
+    with pytest.raises(ValueError):
+        with UnitOfWork(adapter) as unit_of_work:
+            person_service.save_person(person, unit_of_work)
+            raise ValueError("Abort the signup.")
+
+    assert not adapter.executed
+    assert person_cache.get(person.entity_id, None) is not None
+
+
+def test_failing_callback_does_not_fail_the_commit():
+    adapter = FakeTransactionAdapter()
+    calls = []
+    unit_of_work = UnitOfWork(adapter)
+    unit_of_work.save(get_service(PersonService, config).person_repo, Person(first_name="Ada", last_name="Lovelace"))
+    unit_of_work.on_commit(lambda: 1 / 0)
+    unit_of_work.on_commit(lambda: calls.append(1))
+
+    unit_of_work.flush()
+
+    assert adapter._connection.commits == 1
+    assert calls == [1]